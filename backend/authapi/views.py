@@ -2,7 +2,7 @@ from django.contrib.auth import authenticate
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework_simplejwt.tokens import RefreshToken
+from users.tokens import refresh_token_for
 
 class LoginView(APIView):
     """Simple login view that returns JWT tokens and user details (including role)."""
@@ -19,7 +19,7 @@ class LoginView(APIView):
         if not user:
             return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
 
-        refresh = RefreshToken.for_user(user)
+        refresh = refresh_token_for(user)
         return Response({
             'access': str(refresh.access_token),
             'refresh': str(refresh),
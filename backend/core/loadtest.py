@@ -0,0 +1,238 @@
+"""
+Local load-test harness (driven by `manage.py loadtest`).
+
+Virtual users replay a weighted mix of public, member, trainer and owner calls
+(CALL_MIX, ROLE_WEIGHTS) against a running server (runserver, gunicorn, ...)
+from a pool of worker threads. Signed-in calls use access tokens minted
+locally for accounts read from the same database the server uses, so no
+passwords are needed. With a password for those accounts, logins join the
+mix as well. Every worker draws from its own seeded random generator, so a
+given --seed replays the same sequence of calls.
+
+Results are grouped by URL name (the same labels as core.metrics) with
+p50/p95/p99 latency, throughput and error counts. save_baseline() stores
+them as JSON and compare() lists the routes that got slower than a stored
+baseline by more than a relative tolerance and an absolute floor, or that
+started failing.
+"""
+import json
+import math
+import random
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.urls import Resolver404, resolve
+
+# role -> [(weight, method, path)]; '{login}' stands for a sign-in with the account's password
+CALL_MIX = {
+    'public': [
+        (4, 'GET', '/api/gym/'),
+        (2, 'GET', '/api/trainers/'),
+        (1, 'GET', '/api/gym/current/'),
+        (1, 'GET', '/api/gym/1/working_hours/'),
+        (1, 'GET', '/'),
+    ],
+    'member': [
+        (5, 'GET', '/api/users/dashboard/'),
+        (2, 'GET', '/api/users/profile/'),
+        (2, 'GET', '/api/gym/'),
+        (1, 'GET', '/api/members/'),
+        (1, 'POST', '{login}'),
+    ],
+    'trainer': [
+        (4, 'GET', '/api/users/dashboard/'),
+        (3, 'GET', '/api/programs/'),
+        (2, 'GET', '/api/members/'),
+        (1, 'GET', '/api/programs/my_programs/'),
+        (1, 'POST', '{login}'),
+    ],
+    'owner': [
+        (3, 'GET', '/api/users/dashboard/?section=summary'),
+        (3, 'GET', '/api/gym/dashboard_stats/'),
+        (2, 'GET', '/api/gym/membership_growth/'),
+        (2, 'GET', '/api/gym/recent_activity/'),
+        (2, 'GET', '/api/members/'),
+        (1, 'GET', '/api/users/?role=trainer'),
+        (1, 'GET', '/api/programs/'),
+        (1, 'GET', '/api/users/dashboard/'),
+    ],
+}
+# Share of virtual-user calls made by each role
+ROLE_WEIGHTS = {'public': 2, 'member': 6, 'trainer': 2, 'owner': 1}
+LOGIN_PATH = '/api/auth/login/'
+
+
+def url_name(path):
+    """Metrics-style label for a path ('<unresolved>' if it matches no route)"""
+    try:
+        return resolve(path.split('?', 1)[0]).view_name
+    except Resolver404:
+        return '<unresolved>'
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+class HTTPTransport:
+    """Sends one request to a base URL; returns the status code (0 if the connection failed)"""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def __call__(self, method, path, headers, body):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method, headers=headers)
+        if data is not None:
+            request.add_header('Content-Type', 'application/json')
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as error:
+            error.read()
+            return error.code
+        except (urllib.error.URLError, OSError):
+            return 0
+
+
+class Account:
+    __slots__ = ('email', 'authorization')
+
+    def __init__(self, email, access_token):
+        self.email = email
+        self.authorization = f'Bearer {access_token}'
+
+
+class LoadTest:
+    """Replays CALL_MIX from `concurrency` workers, `requests` calls in total"""
+
+    def __init__(self, transport, accounts, requests=1000, concurrency=8, seed=1, password=None,
+                 mix=None, role_weights=None):
+        self.transport = transport
+        self.accounts = accounts  # role -> [Account]; 'public' needs none
+        self.requests = requests
+        self.concurrency = concurrency
+        self.seed = seed
+        self.password = password
+        self.mix = mix or CALL_MIX
+        roles = role_weights or ROLE_WEIGHTS
+        # Roles without accounts are left out of the mix instead of failing every call
+        self.roles = [role for role in roles if role == 'public' or accounts.get(role)]
+        self.role_weights = [roles[role] for role in self.roles]
+        self._names = {}
+
+    def _calls(self, role):
+        calls = self.mix[role]
+        if self.password is None:
+            calls = [call for call in calls if call[2] != '{login}']
+        return calls
+
+    def _worker(self, index):
+        # A fixed share of the calls per worker keeps each worker's sequence reproducible
+        quota = self.requests // self.concurrency + (index < self.requests % self.concurrency)
+        rng = random.Random(f'{self.seed}:{index}')
+        samples = []
+        calls = {role: self._calls(role) for role in self.roles}
+        for _ in range(quota):
+            role = rng.choices(self.roles, self.role_weights)[0]
+            weights = [call[0] for call in calls[role]]
+            _, method, path = rng.choices(calls[role], weights)[0]
+            headers, body = {}, None
+            account = rng.choice(self.accounts[role]) if role != 'public' else None
+            if path == '{login}':
+                path, body = LOGIN_PATH, {'email': account.email, 'password': self.password}
+            elif account is not None:
+                headers['Authorization'] = account.authorization
+            start = time.perf_counter()
+            status = self.transport(method, path, headers, body)
+            samples.append((self._name(path), status, time.perf_counter() - start))
+        return samples
+
+    def _name(self, path):
+        name = self._names.get(path)
+        if name is None:
+            name = self._names[path] = url_name(path)
+        return name
+
+    def run(self):
+        """Run the mix; returns summarize() of the samples"""
+        start = time.perf_counter()
+        if self.concurrency == 1:
+            # In the calling thread (and its database connection), e.g. inside a TestCase
+            results = [self._worker(0)]
+        else:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                results = list(pool.map(self._worker, range(self.concurrency)))
+        wall = time.perf_counter() - start
+        samples = [sample for worker in results for sample in worker]
+        return summarize(samples, wall)
+
+
+def _route_stats(latencies, errors, wall):
+    latencies.sort()
+    return {
+        'count': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / wall, 2) if wall else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def summarize(samples, wall):
+    """{'wall_seconds', 'total': stats, 'routes': {url name: stats}} for (name, status, seconds) samples"""
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    for name, status, seconds in samples:
+        latencies[name].append(seconds)
+        if not 200 <= status < 400:
+            errors[name] += 1
+    return {
+        'wall_seconds': round(wall, 3),
+        'total': _route_stats([s for _, _, s in samples], sum(errors.values()), wall),
+        'routes': {name: _route_stats(latencies[name], errors[name], wall) for name in sorted(latencies)},
+    }
+
+
+def save_baseline(path, results, meta=None):
+    with open(path, 'w') as f:
+        json.dump({'meta': meta or {}, **results}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results, baseline, tolerance=0.25, min_delta_ms=2.0, min_count=20, metric='p95_ms'):
+    """
+    Routes that regressed against the baseline: [(url name, reason)].
+    A route regresses when `metric` grew by more than `tolerance` (relative) and
+    `min_delta_ms` (absolute, so sub-millisecond noise never fails a run), or
+    when its error rate went up. Routes with fewer than `min_count` calls in
+    either run are too noisy to judge and are skipped.
+    """
+    regressions = []
+    for name, current in results['routes'].items():
+        previous = baseline.get('routes', {}).get(name)
+        if previous is None or min(previous['count'], current['count']) < min_count:
+            continue
+        before, after = previous[metric], current[metric]
+        if after > before * (1 + tolerance) and after - before > min_delta_ms:
+            regressions.append((name, f'{metric} {before:.1f} -> {after:.1f} ms ({(after - before) / before:+.0%})'))
+        error_rate = current['errors'] / current['count'] if current['count'] else 0.0
+        previous_rate = previous['errors'] / previous['count'] if previous['count'] else 0.0
+        if error_rate > previous_rate:
+            regressions.append((name, f'error rate {previous_rate:.1%} -> {error_rate:.1%}'))
+    return regressions
@@ -0,0 +1,52 @@
+import logging
+import statistics
+import time
+
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from core.metrics import registry
+
+ROUTES = ('/api/gym/dashboard_stats/', '/api/gym/recent_activity/', '/api/gym/membership_growth/')
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the overhead of MetricsMiddleware on real routes (median of interleaved requests)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=3000, help='Requests per route and side (default 3000)')
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        self.stdout.write(f"\n=== Metrics overhead: {count} requests per route, metrics off vs on ===")
+        handlers = {enabled: self.handler(enabled) for enabled in (False, True)}
+        factory = RequestFactory()
+        logging.disable(logging.WARNING)
+        try:
+            for url in ROUTES:
+                samples = {False: [], True: []}
+                for _ in range(count):
+                    # Alternate request by request so machine noise hits both sides equally
+                    for enabled, handler in handlers.items():
+                        request = factory.get(url)
+                        with override_settings(METRICS_ENABLED=enabled):
+                            start = time.perf_counter()
+                            handler.get_response(request)
+                            samples[enabled].append(time.perf_counter() - start)
+                off, on = (statistics.median(samples[flag]) * 1e6 for flag in (False, True))
+                self.stdout.write(
+                    f"  {url:30s} off {off:8.1f} µs  on {on:8.1f} µs  "
+                    f"overhead {on - off:+6.1f} µs ({(on - off) / off:+.2%})"
+                )
+        finally:
+            logging.disable(logging.NOTSET)
+            registry.clear()
+        self.stdout.write("")
+
+    def handler(self, enabled):
+        with override_settings(METRICS_ENABLED=enabled):
+            handler = BaseHandler()
+            handler.load_middleware()
+        return handler
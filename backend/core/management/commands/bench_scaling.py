@@ -0,0 +1,114 @@
+import json
+import os
+import tempfile
+import time
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from core.scaling import Sample, build_report, discover_routes, measure_routes, render_markdown
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Grow a scratch database through several sizes with seed_gym and time every GET route at each, '
+        'reporting latency/queries vs. size and fitted growth exponents'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000,100000',
+                            help='Comma-separated user counts (default 1000,10000,100000; add 1000000 for the full run)')
+        parser.add_argument('--repeat', type=int, default=5, help='Calls per route and size, median reported (default 5)')
+        parser.add_argument('--warm', action='store_true', help='Keep response caches between calls')
+        parser.add_argument('--max-seconds', type=float, default=5.0,
+                            help='Call a route only once at a size where it takes longer than this (default 5)')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='seed_gym rows per bulk insert (default 5000)')
+        parser.add_argument('--json', help='Write the report as JSON to this path')
+        parser.add_argument('--markdown', help='Write the report as markdown to this path')
+        parser.add_argument('--database-file', default=os.path.join(tempfile.gettempdir(), 'musclefit_scaling.sqlite3'),
+                            help='Scratch SQLite file (default %(default)s); other backends use their test database')
+        parser.add_argument('--keep', action='store_true', help='Keep the scratch database afterwards')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted({int(size) for size in options['sizes'].split(',')})
+        except ValueError:
+            raise CommandError(f"--sizes must be comma-separated integers, got {options['sizes']!r}")
+
+        routes = discover_routes()
+        self.stdout.write(f"\n=== Scaling benchmark: {len(routes)} GET routes at {', '.join(map(str, sizes))} users ===")
+        old_name = self.create_database(options)
+        setup_test_environment(debug=False)
+        try:
+            with override_settings(NPLUSONE_ENABLED=False, METRICS_ENABLED=False):
+                measurements = self.run(sizes, routes, options)
+        finally:
+            teardown_test_environment()
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keep'])
+
+        report = build_report(sizes, measurements)
+        markdown = render_markdown(report)
+        self.stdout.write('\n' + markdown)
+        if options['json']:
+            with open(options['json'], 'w') as f:
+                json.dump(report, f, indent=2)
+                f.write('\n')
+            self.stdout.write(f"✅ JSON report written to {options['json']}")
+        if options['markdown']:
+            with open(options['markdown'], 'w') as f:
+                f.write(markdown)
+            self.stdout.write(f"✅ Markdown report written to {options['markdown']}")
+
+        failed = [
+            f"{row['route']} as {row['role']} ({row['class']})"
+            for row in report['routes'] if row['class'].startswith('HTTP')
+        ]
+        if failed:
+            raise CommandError('Not measured, fix the route or its sample in core.scaling: ' + ', '.join(failed))
+
+    def create_database(self, options):
+        """Switch to a freshly migrated scratch database; returns the name to restore"""
+        settings_dict = connection.settings_dict
+        if connection.vendor == 'sqlite':
+            settings_dict.setdefault('TEST', {})['NAME'] = options['database_file']
+        old_name = settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False, keepdb=False)
+        # Staff, so admin-only routes are measured too; seed_gym then skips creating its own owner
+        User.objects.create_user(
+            email='scaling-owner@muscle.fit', username='scaling-owner@muscle.fit',
+            role='owner', is_staff=True,
+        )
+        return old_name
+
+    def run(self, sizes, routes, options):
+        measurements = {}
+        for size in sizes:
+            started = time.perf_counter()
+            self.grow_to(size, options['chunk_size'])
+            seeded = time.perf_counter()
+            measurements[size] = measure_routes(
+                routes, Sample(User.objects.all()), repeat=options['repeat'], cold=not options['warm'],
+                max_seconds=options['max_seconds'],
+            )
+            self.stdout.write(
+                f"  {size:>9,} users: seeded in {seeded - started:6.1f}s, "
+                f"measured {len(measurements[size])} calls in {time.perf_counter() - seeded:6.1f}s"
+            )
+        return measurements
+
+    def grow_to(self, size, chunk_size):
+        """Add users (1 trainer per 1000, 1 program per 100) until there are `size`"""
+        missing = size - User.objects.count()
+        if missing <= 0:
+            return
+        trainers = max(1, missing // 1000)
+        call_command(
+            'seed_gym', members=missing - trainers, trainers=trainers, programs=max(trainers, missing // 100),
+            prefix=f's{size}', chunk_size=chunk_size, seed=size, stdout=StringIO(),
+        )
@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.loadtest import CALL_MIX, Account, HTTPTransport, LoadTest, compare, load_baseline, save_baseline
+from users.tokens import refresh_token_for
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay a mix of owner/trainer/member/public API calls against a running server and report '
+        'p50/p95/p99 and throughput per URL name; --baseline fails on regressions'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Server base URL (default %(default)s)')
+        parser.add_argument('--requests', type=int, default=2000, help='Measured calls (default 2000)')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent virtual users (default 8)')
+        parser.add_argument('--warmup', type=int, default=200, help='Unmeasured calls first (default 200)')
+        parser.add_argument('--seed', type=int, default=1, help='Seed for the call sequence (default 1)')
+        parser.add_argument('--accounts', type=int, default=50, help='Accounts used per role (default 50)')
+        parser.add_argument('--password', help='Password of those accounts; adds sign-ins to the mix')
+        parser.add_argument('--baseline', help='Compare against this baseline JSON and fail on regressions')
+        parser.add_argument('--save-baseline', help='Write the results to this baseline JSON')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Allowed relative p95 growth over the baseline (default 0.25)')
+        parser.add_argument('--min-delta-ms', type=float, default=2.0,
+                            help='p95 growth below this many ms never counts as a regression (default 2)')
+        parser.add_argument('--min-count', type=int, default=20,
+                            help='Routes with fewer calls are not compared (default 20)')
+
+    def handle(self, *args, **options):
+        accounts = self.accounts(options['accounts'])
+        self.stdout.write(
+            f"\n=== Load test: {options['url']}, {options['requests']} calls, "
+            f"{options['concurrency']} virtual users, seed {options['seed']} ==="
+        )
+        self.stdout.write('  accounts: ' + ', '.join(f'{role} {len(accounts[role])}' for role in accounts))
+
+        transport = HTTPTransport(options['url'])
+        settings = dict(accounts=accounts, concurrency=options['concurrency'], password=options['password'])
+        if options['warmup']:
+            LoadTest(transport, requests=options['warmup'], seed=options['seed'] + 1, **settings).run()
+        results = LoadTest(transport, requests=options['requests'], seed=options['seed'], **settings).run()
+        self.report(results)
+
+        if results['total']['count'] and results['total']['errors'] == results['total']['count']:
+            raise CommandError(f"Every call failed; is the server running at {options['url']}?")
+        if options['save_baseline']:
+            meta = {key: options[key] for key in ('url', 'requests', 'concurrency', 'seed', 'accounts')}
+            meta['recorded_at'] = timezone.now().isoformat()
+            save_baseline(options['save_baseline'], results, meta)
+            self.stdout.write(f"✅ Baseline saved to {options['save_baseline']}")
+        if options['baseline']:
+            self.check_baseline(results, options)
+        self.stdout.write("")
+
+    def accounts(self, per_role):
+        """Access tokens for the first `per_role` active users of each signed-in role"""
+        accounts = {}
+        for role in CALL_MIX:
+            if role == 'public':
+                continue
+            users = User.objects.filter(role=role, is_active=True).order_by('id')[:per_role]
+            accounts[role] = [Account(user.email, str(refresh_token_for(user).access_token)) for user in users]
+        return accounts
+
+    def report(self, results):
+        header = f"  {'url name':36s} {'calls':>7s} {'errors':>7s} {'req/s':>8s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s}"
+        self.stdout.write(header)
+        rows = list(results['routes'].items()) + [('TOTAL', results['total'])]
+        for name, stats in rows:
+            self.stdout.write(
+                f"  {name:36s} {stats['count']:7d} {stats['errors']:7d} {stats['rps']:8.1f} "
+                f"{stats['p50_ms']:8.2f} {stats['p95_ms']:8.2f} {stats['p99_ms']:8.2f}"
+            )
+        self.stdout.write(f"  wall time {results['wall_seconds']:.2f}s")
+
+    def check_baseline(self, results, options):
+        try:
+            baseline = load_baseline(options['baseline'])
+        except FileNotFoundError:
+            raise CommandError(f"No baseline at {options['baseline']}; record one with --save-baseline")
+        regressions = compare(
+            results, baseline, options['tolerance'], options['min_delta_ms'], options['min_count']
+        )
+        if regressions:
+            details = '\n'.join(f'  {name}: {reason}' for name, reason in regressions)
+            raise CommandError(f"{len(regressions)} regression(s) against {options['baseline']}:\n{details}")
+        self.stdout.write(f"✅ No regressions against {options['baseline']}")
@@ -0,0 +1,239 @@
+"""
+Per-route request metrics in Prometheus text format.
+
+MetricsMiddleware (enabled by METRICS_ENABLED; otherwise Django drops it at
+startup) records, per resolved URL name and method:
+
+  * request count by status code and a latency histogram,
+  * DB queries and SQL time, measured with an execute wrapper on the default connection,
+  * serialization time: building serializer .data (outermost call only, so a
+    serializer nested in a SerializerMethodField is not counted twice; any SQL
+    a lazy queryset runs there is also in the SQL time),
+  * render time: turning the data into the response body (DRF's renderer).
+
+metrics_view serves them at /api/_metrics/ together with the stats of
+collectors registered by apps (caches, hashing pool, login guard, ...). It
+returns 404 while metrics are disabled; when enabled, keep the path off the
+public internet. Numbers are per process; scrape every worker.
+"""
+import re
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import Http404, HttpResponse
+from rest_framework.serializers import BaseSerializer
+
+PREFIX = 'musclefit'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNRESOLVED = '<unresolved>'
+
+
+def metrics_enabled():
+    return getattr(settings, 'METRICS_ENABLED', False)
+
+
+class RouteStats:
+    __slots__ = (
+        'statuses', 'buckets', 'latency_sum', 'count', 'queries', 'sql_seconds',
+        'serialize_seconds', 'render_seconds',
+    )
+
+    def __init__(self):
+        self.statuses = defaultdict(int)
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.latency_sum = 0.0
+        self.count = 0
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.render_seconds = 0.0
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._collectors = {}
+
+    def register_collector(self, name, stats):
+        """Export stats() (a dict of numbers) as '<prefix>_<name>_<key>' gauges"""
+        self._collectors[name] = stats
+
+    def observe(self, route, method, status, latency, queries, sql_seconds, serialize_seconds, render_seconds):
+        with self._lock:
+            stats = self._routes.get((route, method))
+            if stats is None:
+                stats = self._routes[(route, method)] = RouteStats()
+            stats.statuses[status] += 1
+            stats.count += 1
+            stats.latency_sum += latency
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if latency <= bound:
+                    stats.buckets[i] += 1
+                    break
+            stats.queries += queries
+            stats.sql_seconds += sql_seconds
+            stats.serialize_seconds += serialize_seconds
+            stats.render_seconds += render_seconds
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+    def snapshot(self, route, method='GET'):
+        with self._lock:
+            return self._routes.get((route, method))
+
+    def render(self):
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f'# HELP {PREFIX}_{name} {help_text}')
+            lines.append(f'# TYPE {PREFIX}_{name} {kind}')
+
+        with self._lock:
+            routes = sorted(self._routes.items())
+
+            family('http_requests_total', 'counter', 'Requests by route, method and status.')
+            for (route, method), stats in routes:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(f'{PREFIX}_http_requests_total{{{_labels(route, method)},status="{status}"}} {count}')
+
+            family('http_request_duration_seconds', 'histogram', 'Request latency by route and method.')
+            for (route, method), stats in routes:
+                labels = _labels(route, method)
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                    cumulative += count
+                    lines.append(f'{PREFIX}_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{PREFIX}_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.count}')
+                lines.append(f'{PREFIX}_http_request_duration_seconds_sum{{{labels}}} {stats.latency_sum:.6f}')
+                lines.append(f'{PREFIX}_http_request_duration_seconds_count{{{labels}}} {stats.count}')
+
+            for name, attr, help_text, fmt in (
+                ('db_queries_total', 'queries', 'Database queries run by route and method.', '{}'),
+                ('db_query_seconds_total', 'sql_seconds', 'Time spent in SQL by route and method.', '{:.6f}'),
+                ('serialization_seconds_total', 'serialize_seconds', 'Time spent building serializer data.', '{:.6f}'),
+                ('render_seconds_total', 'render_seconds', 'Time spent rendering response bodies.', '{:.6f}'),
+            ):
+                family(name, 'counter', help_text)
+                for (route, method), stats in routes:
+                    value = fmt.format(getattr(stats, attr))
+                    lines.append(f'{PREFIX}_{name}{{{_labels(route, method)}}} {value}')
+
+        for collector, stats in sorted(self._collectors.items()):
+            for key, value in stats().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    name = _metric_name(f'{collector}_{key}')
+                    family(name, 'gauge', f'{collector} {key}.')
+                    lines.append(f'{PREFIX}_{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(route, method):
+    return f'route="{_escape(route)}",method="{method}"'
+
+
+def _metric_name(name):
+    return re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+
+registry = MetricsRegistry()
+
+# Serialization timer of the request running on this thread, if any
+_serializing = threading.local()
+
+
+def _timed_data(fget):
+    def data(serializer):
+        timings = getattr(_serializing, 'timings', None)
+        if timings is None or _serializing.depth:
+            return fget(serializer)
+        _serializing.depth = 1
+        start = time.perf_counter()
+        try:
+            return fget(serializer)
+        finally:
+            timings[0] += time.perf_counter() - start
+            _serializing.depth = 0
+
+    data.__wrapped__ = fget
+    return data
+
+
+def install_serializer_timing():
+    """
+    Time BaseSerializer.data, which Serializer.data and ListSerializer.data
+    both go through. Outside a metered request the wrapper is one attribute
+    lookup.
+    """
+    if not hasattr(BaseSerializer.data.fget, '__wrapped__'):
+        BaseSerializer.data = property(_timed_data(BaseSerializer.data.fget))
+
+
+class MetricsMiddleware:
+    """Outermost middleware: times the request and counts the SQL it runs"""
+
+    def __init__(self, get_response):
+        if not metrics_enabled():
+            raise MiddlewareNotUsed
+        install_serializer_timing()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sql = [0, 0.0]  # queries, seconds
+        serialize = [0.0]
+        render = [0.0]
+
+        def record_query(execute, sql_text, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql_text, params, many, context)
+            finally:
+                sql[0] += 1
+                sql[1] += time.perf_counter() - start
+
+        request._metrics_render = render
+        # What connection.execute_wrapper() does, minus the context manager and the
+        # second thread-local lookup: a few microseconds on every request
+        wrappers = connections[DEFAULT_DB_ALIAS].execute_wrappers
+        wrappers.append(record_query)
+        _serializing.timings, _serializing.depth = serialize, 0
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            wrappers.remove(record_query)
+            _serializing.timings = None
+        latency = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        route = (match.view_name if match else None) or UNRESOLVED
+        registry.observe(route, request.method, response.status_code, latency, sql[0], sql[1], serialize[0], render[0])
+        return response
+
+    def process_template_response(self, request, response):
+        # Called just before render(); the post-render callback closes the timing
+        started = time.perf_counter()
+        timings = request._metrics_render
+
+        def rendered(response):
+            timings[0] += time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+def metrics_view(request):
+    if not metrics_enabled():
+        raise Http404
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
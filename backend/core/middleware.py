@@ -0,0 +1,49 @@
+"""
+Path-scoped versions of Django's browser-oriented middleware.
+
+The JSON API under API_PATH_PREFIX authenticates with JWT only (users.authentication),
+so it has no use for sessions, session-based auth, CSRF cookies, flash messages or
+X-Frame-Options. Each class below is the stock middleware (so admin's system checks
+still find it) but passes API requests straight through; /admin/ and every other
+path get the full stack.
+"""
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.middleware.clickjacking import XFrameOptionsMiddleware
+from django.middleware.csrf import CsrfViewMiddleware
+
+
+def is_api_request(request):
+    return request.path_info.startswith(getattr(settings, 'API_PATH_PREFIX', '/api/'))
+
+
+class SkipForAPIMixin:
+    def __call__(self, request):
+        if is_api_request(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SiteSessionMiddleware(SkipForAPIMixin, SessionMiddleware):
+    pass
+
+
+class SiteCsrfViewMiddleware(SkipForAPIMixin, CsrfViewMiddleware):
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if is_api_request(request):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class SiteAuthenticationMiddleware(SkipForAPIMixin, AuthenticationMiddleware):
+    pass
+
+
+class SiteMessageMiddleware(SkipForAPIMixin, MessageMiddleware):
+    pass
+
+
+class SiteXFrameOptionsMiddleware(SkipForAPIMixin, XFrameOptionsMiddleware):
+    pass
@@ -0,0 +1,153 @@
+"""
+N+1 query detection for development and tests.
+
+While a request runs, every SQL statement is reduced to its shape (literals,
+numbers and IN lists replaced by placeholders). A shape that runs more than
+NPLUSONE_THRESHOLD times in one request is almost always a lazy load in a loop,
+e.g. a serializer field following a foreign key per row. The report names the
+serializer field being rendered when the repeat happened, if any, and the
+first line of project code on the stack.
+
+NPlusOneMiddleware is active when NPLUSONE_ENABLED is true (default: DEBUG)
+and core.test_runner turns it on with NPLUSONE_ACTION = 'raise' for the test
+suite. NPLUSONE_ACTION = 'warn' logs and issues NPlusOneWarning instead.
+Shapes matching a regex in NPLUSONE_IGNORE are never reported.
+"""
+import logging
+import os
+import re
+import sys
+import warnings
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN \([^()]*\)', re.IGNORECASE)
+_SPACE = re.compile(r'\s+')
+
+_SITE_PACKAGES = os.sep + 'site-packages' + os.sep
+_THIS_FILE = os.path.abspath(__file__)
+
+
+class NPlusOneError(AssertionError):
+    pass
+
+
+class NPlusOneWarning(UserWarning):
+    pass
+
+
+def normalize_sql(sql):
+    """The statement's shape: the same query with different arguments normalizes to the same string"""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def find_origin():
+    """(serializer field being rendered or None, first project 'file:line in function')"""
+    base_dir = str(settings.BASE_DIR)
+    field = line = None
+    frame = sys._getframe(1)
+    while frame is not None and (field is None or line is None):
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if line is None and filename.startswith(base_dir) and _SITE_PACKAGES not in filename \
+                and filename != _THIS_FILE:
+            line = f'{os.path.relpath(filename, base_dir)}:{frame.f_lineno} in {frame.f_code.co_name}'
+        if field is None and frame.f_code.co_name == 'to_representation' and 'field' in frame.f_locals:
+            serializer = frame.f_locals.get('self')
+            field_name = getattr(frame.f_locals['field'], 'field_name', None)
+            if serializer is not None and field_name:
+                field = f'{type(serializer).__name__}.{field_name}'
+        frame = frame.f_back
+    return field, line
+
+
+class QueryShapeTracker:
+    """Counts statement shapes on one connection and remembers where repeats came from"""
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.counts = Counter()
+        self.origins = {}
+        self._ignore = [re.compile(pattern) for pattern in _setting('NPLUSONE_IGNORE', ())]
+
+    def __call__(self, execute, sql, params, many, context):
+        shape = normalize_sql(sql)
+        self.counts[shape] += 1
+        if self.counts[shape] == self.threshold + 1:
+            self.origins[shape] = find_origin()
+        return execute(sql, params, many, context)
+
+    def offenders(self):
+        return [
+            (shape, count, *self.origins[shape])
+            for shape, count in self.counts.most_common()
+            if count > self.threshold and not any(p.search(shape) for p in self._ignore)
+        ]
+
+
+def format_report(label, offenders):
+    lines = [f'Possible N+1 queries in {label}:']
+    for shape, count, field, line in offenders:
+        lines.append(f'  {count}x {shape[:300]}')
+        if field:
+            lines.append(f'      while rendering {field}')
+        if line:
+            lines.append(f'      at {line}')
+    return '\n'.join(lines)
+
+
+def report(label, offenders, action=None):
+    action = action or _setting('NPLUSONE_ACTION', 'warn')
+    message = format_report(label, offenders)
+    if action == 'raise':
+        raise NPlusOneError(message)
+    logger.warning(message)
+    warnings.warn(message, NPlusOneWarning, stacklevel=3)
+
+
+def _tracker(threshold):
+    return QueryShapeTracker(_setting('NPLUSONE_THRESHOLD', 5) if threshold is None else threshold)
+
+
+@contextmanager
+def detect_nplusone(label='block', threshold=None, action=None, using=DEFAULT_DB_ALIAS):
+    """Report repeated query shapes run inside the block (usable outside requests too)"""
+    tracker = _tracker(threshold)
+    with connections[using].execute_wrapper(tracker):
+        yield tracker
+    offenders = tracker.offenders()
+    if offenders:
+        report(label, offenders, action)
+
+
+class NPlusOneMiddleware:
+    """Tracks each request's queries and reports repeats, labelled with its method and path"""
+
+    def __init__(self, get_response):
+        if not _setting('NPLUSONE_ENABLED', settings.DEBUG):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        tracker = _tracker(None)
+        with connections[DEFAULT_DB_ALIAS].execute_wrapper(tracker):
+            response = self.get_response(request)
+        # A server error is reported as itself; logging it can repeat queries too
+        offenders = tracker.offenders() if response.status_code < 500 else None
+        if offenders:
+            report(f'{request.method} {request.path}', offenders)
+        return response
@@ -0,0 +1,34 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination: every page is a range scan from the cursor on an
+    indexed ordering, so page N costs the same as page 1 and no COUNT(*) is run.
+    Pass ?include_total=true for screens that really need the total row count.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    include_total_query_param = 'include_total'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.total = None
+        if request.query_params.get(self.include_total_query_param, '').lower() in ('1', 'true', 'yes'):
+            self.total = queryset.count()
+        return super().paginate_queryset(queryset, request, view=view)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.total is not None:
+            response.data['total'] = self.total
+        return response
+
+
+class CreatedAtCursorPagination(KeysetPagination):
+    """Newest first over (created_at, id)"""
+    ordering = ('-created_at', '-id')
+
+
+class AssignedAtCursorPagination(KeysetPagination):
+    """Most recently assigned first over (assigned_at, id)"""
+    ordering = ('-assigned_at', '-id')
@@ -0,0 +1,269 @@
+"""
+Data-size scaling benchmark (driven by `manage.py bench_scaling`).
+
+Every GET route in core.urls is discovered from the resolver, so new
+endpoints are measured without registering them here; routes that need a
+primary key or query parameters get them from SAMPLE_KWARGS/SAMPLE_PARAMS,
+and routes whose answer depends on the caller are measured once per role in
+ROLE_VARIANTS. At each database size the benchmark times each (route, role)
+in process with the test client, median of a few calls, with the in-process
+response caches cleared before every call so the cold path is what scales.
+It also counts the SQL queries of one call, which exposes per-row lazy loads
+as well as slow queries. A route that answers anything but 2xx at some size
+is not fitted: its class is the status code, so a broken sample or route
+cannot pass for a constant-time one.
+
+fit_exponent() fits latency ~ N**b by least squares in log-log space. With
+only a few sizes the fixed per-request cost flattens the curve at the small
+end, so classification uses the exponent between the two largest sizes.
+"""
+import math
+import statistics
+import time
+
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+# (route name) -> roles to call it as; everything else is called as the owner
+ROLE_VARIANTS = {
+    'dashboard': ('owner', 'trainer', 'member'),
+    'members-list': ('owner', 'trainer'),
+    'programs-list': ('owner', 'trainer'),
+    'programs-my-programs': ('trainer',),
+    'assignments-list': ('trainer', 'member'),
+    'assignments-detail': ('member',),
+    'sessions-list': ('trainer',),
+    'sessions-detail': ('trainer',),
+    'user-profile': ('member',),
+    'programs-assigned-members': ('trainer',),
+}
+# URL kwarg 'pk' of detail routes -> sample attribute
+SAMPLE_KWARGS = {
+    'user-detail': 'member_id',
+    'members-detail': 'member_id',
+    'trainer-detail': 'trainer_id',
+    'programs-detail': 'program_id',
+    'assignments-detail': 'assignment_id',
+    'sessions-detail': 'program_id',  # sessions are still served from the trainer's programs
+    'gym-update': 'gym_id',
+    'gym-working-hours': 'gym_id',
+}
+SAMPLE_PARAMS = {
+    'programs-assigned-members': {'program_id': 'program_id'},
+}
+SKIPPED_ROUTES = {'api-root', 'metrics'}
+
+
+def _get_capable(callback):
+    actions = getattr(callback, 'actions', None)
+    if actions is not None:
+        return 'get' in actions
+    view_class = getattr(callback, 'cls', None) or getattr(callback, 'view_class', None)
+    return view_class is not None and hasattr(view_class, 'get')
+
+
+def discover_routes(patterns=None):
+    """[(name, kwarg names)] of the named GET routes, skipping format-suffix duplicates"""
+    routes, seen = [], set()
+
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                walk(pattern.url_patterns)
+            elif isinstance(pattern, URLPattern) and pattern.name:
+                kwargs = tuple(sorted(pattern.pattern.regex.groupindex))
+                if 'format' in kwargs or pattern.name in seen or pattern.name in SKIPPED_ROUTES:
+                    continue
+                if pattern.name.startswith('admin') or not _get_capable(pattern.callback):
+                    continue
+                seen.add(pattern.name)
+                routes.append((pattern.name, kwargs))
+
+    walk(get_resolver().url_patterns if patterns is None else patterns)
+    return routes
+
+
+def fit_exponent(sizes, latencies):
+    """Least-squares b in latency ~ a * size**b (None for fewer than two usable points)"""
+    points = [(math.log(n), math.log(t)) for n, t in zip(sizes, latencies) if n > 0 and t and t > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    if not spread:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+
+
+def classify(exponent):
+    if exponent is None:
+        return 'n/a'
+    if exponent < 0.15:
+        return 'O(1)'
+    if exponent < 0.6:
+        return 'sublinear'
+    if exponent < 1.4:
+        return 'O(N)'
+    return f'O(N^{exponent:.1f})'
+
+
+class Sample:
+    """Accounts and rows the routes are called with, re-picked at each size"""
+
+    def __init__(self, users):
+        from gym_info.models import GymInfo
+        from members.models import Member
+        from programs.models import Program, ProgramAssignment
+
+        self.owner = users.filter(role='owner', is_staff=True).first() or users.filter(role='owner').first()
+        # The busiest trainer and most-enrolled program are the worst cases
+        busiest = (Member.objects.exclude(primary_trainer=None).values('primary_trainer')
+                   .annotate(members=Count('id')).order_by('-members').first())
+        self.trainer = users.get(pk=busiest['primary_trainer']) if busiest else users.filter(role='trainer').first()
+        members = users.filter(role='member', is_active=True)
+        self.member = members.filter(assigned_programs__program__trainer=self.trainer).first() or members.first()
+        program = (Program.objects.filter(trainer=self.trainer).annotate(members=Count('assignments'))
+                   .order_by('-members').first())
+        self.program_id = program.pk if program else 0
+        self.member_id = self.member.pk if self.member else 0
+        self.trainer_id = self.trainer.pk if self.trainer else 0
+        self.assignment_id = ProgramAssignment.objects.filter(member=self.member).values_list('pk', flat=True).first() or 0
+        self.gym_id = GymInfo.objects.values_list('pk', flat=True).first() or 0
+
+    def account(self, role):
+        return {'owner': self.owner, 'trainer': self.trainer, 'member': self.member}[role]
+
+
+def clear_response_caches():
+    """Drop in-process response caches so each call measures the cold path"""
+    from gym_info.dashboard_stats import dashboard_stats_memo
+    from gym_info.public_cache import public_gym_cache
+    from programs.serializers import program_representation_cache
+    from users.dashboard_cache import dashboard_cache
+
+    dashboard_cache.clear()
+    program_representation_cache.clear()
+    public_gym_cache.invalidate()
+    dashboard_stats_memo.invalidate()
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def measure_routes(routes, sample, repeat=5, cold=True, max_seconds=5.0):
+    """{(name, role): {'path', 'status', 'queries', 'ms'}} at the current database size"""
+    from users.tokens import refresh_token_for
+
+    client = Client()
+    tokens = {}
+    results = {}
+    for name, kwargs in routes:
+        path = reverse(name, kwargs={key: getattr(sample, SAMPLE_KWARGS[name]) for key in kwargs})
+        params = {key: getattr(sample, attr) for key, attr in SAMPLE_PARAMS.get(name, {}).items()}
+        for role in ROLE_VARIANTS.get(name, ('owner',)):
+            user = sample.account(role)
+            if user is None:
+                continue
+            if role not in tokens:
+                tokens[role] = f'Bearer {refresh_token_for(user).access_token}'
+            headers = {'HTTP_AUTHORIZATION': tokens[role]}
+
+            if cold:
+                clear_response_caches()
+            queries = QueryCounter()
+            with connection.execute_wrapper(queries):
+                start = time.perf_counter()
+                response = client.get(path, params, **headers)
+                first = time.perf_counter() - start
+            timings = [first]
+            # A route already slower than max_seconds is not worth repeating at this size
+            for _ in range(repeat - 1 if first < max_seconds else 0):
+                if cold:
+                    clear_response_caches()
+                start = time.perf_counter()
+                client.get(path, params, **headers)
+                timings.append(time.perf_counter() - start)
+            results[(name, role)] = {
+                'path': path,
+                'status': response.status_code,
+                'queries': queries.count,
+                'ms': round(statistics.median(timings) * 1000, 3),
+            }
+    return results
+
+
+def build_report(sizes, measurements):
+    """
+    measurements: {size: measure_routes() result}.
+    Returns {'sizes', 'routes': [{'route', 'role', 'path', 'status', 'ms', 'queries', 'exponent',
+    'tail_exponent', 'class'}]}: routes that answered non-2xx first (class 'HTTP <status>',
+    no exponents), then slowest-growing first.
+    """
+    keys = sorted({key for result in measurements.values() for key in result})
+    rows = []
+    for name, role in keys:
+        points = [measurements[size].get((name, role)) for size in sizes]
+        ms = [point['ms'] if point else None for point in points]
+        exponent = fit_exponent(sizes, ms)
+        tail = fit_exponent(sizes[-2:], ms[-2:]) if len(sizes) >= 2 else None
+        last = next(point for point in reversed(points) if point)
+        failed = next((point['status'] for point in points if point and not 200 <= point['status'] < 300), None)
+        if failed is not None:
+            exponent = tail = None
+        rows.append({
+            'route': name,
+            'role': role,
+            'path': last['path'],
+            'status': last['status'],
+            'ms': ms,
+            'queries': [point['queries'] if point else None for point in points],
+            'exponent': None if exponent is None else round(exponent, 2),
+            'tail_exponent': None if tail is None else round(tail, 2),
+            'class': f'HTTP {failed}' if failed is not None else classify(tail if tail is not None else exponent),
+        })
+    # Failed routes first, then the fastest-growing
+    rows.sort(key=lambda row: (
+        not row['class'].startswith('HTTP'),
+        -(row['tail_exponent'] if row['tail_exponent'] is not None else -1),
+    ))
+    return {'sizes': list(sizes), 'routes': rows}
+
+
+def render_markdown(report):
+    sizes = report['sizes']
+    size_labels = [f'{size:,}' for size in sizes]
+    measured = f'{size_labels[0]}–{size_labels[-1]}'
+    tail_range = f'{size_labels[-2]}–{size_labels[-1]}' if len(sizes) > 1 else measured
+    lines = [
+        f"# Latency vs. data size ({', '.join(size_labels)} users)",
+        '',
+        'Median ms per call with response caches cleared; queries per call in brackets. '
+        'b: fitted exponent over all sizes; tail b: between the two largest (used for the class).',
+        f'Exponents and classes describe only the measured range ({measured} users); '
+        'they are not a prediction for larger tables.',
+        '',
+        '| route | role | status | ' + ' | '.join(f'{label} users' for label in size_labels)
+        + f' | b ({measured}) | tail b ({tail_range}) | class |',
+        '|---|---|---|' + '---:|' * len(sizes) + '---:|---:|---|',
+    ]
+    for row in report['routes']:
+        cells = [
+            '–' if ms is None else f'{ms:.1f} [{queries}]'
+            for ms, queries in zip(row['ms'], row['queries'])
+        ]
+        exponent = '–' if row['exponent'] is None else f"{row['exponent']:.2f}"
+        tail = '–' if row['tail_exponent'] is None else f"{row['tail_exponent']:.2f}"
+        lines.append(
+            f"| {row['route']} | {row['role']} | {row['status']} | " + ' | '.join(cells)
+            + f" | {exponent} | {tail} | {row['class']} |"
+        )
+    return '\n'.join(lines) + '\n'
@@ -20,6 +20,7 @@ INSTALLED_APPS = [
     'rest_framework',
     'corsheaders',
     'rest_framework_simplejwt',
+    'core',  # project-wide tooling: management commands and their tests
     'authapi',
     'users',
     'members',
@@ -28,15 +29,21 @@ INSTALLED_APPS = [
     'trainers',
 ]
 
+# Session, CSRF, session auth, messages and X-Frame-Options are skipped for paths
+# under API_PATH_PREFIX (JWT only); /admin/ keeps the full stack. See core.middleware.
+API_PATH_PREFIX = '/api/'
+
 MIDDLEWARE = [
+    'core.metrics.MetricsMiddleware',  # outermost so it times everything; off unless METRICS_ENABLED
+    'core.nplusone.NPlusOneMiddleware',  # DEBUG and tests only (see core.nplusone)
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.middleware.SiteSessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.SiteCsrfViewMiddleware',
+    'core.middleware.SiteAuthenticationMiddleware',
+    'core.middleware.SiteMessageMiddleware',
+    'core.middleware.SiteXFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -113,7 +120,7 @@ CORS_ALLOWED_ORIGINS = [
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',
@@ -136,12 +143,84 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    # Issue tokens with role/is_active/token-version claims (see users.tokens)
+    'TOKEN_OBTAIN_SERIALIZER': 'users.serializers.CustomTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.ClaimsTokenRefreshSerializer',
 }
 
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
 # Authentication Backends
+# EmailBackend subclasses ModelBackend (permissions included); chaining ModelBackend
+# after it would repeat the user lookup and password hash on every failed login.
 AUTHENTICATION_BACKENDS = [
     'users.backends.EmailBackend',
-    'django.contrib.auth.backends.ModelBackend',
-]
\ No newline at end of file
+]
+# Rendered /api/users/dashboard/ payloads kept per process (LRU, see users.dashboard_cache)
+DASHBOARD_CACHE_SIZE = 1024
+# Seconds the owner totals of /api/gym/dashboard_stats/ are memoized per process;
+# local writes drop them at once (see gym_info.dashboard_stats)
+DASHBOARD_STATS_TTL = 5
+
+# Rendered ProgramSerializer rows kept per process (LRU, see programs.serializers)
+PROGRAM_CACHE_SIZE = 10000
+
+# Public gym info and working hours cached per process (see gym_info.public_cache).
+# Local saves drop them at once; the TTL bounds staleness from other worker processes.
+GYM_INFO_CACHE_TTL = 60  # seconds
+# Cache-Control max-age of those responses; clients then revalidate with ETag/Last-Modified
+GYM_INFO_MAX_AGE = 60  # seconds
+
+# Password hashing process pool (see users.hashing). 0 workers hashes inline.
+PASSWORD_HASH_WORKERS = 2
+# Hash calls allowed to wait for a free worker before logins get 503 + Retry-After
+PASSWORD_HASH_MAX_QUEUE = 16
+PASSWORD_HASH_RETRY_AFTER = 1  # seconds
+PASSWORD_HASH_TIMEOUT = 30  # seconds
+
+# Verified access tokens kept per process (LRU, see users.authentication)
+JWT_VERIFIED_TOKEN_CACHE_SIZE = 10000
+# Seconds a user's token version is cached when the default cache is shared between
+# processes; with a process-local cache versions are read from the database (see users.tokens)
+TOKEN_VERSION_CACHE_TTL = 60
+
+# Refresh-token revocation store (see users.revocation)
+REVOCATION_BUCKET_SECONDS = 86400  # one Bloom filter per day of token expiry
+REVOCATION_BLOOM_CAPACITY = 250000  # revocations per bucket before the false-positive rate climbs
+REVOCATION_BLOOM_ERROR_RATE = 0.001
+REVOCATION_SYNC_INTERVAL = 1  # seconds between reads of other processes' revocations
+REVOCATION_SYNC_MARGIN = 60  # seconds each read looks back, for late commits and clock skew
+REVOCATION_COMPACT_INTERVAL = 3600  # seconds between deletes of expired rows
+
+# Login brute-force guard (see users.login_guard): failures per email / client IP
+# within a sliding window delay, then lock out, further attempts before any hashing
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'login_guard': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'login-guard',
+    },
+}
+LOGIN_GUARD_CACHE = 'login_guard'
+LOGIN_FAILURE_WINDOW = 900  # seconds
+LOGIN_EMAIL_FREE_FAILURES = 3
+LOGIN_EMAIL_LOCKOUT_FAILURES = 10
+LOGIN_IP_FREE_FAILURES = 20
+LOGIN_IP_LOCKOUT_FAILURES = 100
+LOGIN_DELAY_BASE = 1  # seconds; doubles with every failure past the free ones
+LOGIN_DELAY_MAX = 60
+
+# Per-route request/SQL metrics served in Prometheus format at /api/_metrics/ (see core.metrics).
+# Opt-in; the endpoint has no auth of its own, so keep it reachable only by the scraper.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '').lower() in ('1', 'true', 'yes')
+
+# N+1 query detection (see core.nplusone): on in DEBUG; the test runner makes it raise
+NPLUSONE_ENABLED = DEBUG
+NPLUSONE_ACTION = 'warn'  # or 'raise'
+NPLUSONE_THRESHOLD = 5  # repeats of one query shape allowed per request
+# Regexes matched against normalized SQL. QuerySet.delete() removes rows in chunks
+# of 100 by primary key, which repeats one DELETE shape without being a lazy load.
+NPLUSONE_IGNORE = [r'^DELETE FROM \S+ WHERE \S+ IN \(\.\.\.\)$']
+TEST_RUNNER = 'core.test_runner.NPlusOneDiscoverRunner'
@@ -0,0 +1,31 @@
+"""
+Settings profile for headless API nodes: DJANGO_SETTINGS_MODULE=core.settings_api
+
+No admin site, no messages framework and none of the browser middleware; every
+request is a JWT-authenticated API call. Serve /admin/ from nodes running
+core.settings.
+"""
+from .settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    app for app in INSTALLED_APPS
+    if app not in ('django.contrib.admin', 'django.contrib.messages')
+]
+
+MIDDLEWARE = [
+    'core.metrics.MetricsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'context_processors': [
+            processor for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+            if processor != 'django.contrib.messages.context_processors.messages'
+        ],
+    },
+}]
@@ -0,0 +1,11 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class NPlusOneDiscoverRunner(DiscoverRunner):
+    """Test runner that fails any request running one query shape more than NPLUSONE_THRESHOLD times"""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        settings.NPLUSONE_ENABLED = True
+        settings.NPLUSONE_ACTION = 'raise'
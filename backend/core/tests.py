@@ -0,0 +1,214 @@
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from members.models import Member
+from programs.models import Program, ProgramAssignment
+from programs.serializers import ProgramAssignmentSerializer
+from users.dashboard_cache import dashboard_cache
+from .loadtest import LoadTest, compare, percentile, summarize
+from .management.commands.loadtest import Command as LoadTestCommand
+from .metrics import registry
+from .nplusone import NPlusOneError, detect_nplusone, normalize_sql
+from .scaling import Sample, build_report, classify, discover_routes, fit_exponent, measure_routes, render_markdown
+
+User = get_user_model()
+
+
+@override_settings(METRICS_ENABLED=True)
+class MetricsEndpointTests(TestCase):
+    """Requests are recorded per URL name and exported in Prometheus text format"""
+
+    def setUp(self):
+        registry.clear()
+
+    def test_route_metrics(self):
+        for _ in range(2):
+            self.assertEqual(self.client.get('/api/gym/dashboard_stats/').status_code, 200)
+        stats = registry.snapshot('gym-dashboard-stats')
+        self.assertEqual(stats.count, 2)
+        self.assertGreater(stats.queries, 0)
+        self.assertGreater(stats.sql_seconds, 0)
+        self.assertGreater(stats.render_seconds, 0)
+
+        body = self.client.get('/api/_metrics/').content.decode()
+        self.assertIn('musclefit_http_requests_total{route="gym-dashboard-stats",method="GET",status="200"} 2', body)
+        self.assertIn('musclefit_http_request_duration_seconds_count{route="gym-dashboard-stats",method="GET"} 2', body)
+        self.assertIn('musclefit_login_guard_rejected ', body)
+
+    def test_serializer_data_is_timed_once(self):
+        owner = User.objects.create_user(
+            email='owner@test.fit', username='owner@test.fit', password='pass1234', role='owner'
+        )
+        client = APIClient()
+        client.force_authenticate(owner)
+        dashboard_cache.clear()
+        self.assertEqual(client.get('/api/users/dashboard/')['X-Dashboard-Cache'], 'MISS')
+        stats = registry.snapshot('dashboard')
+        self.assertGreater(stats.serialize_seconds, 0)
+        self.assertLess(stats.serialize_seconds, stats.latency_sum)
+
+        body = self.client.get('/api/_metrics/').content.decode()
+        self.assertIn('musclefit_serialization_seconds_total{route="dashboard",method="GET"}', body)
+        self.assertIn('musclefit_render_seconds_total{route="dashboard",method="GET"}', body)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled_by_default(self):
+        self.assertEqual(self.client.get('/api/_metrics/').status_code, 404)
+
+
+class NPlusOneDetectorTests(TestCase):
+    """Repeated query shapes are reported with the serializer field that caused them"""
+
+    def setUp(self):
+        self.trainer = User.objects.create_user(
+            email='trainer@test.fit', username='trainer@test.fit', password='pass1234', role='trainer'
+        )
+        self.program = Program.objects.create(
+            trainer=self.trainer, name='Program', program_type='cardio', description='',
+            duration_weeks=8, difficulty_level='beginner', price=1000,
+        )
+        password = make_password('pass1234')
+        members = User.objects.bulk_create([
+            User(email=f'm{i}@test.fit', username=f'm{i}@test.fit', password=password, role='member')
+            for i in range(10)
+        ])
+        Member.objects.bulk_create([Member(user=member, primary_trainer=self.trainer) for member in members])
+        ProgramAssignment.objects.bulk_create([
+            ProgramAssignment(program=self.program, member=member, price=self.program.price) for member in members
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(self.trainer)
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE id = 12 AND name = 'it''s' AND x IN (1, 2, 3)  LIMIT 21"),
+            'SELECT * FROM t WHERE id = ? AND name = ? AND x IN (...) LIMIT ?',
+        )
+
+    def test_lazy_loads_in_a_loop_are_reported(self):
+        with self.assertRaises(NPlusOneError) as ctx:
+            with detect_nplusone('assignments', action='raise'):
+                ProgramAssignmentSerializer(ProgramAssignment.objects.all(), many=True).data
+        self.assertIn('ProgramAssignmentSerializer.member_name', str(ctx.exception))
+
+    def test_list_endpoints_pass_the_detector(self):
+        # The test runner makes the request middleware raise on N+1s
+        response = self.client.get('/api/programs/assigned_members/', {'program_id': self.program.pk})
+        self.assertEqual(len(response.data), 10)
+        response = self.client.get('/api/members/')
+        self.assertEqual(len(response.data['results']), 10)
+        response = self.client.post(
+            f'/api/programs/{self.program.pk}/assign_member/', {'member_id': 999999}, format='json'
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'], PASSWORD_HASH_WORKERS=0)
+class LoadTestHarnessTests(TestCase):
+    """The load-test mix runs clean and reproducibly; baselines flag real regressions only"""
+
+    def setUp(self):
+        caches['login_guard'].clear()
+        # Also creates the owner and the gym info the public calls read
+        call_command('seed_gym', members=6, trainers=2, programs=4, password='pass1234', stdout=StringIO())
+        self.accounts = LoadTestCommand().accounts(per_role=10)
+        self.sent = []
+
+    def transport(self, method, path, headers, body):
+        self.sent.append((method, path, headers.get('Authorization')))
+        extra = {'HTTP_AUTHORIZATION': headers['Authorization']} if 'Authorization' in headers else {}
+        data = json.dumps(body) if body is not None else ''
+        return self.client.generic(method, path, data, content_type='application/json', **extra).status_code
+
+    def run_mix(self, seed=1):
+        load_test = LoadTest(self.transport, self.accounts, requests=150, concurrency=1, seed=seed, password='pass1234')
+        return load_test.run()
+
+    def test_every_call_in_the_mix_succeeds(self):
+        results = self.run_mix()
+        self.assertEqual(results['total']['count'], 150)
+        self.assertEqual({name: stats['errors'] for name, stats in results['routes'].items() if stats['errors']}, {})
+        self.assertIn('dashboard', results['routes'])
+        self.assertIn('login', results['routes'])
+
+    def test_same_seed_replays_same_calls(self):
+        self.run_mix(seed=7)
+        first, self.sent = self.sent, []
+        self.run_mix(seed=7)
+        self.assertEqual(first, self.sent)
+
+    def test_percentiles(self):
+        values = [i / 1000 for i in range(1, 101)]
+        self.assertEqual(percentile(values, 0.5), 0.05)
+        self.assertEqual(percentile(values, 0.99), 0.099)
+        stats = summarize([('a', 200, v) for v in values] + [('a', 500, 0.2)], wall=1.0)['routes']['a']
+        self.assertEqual((stats['count'], stats['errors'], stats['p95_ms']), (101, 1, 96.0))
+
+    def test_compare_against_baseline(self):
+        def route(p95, errors=0, count=100):
+            return {'count': count, 'errors': errors, 'rps': 1.0, 'p50_ms': p95 / 2, 'p95_ms': p95, 'p99_ms': p95}
+
+        baseline = {'routes': {'slow': route(10), 'noise': route(1), 'rare': route(10, count=3), 'broken': route(5)}}
+        results = {'routes': {'slow': route(20), 'noise': route(2), 'rare': route(50, count=3), 'broken': route(5, 4)}}
+        regressions = dict(compare(results, baseline, tolerance=0.25, min_delta_ms=2.0))
+        self.assertEqual(set(regressions), {'slow', 'broken'})
+        self.assertIn('+100%', regressions['slow'])
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ScalingBenchmarkTests(TestCase):
+    """bench_scaling finds every GET route, measures it per role and fits growth exponents"""
+
+    def test_discovers_get_routes_only(self):
+        names = {name for name, _ in discover_routes()}
+        self.assertTrue({
+            'gym-list', 'gym-dashboard-stats', 'gym-membership-growth', 'dashboard',
+            'members-list', 'programs-list', 'programs-detail', 'user-list',
+        } <= names)
+        self.assertFalse(names & {'contact-create', 'members-create-member', 'login', 'token_obtain_pair', 'api-root'})
+
+    def test_fit_and_classify(self):
+        sizes = [1000, 10000, 100000]
+        self.assertAlmostEqual(fit_exponent(sizes, [2.0, 2.0, 2.0]), 0.0)
+        self.assertAlmostEqual(fit_exponent(sizes, [1.0, 10.0, 100.0]), 1.0)
+        self.assertAlmostEqual(fit_exponent(sizes, [1.0, 100.0, 10000.0]), 2.0)
+        self.assertIsNone(fit_exponent(sizes, [None, None, 3.0]))
+        self.assertEqual([classify(b) for b in (0.05, 0.4, 1.0, 2.0)], ['O(1)', 'sublinear', 'O(N)', 'O(N^2.0)'])
+
+    def test_measures_routes_and_builds_report(self):
+        User.objects.create_user(email='owner@test.fit', username='owner@test.fit', role='owner', is_staff=True)
+        routes = [route for route in discover_routes() if route[0] in ('dashboard', 'programs-detail', 'gym-list')]
+        measurements = {}
+        for size, prefix in ((100, 'a'), (300, 'b')):
+            call_command('seed_gym', members=size, trainers=3, programs=6, prefix=prefix, stdout=StringIO())
+            measurements[size] = measure_routes(routes, Sample(User.objects.all()), repeat=2)
+
+        self.assertEqual(len(measurements[300]), 5)  # dashboard as owner, trainer and member
+        self.assertEqual({result['status'] for result in measurements[300].values()}, {200})
+        report = build_report([100, 300], measurements)
+        row = next(row for row in report['routes'] if (row['route'], row['role']) == ('dashboard', 'member'))
+        self.assertEqual(len(row['ms']), 2)
+        self.assertGreater(row['queries'][-1], 0)
+        markdown = render_markdown(report)
+        self.assertIn('| dashboard | member | 200 |', markdown)
+        self.assertIn('| b (100–300) | tail b (100–300) |', markdown)
+
+    def test_every_route_answers_its_sample(self):
+        User.objects.create_user(email='owner@test.fit', username='owner@test.fit', role='owner', is_staff=True)
+        call_command('seed_gym', members=30, trainers=2, programs=4, stdout=StringIO())
+        results = measure_routes(discover_routes(), Sample(User.objects.all()), repeat=1)
+        self.assertEqual(
+            {key: result['path'] for key, result in results.items() if result['status'] != 200}, {}
+        )
+
+    def test_non_2xx_routes_are_not_classified(self):
+        point = {'path': '/api/x/', 'status': 404, 'queries': 0, 'ms': 1.0}
+        report = build_report([100, 300], {100: {('x', 'owner'): point}, 300: {('x', 'owner'): point}})
+        row = report['routes'][0]
+        self.assertEqual((row['class'], row['exponent'], row['tail_exponent']), ('HTTP 404', None, None))
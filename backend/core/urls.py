@@ -5,6 +5,7 @@ from django.conf.urls.static import static
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from core.metrics import metrics_view
 
 class RootView(APIView):
     """Root API endpoint"""
@@ -23,12 +24,14 @@ class RootView(APIView):
 
 urlpatterns = [
     path('', RootView.as_view(), name='root'),
-    path('admin/', admin.site.urls),
     
     # JWT Authentication
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     
+    # Prometheus metrics (404 unless METRICS_ENABLED)
+    path('api/_metrics/', metrics_view, name='metrics'),
+    
     # Auth endpoints
     path('api/auth/', include('authapi.urls')),
     
@@ -40,6 +43,10 @@ urlpatterns = [
     path('api/gym/', include('gym_info.urls')),
 ]
 
+# Headless API nodes (core.settings_api) run without the admin site
+if 'django.contrib.admin' in settings.INSTALLED_APPS:
+    urlpatterns.append(path('admin/', admin.site.urls))
+
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
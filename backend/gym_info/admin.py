@@ -1,9 +1,15 @@
 from django.contrib import admin
-from .models import GymInfo, WorkingHours, ContactMessage
+from .dashboard_stats import invalidate_dashboard_stats
+from .models import GymInfo, WorkingHours, ContactMessage, GymCounter
+
+class WorkingHoursInline(admin.TabularInline):
+    model = WorkingHours
+    extra = 0
 
 @admin.register(GymInfo)
 class GymInfoAdmin(admin.ModelAdmin):
-    list_display = ('name', 'city', 'phone', 'email')
+    list_display = ('name', 'city', 'phone', 'email', 'updated_at')
+    inlines = [WorkingHoursInline]
     fieldsets = (
         ('Basic Info', {
             'fields': ('name', 'email', 'phone', 'whatsapp', 'established_year')
@@ -23,10 +29,6 @@ class GymInfoAdmin(admin.ModelAdmin):
         }),
     )
 
-class WorkingHoursInline(admin.TabularInline):
-    model = WorkingHours
-    extra = 0
-
 admin.site.register(WorkingHours)
 
 @admin.register(ContactMessage)
@@ -39,11 +41,20 @@ class ContactMessageAdmin(admin.ModelAdmin):
     
     def mark_as_read(self, request, queryset):
         queryset.update(is_read=True)
+        invalidate_dashboard_stats()  # .update() sends no signals
         self.message_user(request, f'{queryset.count()} message(s) marked as read.')
     
     def mark_as_unread(self, request, queryset):
         queryset.update(is_read=False)
+        invalidate_dashboard_stats()
         self.message_user(request, f'{queryset.count()} message(s) marked as unread.')
     
     mark_as_read.short_description = "Mark selected messages as read"
     mark_as_unread.short_description = "Mark selected messages as unread"
+
+
+@admin.register(GymCounter)
+class GymCounterAdmin(admin.ModelAdmin):
+    list_display = ('name', 'value', 'updated_at')
+    search_fields = ('name',)
+    readonly_fields = ('updated_at',)
@@ -3,3 +3,9 @@ from django.apps import AppConfig
 class GymInfoConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'gym_info'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
+        from core.metrics import registry
+        from .public_cache import public_gym_cache
+        registry.register_collector('public_gym_cache', public_gym_cache.stats)
@@ -0,0 +1,270 @@
+"""
+Denormalized gym-wide counters.
+
+Dashboards read these instead of running COUNT(*) over auth_user on every hit.
+Each counter name maps to the live queryset it mirrors:
+
+    trainers / active_trainers      users with role='trainer' (and is_active)
+    members / active_members        users with role='member' (and is_active)
+    new_members:<YYYY-MM>           members created in that calendar month (UTC)
+    trainer_members:<trainer id>    members whose primary_trainer is that trainer
+    revenue:<YYYY-MM>               sum of ProgramAssignment.price assigned in that
+                                    month (UTC), in paise
+
+Counters are adjusted by the signal handlers in gym_info.signals (and by
+adjust_revenue() where assignments are bulk-created). Inside batched_adjustments()
+the adjustments and version bumps of a multi-row write, e.g. the per-row
+post_delete signals of QuerySet.delete(), are summed and applied once per
+counter when the block ends. A counter that
+has no row yet is seeded from its live count on first use, and
+`manage.py rebuild_counters` recomputes (or just checks) all of them.
+
+live_counts() computes any set of counters in at most one query per source
+table: the user counters as a single conditional aggregate (COUNT ... FILTER),
+which SQLite and Postgres answer from user_role_active_created_idx alone.
+
+Rows named 'version:<name>' are change stamps rather than counts (see
+get_version/bump_version); they have no live equivalent and are never rebuilt.
+"""
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from users.models import User
+from .models import GymCounter
+
+STATIC_COUNTERS = ('trainers', 'active_trainers', 'members', 'active_members')
+VERSION_PREFIX = 'version:'
+
+
+def _month(moment):
+    return f'{timezone.localtime(moment or timezone.now(), dt_timezone.utc):%Y-%m}'
+
+
+def _month_range(month):
+    """[start, end) of a 'YYYY-MM' month in UTC"""
+    start = datetime.strptime(month, '%Y-%m').replace(tzinfo=dt_timezone.utc)
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+
+def month_key(moment=None):
+    """'new_members:<YYYY-MM>' for the month containing `moment` (default: now)"""
+    return f'new_members:{_month(moment)}'
+
+
+def revenue_key(moment=None):
+    """'revenue:<YYYY-MM>' for the month containing `moment` (default: now)"""
+    return f'revenue:{_month(moment)}'
+
+
+def trainer_key(trainer_id):
+    return f'trainer_members:{trainer_id}'
+
+
+def to_paise(amount):
+    return int((Decimal(amount or 0) * 100).to_integral_value())
+
+
+def user_counter_names(role, is_active, created_at):
+    """Counters a user with this role/status/creation date contributes to"""
+    names = set()
+    if role == 'trainer':
+        names.add('trainers')
+        if is_active:
+            names.add('active_trainers')
+    elif role == 'member':
+        names.add('members')
+        if is_active:
+            names.add('active_members')
+        if created_at:
+            names.add(month_key(created_at))
+    return names
+
+
+USER_COUNTERS = {
+    'trainers': Q(role='trainer'),
+    'active_trainers': Q(role='trainer', is_active=True),
+    'members': Q(role='member'),
+    'active_members': Q(role='member', is_active=True),
+}
+
+
+def live_counts(names):
+    """Compute counters from the source tables: {name: value}"""
+    from programs.models import ProgramAssignment
+
+    names = set(names)
+    values = {}
+    user_filters, trainer_ids, revenue_filters = {}, {}, {}
+    for name in names:
+        prefix, _, arg = name.partition(':')
+        if name in USER_COUNTERS:
+            user_filters[name] = USER_COUNTERS[name]
+        elif prefix == 'new_members':
+            start, end = _month_range(arg)
+            user_filters[name] = Q(role='member', created_at__gte=start, created_at__lt=end)
+        elif prefix == 'trainer_members':
+            trainer_ids[int(arg)] = name
+        elif prefix == 'revenue':
+            start, end = _month_range(arg)
+            revenue_filters[name] = Q(assigned_at__gte=start, assigned_at__lt=end)
+        else:
+            raise ValueError(f'Unknown counter: {name}')
+
+    if user_filters:
+        # One pass over the (role, is_active, created_at) index for every user counter
+        aliases = {f'c{i}': name for i, name in enumerate(user_filters)}
+        row = User.objects.filter(role__in=('trainer', 'member')).aggregate(**{
+            alias: Count('id', filter=user_filters[name]) for alias, name in aliases.items()
+        })
+        values.update({name: row[alias] for alias, name in aliases.items()})
+    if trainer_ids:
+        counts = dict(
+            User.objects.filter(role='member', member_profile__primary_trainer_id__in=trainer_ids)
+            .values_list('member_profile__primary_trainer_id').annotate(n=Count('id')).order_by()
+        )
+        values.update({name: counts.get(trainer_id, 0) for trainer_id, name in trainer_ids.items()})
+    if revenue_filters:
+        aliases = {f'c{i}': name for i, name in enumerate(revenue_filters)}
+        row = ProgramAssignment.objects.aggregate(**{
+            alias: Sum('price', filter=revenue_filters[name]) for alias, name in aliases.items()
+        })
+        values.update({name: to_paise(row[alias]) for alias, name in aliases.items()})
+    return values
+
+
+def live_count(name):
+    return live_counts([name])[name]
+
+
+def _seed(name, value=None):
+    """Create the row for `name` from its live count (tolerates a concurrent seed)"""
+    try:
+        with transaction.atomic():
+            counter, _ = GymCounter.objects.get_or_create(
+                name=name, defaults={'value': live_count(name) if value is None else value}
+            )
+    except IntegrityError:
+        counter = GymCounter.objects.get(name=name)
+    return counter.value
+
+
+_batch = threading.local()
+
+
+@contextmanager
+def batched_adjustments():
+    """
+    Collect adjust() and bump_version() calls made in the block and apply them on a
+    clean exit: one UPDATE per counter however many rows were written. Use inside the
+    transaction of the write, so the counters commit or roll back with it.
+    """
+    if getattr(_batch, 'pending', None) is not None:
+        yield  # nested: the outermost block applies everything
+        return
+    _batch.pending = pending = {'deltas': defaultdict(int), 'versions': set()}
+    try:
+        yield
+    finally:
+        _batch.pending = None
+    for name, delta in pending['deltas'].items():
+        adjust(name, delta)
+    for name in sorted(pending['versions']):
+        bump_version(name)
+
+
+def get_counters(*names):
+    """Read several counters in one query, seeding any that are missing"""
+    values = dict(GymCounter.objects.filter(name__in=names).values_list('name', 'value'))
+    missing = [name for name in names if name not in values]
+    for name, live in live_counts(missing).items():
+        values[name] = _seed(name, live)
+    return values
+
+
+def get_counter(name):
+    return get_counters(name)[name]
+
+
+def adjust(name, delta):
+    """
+    Atomically add `delta` to a counter. If the counter has never been seeded,
+    seed it instead: the live count already includes the change being recorded.
+    """
+    if not delta:
+        return
+    pending = getattr(_batch, 'pending', None)
+    if pending is not None:
+        pending['deltas'][name] += delta
+        return
+    with transaction.atomic():
+        updated = GymCounter.objects.filter(name=name).update(
+            value=F('value') + delta, updated_at=timezone.now()
+        )
+        if not updated:
+            _seed(name)
+
+
+def adjust_revenue(rows, sign=1):
+    """Add (+1) or remove (-1) the revenue of (assigned_at, price) rows written in bulk, bypassing signals"""
+    totals = defaultdict(int)
+    for assigned_at, price in rows:
+        totals[revenue_key(assigned_at)] += to_paise(price)
+    for name, total in totals.items():
+        adjust(name, sign * total)
+
+
+def known_counter_names():
+    """Every counter worth checking: static ones, stored ones and the current month"""
+    names = set(STATIC_COUNTERS)
+    names.update((month_key(), revenue_key()))
+    names.update(GymCounter.objects.exclude(name__startswith=VERSION_PREFIX).values_list('name', flat=True))
+    names.update(trainer_key(pk) for pk in User.objects.filter(role='trainer').values_list('pk', flat=True))
+    return sorted(names)
+
+
+def rebuild_counters(fix=True):
+    """
+    Compare every known counter with its live count.
+    Returns {name: (stored, live)} for mismatches; stores the live values when `fix`.
+    Counters without a row are not drift (they seed on first read) but are
+    created when fixing, so the next dashboard hit doesn't pay for the COUNT.
+    """
+    mismatches = {}
+    stored = dict(GymCounter.objects.exclude(name__startswith=VERSION_PREFIX).values_list('name', 'value'))
+    for name, live in sorted(live_counts(known_counter_names()).items()):
+        if name in stored and stored[name] != live:
+            mismatches[name] = (stored[name], live)
+        if fix and stored.get(name) != live:
+            GymCounter.objects.update_or_create(name=name, defaults={'value': live})
+    return mismatches
+
+
+def get_version(name):
+    """Current change stamp for `name` (0 until first bumped)"""
+    value = GymCounter.objects.filter(name=VERSION_PREFIX + name).values_list('value', flat=True).first()
+    return value or 0
+
+
+def bump_version(name):
+    """Advance the change stamp for `name`; commits or rolls back with the caller's transaction"""
+    pending = getattr(_batch, 'pending', None)
+    if pending is not None:
+        pending['versions'].add(name)
+        return
+    key = VERSION_PREFIX + name
+    with transaction.atomic():
+        updated = GymCounter.objects.filter(name=key).update(value=F('value') + 1, updated_at=timezone.now())
+        if not updated:
+            try:
+                with transaction.atomic():
+                    GymCounter.objects.create(name=key, value=1)
+            except IntegrityError:
+                GymCounter.objects.filter(name=key).update(value=F('value') + 1, updated_at=timezone.now())
@@ -0,0 +1,78 @@
+"""
+Owner dashboard totals (/api/gym/dashboard_stats/), memoized per process.
+
+The totals come from gym_info.counters (one indexed read of the counters table)
+plus the unread ContactMessage count (an index range on contact_read_created_idx),
+so a miss costs two queries however many users there are. The result is kept for
+DASHBOARD_STATS_TTL seconds; any write that bumps the dashboard data version, and
+any contact message change, drops it at once in this process, so the TTL only
+bounds how long other worker processes may show the old totals.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from .counters import get_counters, month_key, revenue_key
+from .models import ContactMessage
+
+
+class StatsMemo:
+    """A single memoized value with a TTL"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._value = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, compute):
+        with self._lock:
+            if self._value is not None and time.monotonic() < self._expires_at:
+                self.hits += 1
+                return self._value
+            self.misses += 1
+            generation = self._generation
+        value = compute()
+        with self._lock:
+            # Don't store a value computed before an invalidation that raced with it
+            if generation == self._generation:
+                self._value = value
+                self._expires_at = time.monotonic() + getattr(settings, 'DASHBOARD_STATS_TTL', 5)
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._value = None
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+dashboard_stats_memo = StatsMemo()
+
+
+def invalidate_dashboard_stats():
+    """Drop the memo now and again on commit, when other requests can first see the change"""
+    dashboard_stats_memo.invalidate()
+    transaction.on_commit(dashboard_stats_memo.invalidate)
+
+
+def compute_dashboard_stats():
+    this_month, this_month_revenue = month_key(), revenue_key()
+    counts = get_counters('active_trainers', 'active_members', this_month, this_month_revenue)
+    return {
+        'active_trainers': counts['active_trainers'],
+        'active_members': counts['active_members'],
+        'new_members': counts[this_month],
+        'revenue': counts[this_month_revenue] / 100,
+        'unread_messages': ContactMessage.objects.filter(is_read=False).count(),
+    }
+
+
+def dashboard_stats():
+    return dashboard_stats_memo.get(compute_dashboard_stats)
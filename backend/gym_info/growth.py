@@ -0,0 +1,82 @@
+"""
+New-member counts per day, week (Monday first) or month, for the owner dashboard chart.
+
+One GROUP BY over created_at truncated to the bucket, then gaps are zero-filled in
+Python, so a year of daily buckets is one query rather than one COUNT per bucket.
+`is_active IN (true, false)` is always true but lets the database seek
+user_role_active_created_idx by (role, is_active, created_at range) instead of
+scanning every member.
+
+The requested range is widened to whole buckets (align) so the first and last
+buckets count every day they are labelled with, not just the days inside it.
+"""
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+
+from django.db.models import Count
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+from users.models import User
+
+TRUNCATE = {'day': TruncDay, 'week': TruncWeek, 'month': TruncMonth}
+# Zero-filling is linear in the number of buckets; longer ranges need a coarser granularity
+MAX_BUCKETS = 1000
+
+
+def bucket_start(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(start, granularity):
+    if granularity == 'week':
+        return start + timedelta(weeks=1)
+    if granularity == 'month':
+        return start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start + timedelta(days=1)
+
+
+def align(first, last, granularity):
+    """(first, last) widened to the first day of first's bucket and the last day of last's"""
+    return bucket_start(first, granularity), next_bucket(bucket_start(last, granularity), granularity) - timedelta(days=1)
+
+
+def buckets(first, last, granularity):
+    """Start dates of the buckets covering the days first..last"""
+    start = bucket_start(first, granularity)
+    while start <= last:
+        yield start
+        start = next_bucket(start, granularity)
+
+
+def bucket_count(first, last, granularity):
+    if granularity == 'week':
+        return (bucket_start(last, 'week') - bucket_start(first, 'week')).days // 7 + 1
+    if granularity == 'month':
+        return (last.year - first.year) * 12 + last.month - first.month + 1
+    return (last - first).days + 1
+
+
+def new_members(first, last, granularity='week'):
+    """[(bucket start date, members created that bucket)] for the UTC days first..last (inclusive), gaps as 0"""
+    since = datetime.combine(first, time.min, dt_timezone.utc)
+    until = datetime.combine(last + timedelta(days=1), time.min, dt_timezone.utc)
+    rows = (
+        User.objects.filter(role='member', is_active__in=(True, False), created_at__gte=since, created_at__lt=until)
+        .annotate(bucket=TRUNCATE[granularity]('created_at', tzinfo=dt_timezone.utc))
+        .values('bucket')
+        .annotate(members=Count('id'))
+        .order_by()
+    )
+    counts = {}
+    for row in rows:
+        bucket = row['bucket']
+        counts[bucket.date() if isinstance(bucket, datetime) else bucket] = row['members']
+    return [(start, counts.get(start, 0)) for start in buckets(first, last, granularity)]
+
+
+def parse_day(value, default):
+    """A YYYY-MM-DD query parameter as a date (ValueError if malformed)"""
+    return date.fromisoformat(value) if value else default
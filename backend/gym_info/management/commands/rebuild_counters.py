@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from gym_info.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized gym counters from live data (or only check them with --check)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Report counters that disagree with live data without fixing them; exit non-zero on drift',
+        )
+
+    def handle(self, *args, **options):
+        check_only = options['check']
+        mismatches = rebuild_counters(fix=not check_only)
+
+        for name, (stored, live) in mismatches.items():
+            self.stdout.write(f"  {name}: stored={stored} live={live}")
+
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS("✅ All counters match live data"))
+        elif check_only:
+            raise CommandError(f"{len(mismatches)} counter(s) out of date; run rebuild_counters to fix")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt {len(mismatches)} counter(s)"))
@@ -0,0 +1,209 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from gym_info.counters import get_counters, month_key, rebuild_counters, revenue_key
+from gym_info.models import GymInfo, WorkingHours
+from members.models import Member
+from programs.models import Program, ProgramAssignment
+from users.dashboard_cache import bump_dashboard_version
+from users.models import User
+
+# Programs per member: none, one, two or three, with these weights
+PROGRAMS_PER_MEMBER = ((0, 25), (1, 45), (2, 20), (3, 10))
+MEMBER_STATUSES = (('active', 85), ('inactive', 10), ('paused', 5))
+UNASSIGNED_MEMBER_SHARE = 0.05
+DAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+
+def zipf_weights(count, exponent, rng):
+    """Long-tailed popularity: a few trainers are far busier than most, in random order"""
+    weights = [1 / (rank + 1) ** exponent for rank in range(count)]
+    rng.shuffle(weights)
+    return weights
+
+
+def chunks(total, size):
+    for start in range(0, total, size):
+        yield start, min(size, total - start)
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk-create a synthetic gym for scale testing: trainers, programs, members and program '
+        'assignments, in chunks with one shared password hash'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--members', type=int, default=1000, help='Members to create (default 1000)')
+        parser.add_argument('--trainers', type=int, default=20, help='Trainers to create (default 20)')
+        parser.add_argument('--programs', type=int, default=100, help='Programs to create (default 100)')
+        parser.add_argument('--months', type=int, default=24, help='Spread sign-ups over this many months (default 24)')
+        parser.add_argument('--password', default='seed1234', help='Password of every seeded account (default seed1234)')
+        parser.add_argument('--prefix', default='seed', help="Email prefix, '<prefix>-member-<n>@muscle.fit' (default seed)")
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows per bulk insert (default 5000)')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed (default 1)')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.prefix = options['prefix']
+        self.chunk_size = options['chunk_size']
+        if options['trainers'] < 1 and (options['members'] or options['programs']):
+            raise CommandError('Members and programs need at least one trainer')
+        if User.objects.filter(email_normalized__startswith=f'{self.prefix}-'.lower()).exists():
+            raise CommandError(f"Accounts with prefix '{self.prefix}' already exist; pass another --prefix")
+
+        self.now = timezone.now()
+        self.start = self.now - timedelta(days=30 * options['months'])
+        # Hashing is the slow part of creating a user; every seeded account shares this one
+        self.password = make_password(options['password'])
+        started = time.perf_counter()
+        self.stdout.write(
+            f"\n=== Seeding gym: {options['trainers']} trainers, {options['programs']} programs, "
+            f"{options['members']} members ==="
+        )
+
+        self.ensure_gym()
+        trainer_ids = self.create_trainers(options['trainers'])
+        programs_by_trainer = self.create_programs(trainer_ids, options['programs'])
+        members, assignments, months = self.create_members(trainer_ids, programs_by_trainer, options['members'])
+
+        # bulk_create skips the signals that keep counters and dashboard caches current
+        self.stdout.write("  rebuilding counters...")
+        rebuild_counters()
+        get_counters(*sorted(months))
+        bump_dashboard_version()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Seeded {len(trainer_ids)} trainers, {options['programs']} programs, {members} members and "
+            f"{assignments} assignments in {time.perf_counter() - started:.1f}s "
+            f"(password: {options['password']})"
+        ))
+
+    def email(self, role, n):
+        return f'{self.prefix}-{role}-{n}@muscle.fit'
+
+    def user(self, role, n, created_at, is_active=True):
+        email = self.email(role, n)
+        return User(
+            email=email, username=email, password=self.password, role=role, is_active=is_active,
+            first_name=role.capitalize(), last_name=str(n), created_at=created_at,
+        )
+
+    def signup_time(self):
+        # Density grows linearly towards today, like a gym that keeps gaining members
+        return self.start + (self.now - self.start) * self.rng.random() ** 0.5
+
+    def ensure_gym(self):
+        """The load-test mix reads gym info; create it (and an owner) if the database has none"""
+        if not User.objects.filter(role='owner').exists():
+            self.bulk_create_backdated(User, [self.user('owner', 0, self.start)], 'created_at')
+            self.stdout.write(f"  owner: {self.email('owner', 0)}")
+        if not GymInfo.objects.exists():
+            gym = GymInfo.objects.create(
+                email='hello@muscle.fit', phone='0000000000', address='1 Seed Street',
+                city='Seedville', state='Seed State', postal_code='00000',
+            )
+            WorkingHours.objects.bulk_create([
+                WorkingHours(gym=gym, day=day, opening_time='06:00', closing_time='22:00', is_closed=day == 'Sunday')
+                for day in DAYS
+            ])
+
+    def create_trainers(self, count):
+        trainers = [self.user('trainer', n, self.start + (self.now - self.start) * self.rng.random() / 2)
+                    for n in range(count)]
+        with transaction.atomic():
+            created = self.bulk_create_backdated(User, trainers, 'created_at')
+        return self.ids(created)
+
+    def create_programs(self, trainer_ids, count):
+        """Programs spread over trainers with a flatter long tail than members; returns {trainer id: [ids]}"""
+        weights = zipf_weights(len(trainer_ids), 0.5, self.rng)
+        owners = list(trainer_ids[:count])  # every trainer gets one before the tail is handed out
+        owners += self.rng.choices(trainer_ids, weights, k=count - len(owners))
+        types = [key for key, _ in Program.PROGRAM_TYPES]
+        levels = ('beginner', 'intermediate', 'advanced')
+        programs_by_trainer = {trainer_id: [] for trainer_id in trainer_ids}
+        self.program_prices = {}
+        for start, size in chunks(count, self.chunk_size):
+            batch = []
+            for n in range(start, start + size):
+                created_at = self.start + (self.now - self.start) * self.rng.random()
+                batch.append(Program(
+                    trainer_id=owners[n], name=f'{self.prefix} program {n}', program_type=self.rng.choice(types),
+                    description='Seeded program', duration_weeks=self.rng.choice((4, 6, 8, 12, 16)),
+                    difficulty_level=self.rng.choice(levels), price=Decimal(self.rng.randrange(999, 14999, 500)),
+                    is_active=self.rng.random() < 0.9, created_at=created_at,
+                ))
+            with transaction.atomic():
+                for program in self.bulk_create_backdated(Program, batch, 'created_at'):
+                    programs_by_trainer[program.trainer_id].append(program.pk)
+                    self.program_prices[program.pk] = program.price
+        return programs_by_trainer
+
+    def create_members(self, trainer_ids, programs_by_trainer, count):
+        """Members in chunks, each with its profile and program assignments; only one chunk is in memory"""
+        weights = zipf_weights(len(trainer_ids), 0.8, self.rng)
+        statuses, status_weights = zip(*MEMBER_STATUSES)
+        program_counts, count_weights = zip(*PROGRAMS_PER_MEMBER)
+        assignments = 0
+        months = set()
+        for start, size in chunks(count, self.chunk_size):
+            users = []
+            member_statuses = self.rng.choices(statuses, status_weights, k=size)
+            for n, status in zip(range(start, start + size), member_statuses):
+                users.append(self.user('member', n, self.signup_time(), is_active=status != 'inactive'))
+            with transaction.atomic():
+                member_ids = self.ids(self.bulk_create_backdated(User, users, 'created_at'))
+                profiles, links = [], []
+                for user, member_id, status in zip(users, member_ids, member_statuses):
+                    months.add(month_key(user.created_at))
+                    trainer_id = None
+                    if self.rng.random() >= UNASSIGNED_MEMBER_SHARE:
+                        trainer_id = self.rng.choices(trainer_ids, weights)[0]
+                    profiles.append(Member(
+                        user_id=member_id, primary_trainer_id=trainer_id, joining_date=user.created_at, status=status,
+                    ))
+                    # Members follow programs from their own trainer, assigned within a month of joining
+                    offered = programs_by_trainer.get(trainer_id, ())
+                    wanted = min(self.rng.choices(program_counts, count_weights)[0], len(offered))
+                    for program_id in self.rng.sample(offered, wanted):
+                        assigned_at = min(user.created_at + timedelta(days=self.rng.random() * 30), self.now)
+                        months.add(revenue_key(assigned_at))
+                        links.append(ProgramAssignment(
+                            program_id=program_id, member_id=member_id, assigned_at=assigned_at,
+                            price=self.program_prices[program_id],
+                        ))
+                self.bulk_create_backdated(Member, profiles, 'joining_date')
+                self.bulk_create_backdated(ProgramAssignment, links, 'assigned_at')
+            assignments += len(links)
+            self.stdout.write(f"  members {start + size}/{count}")
+        return count, assignments, months
+
+    def bulk_create_backdated(self, model, objs, field):
+        """
+        bulk_create `objs`, then write back the historical values of their auto_now_add
+        `field`, which the insert stamps with now(); returns the created objects
+        """
+        values = [getattr(obj, field) for obj in objs]
+        created = model.objects.bulk_create(objs, batch_size=self.chunk_size)
+        if model is User:
+            for user, pk in zip(created, self.ids(created)):
+                user.pk = pk
+        for obj, value in zip(created, values):
+            setattr(obj, field, value)
+        model.objects.bulk_update(created, [field], batch_size=self.chunk_size)
+        return created
+
+    def ids(self, created):
+        """Primary keys of bulk-created users, looked up by email where the backend can't return them"""
+        if all(user.pk is not None for user in created):
+            return [user.pk for user in created]
+        emails = [user.email for user in created]
+        by_email = dict(User.objects.filter(email__in=emails).values_list('email', 'pk'))
+        return [by_email[email] for email in emails]
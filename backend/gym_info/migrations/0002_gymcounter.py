@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-17 11:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gym_info', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GymCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Gym Counter',
+                'verbose_name_plural': 'Gym Counters',
+                'ordering': ['name'],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-17 16:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gym_info', '0002_gymcounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gyminfo',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='workinghours',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gym_info', '0003_gym_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['is_read', 'created_at'], name='contact_read_created_idx'),
+        ),
+    ]
@@ -15,6 +15,8 @@ class GymInfo(models.Model):
     hero_image = models.ImageField(upload_to='gym/', blank=True, null=True)
     description = models.TextField(blank=True)
     established_year = models.IntegerField(blank=True, null=True)
+    # Last-Modified of the public gym info (see gym_info.public_cache)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name = 'Gym Info'
@@ -39,6 +41,7 @@ class WorkingHours(models.Model):
     opening_time = models.TimeField()
     closing_time = models.TimeField()
     is_closed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['day']
@@ -58,8 +61,29 @@ class ContactMessage(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        # Unread count on the owner dashboard and the unread listing
+        indexes = [
+            models.Index(fields=['is_read', 'created_at'], name='contact_read_created_idx'),
+        ]
         verbose_name = 'Contact Message'
         verbose_name_plural = 'Contact Messages'
     
     def __str__(self):
         return f"{self.name} - {self.subject}"
+
+class GymCounter(models.Model):
+    """
+    Denormalized gym-wide count (e.g. 'active_members', 'new_members:2026-01').
+    Kept current by gym_info.signals; see gym_info.counters for the definitions.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['name']
+        verbose_name = 'Gym Counter'
+        verbose_name_plural = 'Gym Counters'
+    
+    def __str__(self):
+        return f"{self.name} = {self.value}"
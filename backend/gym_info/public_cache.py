@@ -0,0 +1,188 @@
+"""
+Per-process cache of the public gym payloads: gym info and the weekly working hours.
+
+Every landing-page visitor reads these, and they change a few times a year. Each
+payload is serialized once together with a strong ETag (hash of its JSON) and
+Last-Modified (the rows' updated_at), so the views answer repeat visitors with
+304 Not Modified without touching the database.
+
+Entries are dropped in this process as soon as a GymInfo or WorkingHours row is
+saved or deleted (gym_info.signals; covers update_gym_info and the admin), and
+are rebuilt at least every GYM_INFO_CACHE_TTL seconds so edits made by other
+worker processes show up within that window.
+
+The working hours also carry an "open now" answer. The week is precomputed as
+sorted opening intervals, so the answer is a bisect on the current second of
+the week; it is kept (with its own ETag) until the next opening or closing.
+"""
+import bisect
+import hashlib
+import json
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from core.lru import LRUCache
+
+DAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+WEEK = 7 * 24 * 3600
+
+
+def _ttl():
+    return getattr(settings, 'GYM_INFO_CACHE_TTL', 60)
+
+
+def make_etag(data):
+    """Strong ETag: the same JSON body always gets the same tag"""
+    body = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return '"%s"' % hashlib.sha256(body.encode()).hexdigest()[:32]
+
+
+class Payload:
+    __slots__ = ('data', 'etag', 'last_modified', 'expires_at', 'valid_until')
+
+    def __init__(self, data, last_modified, expires_at, valid_until=None):
+        self.data = data
+        self.etag = make_etag(data)
+        self.last_modified = last_modified
+        self.expires_at = expires_at  # time.monotonic() deadline of the cache entry
+        self.valid_until = valid_until  # when the content itself changes (open/close), if ever
+
+
+def _seconds_of_week(value):
+    return value.weekday() * 86400 + value.hour * 3600 + value.minute * 60 + value.second
+
+
+class WeeklySchedule:
+    """Opening intervals in seconds since Monday 00:00, local time; closing at or before opening runs past midnight"""
+
+    def __init__(self, hours):
+        intervals = []
+        for row in hours:
+            if row.is_closed or row.day not in DAYS:
+                continue
+            day = DAYS.index(row.day) * 86400
+            opens = day + row.opening_time.hour * 3600 + row.opening_time.minute * 60
+            closes = day + row.closing_time.hour * 3600 + row.closing_time.minute * 60
+            if closes <= opens:
+                closes += 86400
+            intervals.append((opens, closes))
+            if closes > WEEK:
+                # Sunday night into Monday morning
+                intervals.append((opens - WEEK, closes - WEEK))
+        self.intervals = sorted(intervals)
+        self.starts = [opens for opens, _ in self.intervals]
+
+    def status(self, now):
+        """(open now, closes_at, opens_at, since, until): state at `now` and the instants it began and ends"""
+        local = timezone.localtime(now)
+        week_start = local.replace(microsecond=0) - timedelta(seconds=_seconds_of_week(local))
+        second = _seconds_of_week(local)
+        if not self.intervals:
+            return False, None, None, None, None
+
+        def at(seconds):
+            return week_start + timedelta(seconds=seconds)
+
+        i = bisect.bisect_right(self.starts, second) - 1
+        if i >= 0 and self.intervals[i][1] > second:
+            opens, closes = self.intervals[i]
+            return True, at(closes), None, at(opens), at(closes)
+        # Closed: next opening this week or the first one next week; last closing before now
+        following = self.starts[i + 1] if i + 1 < len(self.starts) else self.starts[0] + WEEK
+        previous = self.intervals[i][1] if i >= 0 else self.intervals[-1][1] - WEEK
+        return False, None, at(following), at(previous), at(following)
+
+
+class WorkingHoursPayload:
+    """The weekly hours plus the open-now answer, recomputed only when that answer changes"""
+
+    def __init__(self, gym_id, hours_data, schedule, last_modified, expires_at):
+        self.gym_id = gym_id
+        self.hours_data = hours_data
+        self.schedule = schedule
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+        self._lock = threading.Lock()
+        self._answer = None
+
+    def current(self, now):
+        with self._lock:
+            answer = self._answer
+            if answer is not None and (answer.valid_until is None or now < answer.valid_until):
+                return answer
+            open_now, closes_at, opens_at, since, until = self.schedule.status(now)
+            data = {
+                'gym': self.gym_id,
+                'timezone': settings.TIME_ZONE,
+                'hours': self.hours_data,
+                'open_now': open_now,
+                'closes_at': closes_at.isoformat() if closes_at else None,
+                'opens_at': opens_at.isoformat() if opens_at else None,
+            }
+            last_modified = max(filter(None, (self.last_modified, since)))
+            self._answer = Payload(data, last_modified, self.expires_at, until)
+            return self._answer
+
+
+class PublicGymCache:
+
+    def __init__(self):
+        self._entries = LRUCache(maxsize=64)
+        self.builds = 0
+
+    def _get(self, key, build):
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            return entry
+        entry = build(time.monotonic() + _ttl())
+        if entry is not None:
+            self.builds += 1
+            self._entries.set(key, entry)
+        return entry
+
+    def gym_info(self):
+        """Payload of the gym info (None if there is none)"""
+        from .models import GymInfo
+        from .serializers import GymInfoSerializer
+
+        def build(expires_at):
+            gym = GymInfo.objects.first()
+            if gym is None:
+                return None
+            return Payload(GymInfoSerializer(gym).data, gym.updated_at, expires_at)
+
+        return self._get(('info',), build)
+
+    def working_hours(self, gym_id):
+        """WorkingHoursPayload of the gym (None if there is no such gym)"""
+        from .models import GymInfo, WorkingHours
+        from .serializers import WorkingHoursSerializer
+
+        def build(expires_at):
+            gym_updated_at = GymInfo.objects.filter(pk=gym_id).values_list('updated_at', flat=True).first()
+            if gym_updated_at is None:
+                return None
+            hours = sorted(
+                WorkingHours.objects.filter(gym_id=gym_id),
+                key=lambda row: DAYS.index(row.day) if row.day in DAYS else len(DAYS),
+            )
+            last_modified = max([gym_updated_at] + [row.updated_at for row in hours])
+            return WorkingHoursPayload(
+                gym_id, WorkingHoursSerializer(hours, many=True).data, WeeklySchedule(hours), last_modified, expires_at,
+            )
+
+        return self._get(('hours', gym_id), build)
+
+    def invalidate(self):
+        self._entries.clear()
+
+    def stats(self):
+        return {**self._entries.stats(), 'builds': self.builds}
+
+
+public_gym_cache = PublicGymCache()
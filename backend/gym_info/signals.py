@@ -0,0 +1,141 @@
+"""
+Keep gym_info.counters in step with users.User and members.Member.
+
+pre_save snapshots the fields a counter depends on, post_save/post_delete apply
+the difference inside a transaction. For User the snapshot is the one taken by
+users.signals.snapshot_user (instance._pre_save_state), shared with token revocation. Queryset .update()/.bulk_create() bypass
+signals; run `manage.py rebuild_counters` after bulk edits.
+
+ProgramAssignment writes move the revenue:<month> counters by the assignment's
+price; ContactMessage writes drop the memoized owner dashboard totals
+(gym_info.dashboard_stats), whose other inputs bump the dashboard version.
+
+Also drop the cached public gym payloads (gym_info.public_cache) when the gym or
+its working hours change, again once the transaction commits so a concurrent
+request cannot re-cache the old rows in between.
+"""
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from members.models import Member
+from programs.models import ProgramAssignment
+from users.models import User
+from .counters import adjust, revenue_key, to_paise, trainer_key, user_counter_names
+from .dashboard_stats import invalidate_dashboard_stats
+from .models import ContactMessage, GymCounter, GymInfo, WorkingHours
+from .public_cache import public_gym_cache
+
+def _apply(old_names, new_names):
+    with transaction.atomic():
+        for name in new_names - old_names:
+            adjust(name, 1)
+        for name in old_names - new_names:
+            adjust(name, -1)
+
+
+def _is_member(user_id):
+    return User.objects.filter(pk=user_id, role='member').exists()
+
+
+@receiver(post_save, sender=User)
+def count_user_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    state = None if created else getattr(instance, '_pre_save_state', None)
+    if not created and state is None:
+        return
+    old = state and (state['role'], state['is_active'], state['created_at'])
+    old_names = user_counter_names(*old) if old else set()
+    new_names = user_counter_names(instance.role, instance.is_active, instance.created_at)
+    with transaction.atomic():
+        _apply(old_names, new_names)
+        # Becoming (or ceasing to be) a member moves the primary trainer's count too
+        if old and (old[0] == 'member') != (instance.role == 'member'):
+            trainer_id = (
+                Member.objects.filter(user=instance)
+                .values_list('primary_trainer_id', flat=True)
+                .first()
+            )
+            if trainer_id:
+                adjust(trainer_key(trainer_id), 1 if instance.role == 'member' else -1)
+
+
+@receiver(post_delete, sender=User)
+def count_user_delete(sender, instance, **kwargs):
+    with transaction.atomic():
+        _apply(user_counter_names(instance.role, instance.is_active, instance.created_at), set())
+        if instance.role == 'trainer':
+            # Members were detached with SET_NULL, which sends no signals
+            GymCounter.objects.filter(name=trainer_key(instance.pk)).delete()
+
+
+@receiver(pre_save, sender=Member)
+def snapshot_member(sender, instance, raw=False, **kwargs):
+    instance._counter_trainer_id = None
+    if raw or instance._state.adding or not instance.pk:
+        return
+    instance._counter_trainer_id = (
+        Member.objects.filter(pk=instance.pk)
+        .values_list('primary_trainer_id', flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Member)
+def count_member_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_trainer_id = None if created else instance._counter_trainer_id
+    new_trainer_id = instance.primary_trainer_id
+    if old_trainer_id == new_trainer_id or not _is_member(instance.user_id):
+        return
+    with transaction.atomic():
+        if old_trainer_id:
+            adjust(trainer_key(old_trainer_id), -1)
+        if new_trainer_id:
+            adjust(trainer_key(new_trainer_id), 1)
+
+
+@receiver(post_delete, sender=Member)
+def count_member_delete(sender, instance, **kwargs):
+    if instance.primary_trainer_id and _is_member(instance.user_id):
+        adjust(trainer_key(instance.primary_trainer_id), -1)
+
+
+@receiver(pre_save, sender=ProgramAssignment)
+def snapshot_assignment(sender, instance, raw=False, **kwargs):
+    instance._counter_price = None
+    if raw or instance._state.adding or not instance.pk:
+        return
+    instance._counter_price = (
+        ProgramAssignment.objects.filter(pk=instance.pk).values_list('price', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=ProgramAssignment)
+def count_assignment_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = 0 if created else to_paise(instance._counter_price)
+    adjust(revenue_key(instance.assigned_at), to_paise(instance.price) - old)
+
+
+@receiver(post_delete, sender=ProgramAssignment)
+def count_assignment_delete(sender, instance, **kwargs):
+    adjust(revenue_key(instance.assigned_at), -to_paise(instance.price))
+
+
+@receiver(post_save, sender=ContactMessage)
+@receiver(post_delete, sender=ContactMessage)
+def contact_message_changed(sender, **kwargs):
+    invalidate_dashboard_stats()
+
+
+@receiver(post_save, sender=GymInfo)
+@receiver(post_delete, sender=GymInfo)
+@receiver(post_save, sender=WorkingHours)
+@receiver(post_delete, sender=WorkingHours)
+def invalidate_public_gym_cache(sender, **kwargs):
+    public_gym_cache.invalidate()
+    transaction.on_commit(public_gym_cache.invalidate)
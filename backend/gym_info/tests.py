@@ -0,0 +1,325 @@
+from datetime import datetime, time, timezone as dt_timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, models
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from members.models import Member
+from programs.models import Program, ProgramAssignment
+from .counters import STATIC_COUNTERS, get_counters, live_counts, month_key, rebuild_counters, revenue_key, trainer_key
+from .dashboard_stats import dashboard_stats_memo
+from .models import ContactMessage, GymCounter, GymInfo, WorkingHours
+from .public_cache import DAYS, WeeklySchedule, public_gym_cache
+
+User = get_user_model()
+
+
+class GymCounterSignalTests(TestCase):
+    """Counters follow User/Member writes and never drift from live data"""
+
+    def make_user(self, email, role, **extra):
+        return User.objects.create_user(email=email, username=email, password='pass1234', role=role, **extra)
+
+    def assertNoDrift(self):
+        self.assertEqual(rebuild_counters(fix=False), {})
+
+    def test_counts_follow_creates_updates_and_deletes(self):
+        rebuild_counters()
+        trainer = self.make_user('t1@test.fit', 'trainer')
+        other_trainer = self.make_user('t2@test.fit', 'trainer')
+        members = [self.make_user(f'm{i}@test.fit', 'member') for i in range(3)]
+        profiles = [Member.objects.create(user=m, primary_trainer=trainer) for m in members]
+
+        counts = get_counters('trainers', 'active_members', month_key(), trainer_key(trainer.pk))
+        self.assertEqual(counts, {
+            'trainers': 2, 'active_members': 3, month_key(): 3, trainer_key(trainer.pk): 3,
+        })
+
+        members[0].is_active = False
+        members[0].save()
+        profiles[1].primary_trainer = other_trainer
+        profiles[1].save()
+        members[2].role = 'trainer'
+        members[2].save()
+        self.assertNoDrift()
+
+        members[1].delete()
+        trainer.delete()
+        self.assertNoDrift()
+        self.assertFalse(GymCounter.objects.filter(name=trainer_key(trainer.pk)).exists())
+
+    def test_partial_save_of_unrelated_fields_skips_snapshot(self):
+        member = self.make_user('m@test.fit', 'member')
+        member.first_name = 'Renamed'
+        with CaptureQueriesContext(connection) as ctx:
+            member.save(update_fields=['first_name'])
+        selects = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('SELECT')]
+        self.assertEqual(selects, [])
+
+    def test_rebuild_command_checks_and_fixes(self):
+        self.make_user('m@test.fit', 'member')
+        rebuild_counters()
+        GymCounter.objects.filter(name='members').update(value=42)
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_counters', '--check', stdout=StringIO())
+        call_command('rebuild_counters', stdout=StringIO())
+        self.assertEqual(get_counters('members')['members'], 1)
+
+
+class DashboardStatsTests(TestCase):
+    """dashboard_stats reads counters (revenue included) and memoizes them until the data changes"""
+
+    def setUp(self):
+        dashboard_stats_memo.invalidate()
+        self.trainer = User.objects.create_user(
+            email='t@test.fit', username='t@test.fit', password='pass1234', role='trainer'
+        )
+        self.members = [
+            User.objects.create_user(email=f'm{i}@test.fit', username=f'm{i}@test.fit', password='pass1234', role='member')
+            for i in range(3)
+        ]
+        self.program = Program.objects.create(
+            trainer=self.trainer, name='Strength', program_type='strength', description='',
+            duration_weeks=8, difficulty_level='beginner', price='2500.00',
+        )
+
+    def stats(self):
+        return self.client.get('/api/gym/dashboard_stats/').json()
+
+    def test_user_counters_are_one_aggregate(self):
+        names = list(STATIC_COUNTERS) + [month_key()]
+        with self.assertNumQueries(1):
+            values = live_counts(names)
+        self.assertEqual(values, {
+            'trainers': 1, 'active_trainers': 1, 'members': 3, 'active_members': 3, month_key(): 3,
+        })
+
+    def test_revenue_follows_assignments(self):
+        assignment = ProgramAssignment.objects.create(program=self.program, member=self.members[0])
+        self.assertEqual(assignment.price, self.program.price)
+        self.assertEqual(get_counters(revenue_key())[revenue_key()], 250000)
+
+        # Later price changes don't rewrite what was charged
+        self.program.price = '9999.00'
+        self.program.save()
+        client = APIClient()
+        client.force_authenticate(self.trainer)
+        client.post(f'/api/programs/{self.program.pk}/bulk_assign/', {'member_ids': [m.pk for m in self.members]}, format='json')
+        self.assertEqual(self.stats()['revenue']['amount'], 2500 + 2 * 9999)
+        client.post(f'/api/programs/{self.program.pk}/bulk_unassign/', {'member_ids': [self.members[1].pk]}, format='json')
+        client.put(f'/api/programs/{self.program.pk}/set_members/', {'member_ids': [self.members[0].pk]}, format='json')
+        assignment.delete()
+        self.assertEqual(self.stats()['revenue']['amount'], 0)
+        self.assertEqual(rebuild_counters(fix=False), {})
+
+    def test_memoized_until_data_changes(self):
+        first = self.stats()
+        self.assertEqual((first['members']['count'], first['trainers']['count']), (3, 1))
+        with self.assertNumQueries(0):
+            self.stats()
+
+        ContactMessage.objects.create(name='A', email='a@test.fit', subject='Hi', message='Hello')
+        self.assertEqual(self.stats()['alerts']['count'], 1)
+        self.members[0].is_active = False
+        self.members[0].save()
+        self.assertEqual(self.stats()['members']['count'], 2)
+
+
+class MembershipGrowthTests(TestCase):
+    """membership_growth returns real, zero-filled counts from one grouped query"""
+
+    def setUp(self):
+        User.objects.create_user(email='t@test.fit', username='t@test.fit', password='pass1234', role='trainer')
+        joined = [(2026, 1, 30, 23), (2026, 2, 2, 8), (2026, 2, 2, 9), (2026, 2, 14, 12)]
+        for i, moment in enumerate(joined):
+            member = User.objects.create_user(
+                email=f'm{i}@test.fit', username=f'm{i}@test.fit', password='pass1234', role='member',
+                is_active=i != 1,
+            )
+            User.objects.filter(pk=member.pk).update(created_at=datetime(*moment, tzinfo=dt_timezone.utc))
+
+    def growth(self, **params):
+        return self.client.get('/api/gym/membership_growth/', params)
+
+    def test_daily_buckets_are_zero_filled_in_one_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.growth(**{'from': '2026-01-30', 'to': '2026-02-03', 'granularity': 'day'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        data = response.json()
+        self.assertEqual([(row['start'], row['members']) for row in data['data']], [
+            ('2026-01-30', 1), ('2026-01-31', 0), ('2026-02-01', 0), ('2026-02-02', 2), ('2026-02-03', 0),
+        ])
+        self.assertEqual(data['total'], 3)
+
+    def test_weekly_and_monthly_buckets(self):
+        weeks = self.growth(**{'from': '2026-01-26', 'to': '2026-02-15'}).json()
+        self.assertEqual([(row['start'], row['members']) for row in weeks['data']], [
+            ('2026-01-26', 1), ('2026-02-02', 2), ('2026-02-09', 1),
+        ])
+        self.assertEqual(weeks['data'][0]['week'], 'Week of 26 Jan')
+        months = self.growth(**{'from': '2025-12-01', 'to': '2026-02-28', 'granularity': 'month'}).json()
+        self.assertEqual([row['members'] for row in months['data']], [0, 1, 3])
+        # Default: the last 28 days by week, so 4 buckets or 5 when the range starts mid-week
+        default = self.growth().json()
+        self.assertEqual(default['granularity'], 'week')
+        self.assertIn(len(default['data']), (4, 5))
+
+    def test_partial_first_and_last_buckets_are_widened(self):
+        weeks = self.growth(**{'from': '2026-01-31', 'to': '2026-02-10'}).json()
+        self.assertEqual((weeks['from'], weeks['to']), ('2026-01-26', '2026-02-15'))
+        self.assertEqual([(row['start'], row['members']) for row in weeks['data']], [
+            ('2026-01-26', 1), ('2026-02-02', 2), ('2026-02-09', 1),
+        ])
+        months = self.growth(**{'from': '2026-01-31', 'to': '2026-02-01', 'granularity': 'month'}).json()
+        self.assertEqual((months['from'], months['to']), ('2026-01-01', '2026-02-28'))
+        self.assertEqual([row['members'] for row in months['data']], [1, 3])
+
+    def test_rejects_bad_parameters(self):
+        for params in (
+            {'granularity': 'hour'},
+            {'from': '2026-13-01'},
+            {'from': '2026-02-01', 'to': '2026-01-01'},
+            {'from': '2000-01-01', 'to': '2026-01-01', 'granularity': 'day'},
+        ):
+            self.assertEqual(self.growth(**params).status_code, 400, params)
+
+
+class PublicGymCacheTests(TestCase):
+    """Public gym info and working hours are served from memory, with 304s for repeat visitors"""
+
+    def setUp(self):
+        public_gym_cache.invalidate()
+        self.gym = GymInfo.objects.create(
+            email='hello@test.fit', phone='1', address='1 Street', city='City', state='State', postal_code='1',
+        )
+        for day in reversed(DAYS):
+            WorkingHours.objects.create(
+                gym=self.gym, day=day, opening_time=time(6), closing_time=time(22), is_closed=day == 'Sunday',
+            )
+
+    def test_gym_info_is_cached_and_conditional(self):
+        response = self.client.get('/api/gym/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertIn('public, max-age=', response['Cache-Control'])
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/gym/current/').json()['email'], 'hello@test.fit')
+            self.assertEqual(self.client.get('/api/gym/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            not_modified = self.client.get('/api/gym/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+            self.assertEqual(not_modified.status_code, 304)
+
+        update = self.client.patch(f'/api/gym/{self.gym.pk}/', {'name': 'Renamed'}, content_type='application/json')
+        self.assertEqual(update.status_code, 200)
+        response = self.client.get('/api/gym/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['name'], 'Renamed')
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_update_targets_the_requested_gym(self):
+        response = self.client.patch('/api/gym/999/', {'name': 'X'}, content_type='application/json')
+        self.assertEqual(response.status_code, 404)
+
+    def test_working_hours_endpoint(self):
+        self.assertEqual(self.client.get('/api/gym/999/working_hours/').status_code, 404)
+        response = self.client.get(f'/api/gym/{self.gym.pk}/working_hours/')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([row['day'] for row in data['hours']], list(DAYS))
+        self.assertEqual(data['open_now'], data['closes_at'] is not None)
+        self.assertNotEqual(data['closes_at'] is None, data['opens_at'] is None)
+        max_age = int(response['Cache-Control'].split('max-age=')[1])
+        self.assertLessEqual(max_age, 60)
+
+        with self.assertNumQueries(0):
+            repeat = self.client.get(f'/api/gym/{self.gym.pk}/working_hours/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(repeat.status_code, 304)
+
+        # Saving a row (update_gym_info, admin inline) drops the cached schedule
+        sunday = WorkingHours.objects.get(gym=self.gym, day='Sunday')
+        sunday.is_closed = False
+        sunday.save()
+        response = self.client.get(f'/api/gym/{self.gym.pk}/working_hours/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.json()['hours'][-1]['is_closed'])
+
+    def test_open_now_answers(self):
+        rows = [
+            WorkingHours(day='Monday', opening_time=time(6), closing_time=time(22)),
+            WorkingHours(day='Saturday', opening_time=time(20), closing_time=time(2)),  # past midnight
+            WorkingHours(day='Sunday', opening_time=time(23), closing_time=time(1)),  # into Monday
+            WorkingHours(day='Tuesday', opening_time=time(6), closing_time=time(22), is_closed=True),
+        ]
+        schedule = WeeklySchedule(rows)
+
+        def status(*args):
+            open_now, closes_at, opens_at, _, _ = schedule.status(datetime(*args, tzinfo=dt_timezone.utc))
+            return open_now, closes_at and closes_at.isoformat(), opens_at and opens_at.isoformat()
+
+        # 2026-10-12 is a Monday
+        self.assertEqual(status(2026, 10, 12, 10, 30), (True, '2026-10-12T22:00:00+00:00', None))
+        self.assertEqual(status(2026, 10, 12, 0, 30), (True, '2026-10-12T01:00:00+00:00', None))
+        self.assertEqual(status(2026, 10, 13, 12, 0), (False, None, '2026-10-17T20:00:00+00:00'))
+        self.assertEqual(status(2026, 10, 18, 1, 59), (True, '2026-10-18T02:00:00+00:00', None))
+        self.assertEqual(status(2026, 10, 18, 12, 0), (False, None, '2026-10-18T23:00:00+00:00'))
+        self.assertEqual(WeeklySchedule([]).status(datetime(2026, 10, 12, tzinfo=dt_timezone.utc))[:3],
+                         (False, None, None))
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class SeedGymCommandTests(TestCase):
+    """seed_gym bulk-creates a consistent gym whose counters need no fixing afterwards"""
+
+    def seed(self, **options):
+        options = {'members': 250, 'trainers': 6, 'programs': 15, 'chunk_size': 100, **options}
+        call_command('seed_gym', stdout=StringIO(), **options)
+
+    def test_seeds_a_consistent_gym(self):
+        self.seed()
+        self.assertEqual(User.objects.filter(role='member').count(), 250)
+        self.assertEqual(User.objects.filter(role='trainer').count(), 6)
+        self.assertEqual(User.objects.filter(role='owner').count(), 1)
+        self.assertEqual(Member.objects.count(), 250)
+        self.assertEqual(Program.objects.count(), 15)
+        self.assertTrue(GymInfo.objects.exists())
+        # Every trainer has a program, and members only follow their own trainer's programs
+        self.assertFalse(User.objects.filter(role='trainer', programs__isnull=True).exists())
+        self.assertFalse(ProgramAssignment.objects.exclude(
+            program__trainer=models.F('member__member_profile__primary_trainer')
+        ).exists())
+        self.assertTrue(ProgramAssignment.objects.exists())
+
+        member = User.objects.filter(role='member').first()
+        self.assertTrue(member.check_password('seed1234'))
+        self.assertEqual(User.objects.filter(role='member').values('password').distinct().count(), 1)
+        self.assertGreater(User.objects.filter(role='member').dates('created_at', 'month').count(), 6)
+        self.assertGreater(ProgramAssignment.objects.dates('assigned_at', 'month').count(), 6)
+        self.assertFalse(Member.objects.exclude(joining_date=models.F('user__created_at')).exists())
+        # Backdated by updating the rows, not by switching off auto_now_add on the shared fields
+        self.assertTrue(User._meta.get_field('created_at').auto_now_add)
+
+        self.assertEqual(rebuild_counters(fix=False), {})
+        months = {month_key(created) for created in User.objects.filter(role='member').values_list('created_at', flat=True)}
+        stored = dict(GymCounter.objects.filter(name__in=months).values_list('name', 'value'))
+        self.assertEqual(sum(stored.values()), 250)
+
+    def test_same_seed_same_gym_and_prefix_guard(self):
+        self.seed(seed=3)
+        first = list(Member.objects.order_by('user__email').values_list('user__email', 'primary_trainer__email'))
+        with self.assertRaises(CommandError):
+            self.seed(seed=3)
+        self.seed(seed=3, prefix='again')
+        second = list(
+            Member.objects.filter(user__email__startswith='again-').order_by('user__email')
+            .values_list('user__email', 'primary_trainer__email')
+        )
+        def unprefixed(rows):
+            return [(member.split('-', 1)[1], trainer and trainer.split('-', 1)[1]) for member, trainer in rows]
+        self.assertEqual(unprefixed(first), unprefixed(second))
@@ -2,6 +2,7 @@ from django.urls import path
 from .views import (
     current_gym_info,
     update_gym_info,
+    gym_working_hours,
     dashboard_stats, 
     membership_growth, 
     recent_activity,
@@ -14,6 +15,7 @@ urlpatterns = [
     path('', current_gym_info, name='gym-list'),  # Default to current gym info
     path('current/', current_gym_info, name='gym-current'),
     path('<int:pk>/', update_gym_info, name='gym-update'),  # PUT/PATCH to /gym/1/
+    path('<int:pk>/working_hours/', gym_working_hours, name='gym-working-hours'),
     path('dashboard_stats/', dashboard_stats, name='gym-dashboard-stats'),
     path('membership_growth/', membership_growth, name='gym-membership-growth'),
     path('recent_activity/', recent_activity, name='gym-recent-activity'),
@@ -2,12 +2,25 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAdminUser
+from django.conf import settings
 from django.db.models import Count, Sum
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from datetime import timedelta
 from .models import GymInfo, WorkingHours, ContactMessage
 from .serializers import GymInfoSerializer, WorkingHoursSerializer, ContactMessageSerializer
 from users.models import User
+from . import growth
+from .dashboard_stats import dashboard_stats as get_dashboard_stats
+from .public_cache import public_gym_cache
+
+# granularity -> (bucket label format, chart subtitle)
+GROWTH_LABELS = {
+    'day': ('%d %b', 'Daily overview'),
+    'week': ('Week of %d %b', 'Weekly overview'),
+    'month': ('%b %Y', 'Monthly overview'),
+}
 
 # ============= PUBLIC API ENDPOINTS (NO AUTHENTICATION REQUIRED) =============
 
@@ -15,20 +28,45 @@ from users.models import User
 @permission_classes([AllowAny])
 @authentication_classes([])
 def current_gym_info(request):
-    """Get current gym info - PUBLIC ENDPOINT"""
-    gym = GymInfo.objects.first()
-    if gym:
-        serializer = GymInfoSerializer(gym)
-        return Response(serializer.data)
-    return Response({'error': 'Gym info not found'}, status=404)
+    """Get current gym info - PUBLIC ENDPOINT (cached, answers If-None-Match/If-Modified-Since with 304)"""
+    payload = public_gym_cache.gym_info()
+    if payload is None:
+        return Response({'error': 'Gym info not found'}, status=404)
+    return _conditional_response(request, payload, settings.GYM_INFO_MAX_AGE)
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@authentication_classes([])
+def gym_working_hours(request, pk):
+    """Weekly working hours and whether the gym is open now - PUBLIC ENDPOINT (cached, conditional)"""
+    hours = public_gym_cache.working_hours(pk)
+    if hours is None:
+        return Response({'error': 'Gym info not found'}, status=404)
+    now = timezone.now()
+    payload = hours.current(now)
+    max_age = settings.GYM_INFO_MAX_AGE
+    # Browsers and proxies must not keep serving "open" past closing time
+    if payload.valid_until:
+        max_age = max(0, min(max_age, int((payload.valid_until - now).total_seconds())))
+    return _conditional_response(request, payload, max_age)
+
+def _conditional_response(request, payload, max_age):
+    """Cached payload with validators; 304 when the client already has this version"""
+    response = Response(payload.data)
+    response['ETag'] = payload.etag
+    response['Last-Modified'] = http_date(payload.last_modified.timestamp())
+    response['Cache-Control'] = f'public, max-age={max_age}'
+    return get_conditional_response(
+        request, etag=payload.etag, last_modified=int(payload.last_modified.timestamp()), response=response,
+    )
 
 @api_view(['PUT', 'PATCH'])
 @permission_classes([AllowAny])
 @authentication_classes([])
-def update_gym_info(request):
+def update_gym_info(request, pk):
     """Update gym info - PUBLIC ENDPOINT"""
     try:
-        gym = GymInfo.objects.first()
+        gym = GymInfo.objects.filter(pk=pk).first()
         if not gym:
             return Response({'error': 'Gym info not found'}, status=404)
         
@@ -49,24 +87,14 @@ def update_gym_info(request):
 def dashboard_stats(request):
     """Get dashboard statistics for gym owner - PUBLIC ENDPOINT"""
     try:
-        # Count active trainers
-        active_trainers = User.objects.filter(role='trainer', is_active=True).count()
-        
-        # Count active members
-        active_members = User.objects.filter(role='member', is_active=True).count()
-        
-        # Count new members this month
-        current_month = timezone.now().replace(day=1)
-        new_members = User.objects.filter(
-            role='member',
-            created_at__gte=current_month
-        ).count()
-        
-        # Get unread alerts/messages
-        unread_alerts = ContactMessage.objects.filter(is_read=False).count()
-        
-        # Mock revenue data - can be expanded with actual payment tracking
-        revenue = 124500  # Monthly revenue in rupees
+        # Counters table plus the unread count, memoized for a few seconds (see gym_info.dashboard_stats)
+        stats = get_dashboard_stats()
+        active_trainers = stats['active_trainers']
+        active_members = stats['active_members']
+        new_members = stats['new_members']
+        unread_alerts = stats['unread_messages']
+        # Program prices of this month's assignments (revenue:<month> counter)
+        revenue = stats['revenue']
         
         return Response({
             'trainers': {
@@ -98,30 +126,52 @@ def dashboard_stats(request):
 @permission_classes([AllowAny])
 @authentication_classes([])
 def membership_growth(request):
-    """Get weekly membership growth data - PUBLIC ENDPOINT"""
+    """
+    New members per bucket - PUBLIC ENDPOINT
+    
+    Query params: from, to (YYYY-MM-DD, inclusive, UTC; default the last 4 weeks),
+    granularity=day|week|month (default week). Buckets without sign-ups count 0.
+    The range is widened to whole buckets; the response's from/to are the widened days.
+    """
+    granularity = request.query_params.get('granularity', 'week')
+    if granularity not in GROWTH_LABELS:
+        return Response(
+            {'error': 'granularity must be day, week or month'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     try:
-        # Get data for last 4 weeks
-        weeks_data = []
-        for week_offset in range(4, 0, -1):
-            week_start = timezone.now() - timedelta(weeks=week_offset)
-            week_end = week_start + timedelta(weeks=1)
-            
-            count = User.objects.filter(
-                role='member',
-                created_at__gte=week_start,
-                created_at__lt=week_end
-            ).count()
-            
-            weeks_data.append({
-                'week': f'Week {5 - week_offset}',
-                'members': count + (60 - week_offset * 5)  # Mock progressive data
-            })
-        
+        last = growth.parse_day(request.query_params.get('to'), timezone.now().date())
+        first = growth.parse_day(request.query_params.get('from'), last - timedelta(weeks=4) + timedelta(days=1))
+    except ValueError:
+        return Response(
+            {'error': 'from and to must be dates (YYYY-MM-DD)'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if first > last:
+        return Response({'error': 'from must not be after to'}, status=status.HTTP_400_BAD_REQUEST)
+    if growth.bucket_count(first, last, granularity) > growth.MAX_BUCKETS:
+        return Response(
+            {'error': f'At most {growth.MAX_BUCKETS} buckets; use a shorter range or coarser granularity'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    first, last = growth.align(first, last, granularity)
+    
+    try:
+        label_format, overview = GROWTH_LABELS[granularity]
+        data = [
+            # 'week' is the label key the dashboard chart reads, whatever the granularity
+            {'week': start.strftime(label_format), 'start': start.isoformat(), 'members': count}
+            for start, count in growth.new_members(first, last, granularity)
+        ]
         return Response({
             'chart_type': 'area',
-            'data': weeks_data,
+            'data': data,
             'title': 'Membership Growth',
-            'subtitle': 'January 2026 - Weekly overview'
+            'subtitle': f'{first:%d %b %Y} - {last:%d %b %Y} - {overview}',
+            'granularity': granularity,
+            'from': first.isoformat(),
+            'to': last.isoformat(),
+            'total': sum(bucket['members'] for bucket in data),
         })
     except Exception as e:
         return Response(
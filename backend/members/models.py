@@ -19,6 +19,7 @@ class Member(models.Model):
     joining_date = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
     bio = models.TextField(blank=True)
+    plan = models.CharField(max_length=100, blank=True, default='')
     
     class Meta:
         verbose_name = 'Member'
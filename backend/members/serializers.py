@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from members.models import Member
+from users.hashing import hash_password
 
 User = get_user_model()
 
@@ -27,7 +28,7 @@ class CreateMemberSerializer(serializers.Serializer):
     
     def validate_email(self, value):
         """Check if email already exists"""
-        if User.objects.filter(email=value).exists():
+        if User.objects.by_email(value).exists():
             raise serializers.ValidationError("A user with this email already exists.")
         return value
     
@@ -38,15 +39,17 @@ class CreateMemberSerializer(serializers.Serializer):
         first_name = validated_data.get('first_name', '')
         last_name = validated_data.get('last_name', '')
         
-        # Create User with role='member'
-        user = User.objects.create_user(
+        # Create User with role='member' (password hashed in the hashing pool)
+        email = User.objects.normalize_email(email)
+        user = User(
             username=email,
             email=email,
-            password=password,
             first_name=first_name,
             last_name=last_name,
             role='member'
         )
+        user.password = hash_password(password)
+        user.save()
         
         # Create Member profile
         Member.objects.create(user=user)
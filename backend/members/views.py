@@ -3,6 +3,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
+from core.pagination import CreatedAtCursorPagination
 from .serializers import MemberSerializer, CreateMemberSerializer
 from members.models import Member
 
@@ -11,20 +12,24 @@ User = get_user_model()
 class MemberViewSet(viewsets.ModelViewSet):
     serializer_class = MemberSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
     
     def get_queryset(self):
         """Filter members based on user role"""
         user = self.request.user
+        # trainer_name follows member_profile -> primary_trainer on every row. Prefetched
+        # (two queries on the page) rather than joined: a join runs before the sort, for every member
+        users = User.objects.prefetch_related('member_profile__primary_trainer')
         
         if user.role == 'owner':
             # Owner sees all members
-            return User.objects.filter(role='member')
+            return users.filter(role='member')
         elif user.role == 'trainer':
             # Trainer sees only their assigned members
-            return User.objects.filter(member_profile__primary_trainer=user, role='member')
+            return users.filter(member_profile__primary_trainer=user, role='member')
         
         # Member sees only themselves
-        return User.objects.filter(id=user.id)
+        return users.filter(id=user.id)
     
     @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
     def create_member(self, request):
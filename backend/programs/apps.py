@@ -3,3 +3,8 @@ from django.apps import AppConfig
 class ProgramsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'programs'
+    
+    def ready(self):
+        from core.metrics import registry
+        from .serializers import program_representation_cache
+        registry.register_collector('program_cache', program_representation_cache.stats)
@@ -0,0 +1,65 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from programs.models import Program
+from programs.serializers import ProgramSerializer, program_representation_cache
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Microbenchmark ProgramSerializer list rendering with a cold vs warm representation cache (no DB access)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--programs', type=int, default=10000, help='Programs per list (default 10000)')
+        parser.add_argument('--rounds', type=int, default=5, help='Timed rounds per mode (default 5)')
+
+    def handle(self, *args, **options):
+        count, rounds = options['programs'], options['rounds']
+        programs = self.build_programs(count)
+        if program_representation_cache.maxsize < count:
+            self.stdout.write(f"⚠️  PROGRAM_CACHE_SIZE={program_representation_cache.maxsize} < {count}; warm runs will miss")
+
+        uncached = self.best_of(rounds, programs, clear=True)
+        program_representation_cache.clear()
+        ProgramSerializer(programs, many=True).data  # fill
+        warm = self.best_of(rounds, programs, clear=False)
+
+        self.stdout.write(f"\n=== ProgramSerializer, {count} programs, best of {rounds} ===")
+        self.stdout.write(f"  uncached: {uncached * 1000:8.1f} ms  {count / uncached:10.0f} rows/s")
+        self.stdout.write(f"  cached:   {warm * 1000:8.1f} ms  {count / warm:10.0f} rows/s")
+        self.stdout.write(f"  speedup:  {uncached / warm:.1f}x")
+        self.stdout.write(f"  cache:    {program_representation_cache.stats()}\n")
+
+    def best_of(self, rounds, programs, clear):
+        timings = []
+        for _ in range(rounds):
+            if clear:
+                program_representation_cache.clear()
+            start = time.perf_counter()
+            ProgramSerializer(programs, many=True).data
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    def build_programs(self, count):
+        """Unsaved programs shaped like program_list_queryset() rows"""
+        trainer = User(pk=1, email='bench@muscle.fit', first_name='Bench', role='trainer')
+        now = timezone.now()
+        types = [choice for choice, _ in Program.PROGRAM_TYPES]
+        levels = ['beginner', 'intermediate', 'advanced']
+        programs = []
+        for i in range(count):
+            program = Program(
+                pk=i + 1, name=f'Program {i}', program_type=types[i % len(types)],
+                description='Benchmark program', duration_weeks=4 + i % 20,
+                difficulty_level=levels[i % 3], price=Decimal('999.00'), is_active=bool(i % 5),
+                created_at=now - timedelta(minutes=i), updated_at=now - timedelta(minutes=i),
+            )
+            program.trainer = trainer
+            program.enrollment_count = i % 40
+            programs.append(program)
+        return programs
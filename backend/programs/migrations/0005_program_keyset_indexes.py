@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-17 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('programs', '0004_session'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='program',
+            index=models.Index(fields=['created_at', 'id'], name='program_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='program',
+            index=models.Index(fields=['trainer', 'created_at', 'id'], name='program_trainer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='programassignment',
+            index=models.Index(fields=['assigned_at', 'id'], name='assignment_assigned_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='programassignment',
+            index=models.Index(fields=['member', 'assigned_at', 'id'], name='assignment_member_assigned_idx'),
+        ),
+    ]
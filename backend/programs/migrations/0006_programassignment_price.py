@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-17 16:40
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_program_prices(apps, schema_editor):
+    Program = apps.get_model('programs', 'Program')
+    ProgramAssignment = apps.get_model('programs', 'ProgramAssignment')
+    ProgramAssignment.objects.update(
+        price=Subquery(Program.objects.filter(pk=OuterRef('program_id')).values('price')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('programs', '0005_program_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='programassignment',
+            name='price',
+            field=models.DecimalField(blank=True, decimal_places=2, default=0, help_text="Program price when assigned; counts towards that month's revenue", max_digits=10),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_program_prices, migrations.RunPython.noop),
+    ]
@@ -26,6 +26,11 @@ class Program(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        # Keyset pagination walks (created_at, id), optionally within one trainer
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='program_created_id_idx'),
+            models.Index(fields=['trainer', 'created_at', 'id'], name='program_trainer_created_idx'),
+        ]
         verbose_name = 'Program'
         verbose_name_plural = 'Programs'
     
@@ -37,14 +42,28 @@ class ProgramAssignment(models.Model):
     """Track which members are assigned to which programs by trainers"""
     program = models.ForeignKey(Program, on_delete=models.CASCADE, related_name='assignments')
     member = models.ForeignKey(User, on_delete=models.CASCADE, related_name='assigned_programs', limit_choices_to={'role': 'member'})
+    price = models.DecimalField(
+        max_digits=10, decimal_places=2, blank=True,
+        help_text="Program price when assigned; counts towards that month's revenue"
+    )
     assigned_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         unique_together = ('program', 'member')
         ordering = ['-assigned_at']
+        # Keyset pagination walks (assigned_at, id), optionally within one member
+        indexes = [
+            models.Index(fields=['assigned_at', 'id'], name='assignment_assigned_id_idx'),
+            models.Index(fields=['member', 'assigned_at', 'id'], name='assignment_member_assigned_idx'),
+        ]
         verbose_name = 'Program Assignment'
         verbose_name_plural = 'Program Assignments'
     
+    def save(self, *args, **kwargs):
+        if self.price is None:
+            self.price = self.program.price
+        super().save(*args, **kwargs)
+    
     def __str__(self):
         return f"{self.member.email} -> {self.program.name}"
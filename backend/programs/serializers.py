@@ -1,6 +1,28 @@
+from collections import OrderedDict
+
 from rest_framework import serializers
+from rest_framework.relations import PKOnlyObject
+from django.conf import settings
+from django.db.models import Count
+from core.lru import LRUCache
 from .models import Program, ProgramAssignment
 
+# Rendered row-only fields of ProgramSerializer, keyed on (id, updated_at).
+# A save bumps updated_at (auto_now), so edited programs get a fresh key;
+# queryset .update() does not, and must be followed by program_representation_cache.clear().
+program_representation_cache = LRUCache(maxsize=getattr(settings, 'PROGRAM_CACHE_SIZE', 10000))
+
+
+def program_list_queryset(queryset):
+    """
+    Prepare a program queryset for ProgramSerializer(many=True): the trainer is
+    joined in and enrollments annotated, so the whole list costs one query.
+    The count's GROUP BY drops Meta.ordering, so newest-first is restated.
+    """
+    return queryset.select_related('trainer').annotate(
+        enrollment_count=Count('assignments')
+    ).order_by('-created_at', '-id')
+
 class ProgramSerializer(serializers.ModelSerializer):
     # Frontend field mappings
     type = serializers.SerializerMethodField()
@@ -28,6 +50,40 @@ class ProgramSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ('id', 'created_at', 'updated_at', 'trainer_name', 'enrollments')
     
+    # Depend on more than the program row (other tables or the request host), so never cached
+    volatile_fields = ('enrollments', 'trainer_name', 'thumbnailUrl')
+    
+    def to_representation(self, instance):
+        """Serve row-only fields from program_representation_cache; render volatile ones fresh"""
+        if instance.pk is None or instance.updated_at is None:
+            return super().to_representation(instance)
+        
+        key = (instance.pk, instance.updated_at)
+        cached = program_representation_cache.get(key)
+        if cached is None:
+            ret = super().to_representation(instance)
+            program_representation_cache.set(
+                key, {name: value for name, value in ret.items() if name not in self.volatile_fields}
+            )
+            return ret
+        
+        ret = OrderedDict()
+        for field in self._readable_fields:
+            name = field.field_name
+            if name in self.volatile_fields:
+                ret[name] = self._render_field(field, instance)
+            else:
+                ret[name] = cached[name]
+        return ret
+    
+    def _render_field(self, field, instance):
+        """Render one field the way Serializer.to_representation does"""
+        attribute = field.get_attribute(instance)
+        check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+        if check_for_none is None:
+            return None
+        return field.to_representation(attribute)
+    
     def get_type(self, obj):
         """Map program_type to frontend type (Gym / PT / Classes)"""
         type_mapping = {
@@ -106,6 +162,9 @@ class ProgramSerializer(serializers.ModelSerializer):
     
     def get_enrollments(self, obj):
         """Get count of enrolled members"""
+        # Annotated by program_list_queryset(); single objects fall back to a COUNT
+        if hasattr(obj, 'enrollment_count'):
+            return obj.enrollment_count
         return obj.assignments.count()
 
 
@@ -0,0 +1,232 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from gym_info.counters import get_counters, revenue_key
+from .models import Program, ProgramAssignment
+from .serializers import (
+    ProgramSerializer, program_list_queryset, program_representation_cache,
+)
+
+User = get_user_model()
+
+
+def make_programs(trainer, count, prefix='Program'):
+    return Program.objects.bulk_create([
+        Program(trainer=trainer, name=f'{prefix} {i}', program_type='cardio', description='',
+                duration_weeks=8, difficulty_level='beginner', price=1000)
+        for i in range(count)
+    ])
+
+
+class ProgramListQueryCountTests(TestCase):
+    """Program lists cost a fixed number of queries however many rows they hold"""
+
+    def setUp(self):
+        self.trainer = User.objects.create_user(
+            email='trainer@test.fit', username='trainer@test.fit', password='pass1234', role='trainer'
+        )
+        self.member = User.objects.create_user(
+            email='member@test.fit', username='member@test.fit', password='pass1234', role='member'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.trainer)
+
+    def _queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.data
+
+    def test_my_programs_constant_queries(self):
+        programs = make_programs(self.trainer, 2)
+        ProgramAssignment.objects.create(program=programs[0], member=self.member)
+        few, data = self._queries('/api/programs/my_programs/')
+        self.assertEqual(sorted(p['enrollments'] for p in data), [0, 1])
+        self.assertEqual({p['trainer_name'] for p in data}, {self.trainer.first_name})
+
+        make_programs(self.trainer, 50, prefix='More')
+        many, data = self._queries('/api/programs/my_programs/')
+        self.assertEqual(len(data), 52)
+        self.assertEqual(few, many)
+
+    def test_detail_uses_annotated_enrollments(self):
+        program = make_programs(self.trainer, 1)[0]
+        ProgramAssignment.objects.create(program=program, member=self.member)
+        _, data = self._queries(f'/api/programs/{program.pk}/')
+        self.assertEqual(data['enrollments'], 1)
+
+    def test_sessions_and_dashboard_programs_are_newest_first(self):
+        programs = make_programs(self.trainer, 12)
+        for i, program in enumerate(programs):
+            Program.objects.filter(pk=program.pk).update(created_at=program.created_at - timedelta(minutes=i * 7 % 12))
+        expected = list(Program.objects.order_by('-created_at').values_list('id', flat=True))
+        seen, url = [], '/api/programs/sessions/'
+        while url:
+            _, data = self._queries(url)
+            seen.extend(row['id'] for row in data['results'])
+            url = data['next']
+        self.assertEqual(seen, expected)
+        _, data = self._queries('/api/users/dashboard/')
+        self.assertEqual([row['id'] for row in data['programs']], expected)
+
+
+class ProgramRepresentationCacheTests(TestCase):
+    """Cached rows match uncached output and are dropped by a save"""
+
+    def setUp(self):
+        program_representation_cache.clear()
+        self.trainer = User.objects.create_user(
+            email='trainer@test.fit', username='trainer@test.fit', password='pass1234',
+            role='trainer', first_name='Ana'
+        )
+        self.program = make_programs(self.trainer, 1)[0]
+
+    def render(self):
+        program = program_list_queryset(Program.objects.filter(pk=self.program.pk)).get()
+        return ProgramSerializer(program).data
+
+    def test_hit_matches_miss_and_volatile_fields_stay_fresh(self):
+        first = self.render()
+        ProgramAssignment.objects.create(
+            program=self.program,
+            member=User.objects.create_user(email='m@test.fit', username='m@test.fit', password='pass1234'),
+        )
+        User.objects.filter(pk=self.trainer.pk).update(first_name='Bea')
+        hits = program_representation_cache.hits
+        second = self.render()
+
+        self.assertEqual(program_representation_cache.hits, hits + 1)
+        self.assertEqual(list(second), list(first))
+        self.assertEqual(second['enrollments'], 1)
+        self.assertEqual(second['trainer_name'], 'Bea')
+
+    def test_save_renders_new_values(self):
+        self.render()
+        self.program.is_active = False
+        self.program.save()
+        self.assertEqual(self.render()['status'], 'inactive')
+
+
+class BulkAssignmentTests(TestCase):
+    """bulk_assign / bulk_unassign / set_members work in a fixed number of queries"""
+
+    def setUp(self):
+        self.trainer = User.objects.create_user(
+            email='trainer@test.fit', username='trainer@test.fit', password='pass1234', role='trainer'
+        )
+        self.program = make_programs(self.trainer, 1)[0]
+        get_counters(revenue_key())  # seeded by the gym's first sale this month, not by the first bulk call
+        password = make_password('pass1234')
+        self.members = User.objects.bulk_create([
+            User(email=f'm{i}@test.fit', username=f'm{i}@test.fit', password=password, role='member')
+            for i in range(40)
+        ])
+        self.ids = [member.id for member in self.members]
+        self.client = APIClient()
+        self.client.force_authenticate(self.trainer)
+
+    def post(self, action, member_ids, method='post'):
+        url = f'/api/programs/{self.program.pk}/{action}/'
+        return getattr(self.client, method)(url, {'member_ids': member_ids}, format='json')
+
+    def assigned(self):
+        return set(self.program.assignments.values_list('member_id', flat=True))
+
+    def test_bulk_assign_reports_per_id_outcomes(self):
+        ProgramAssignment.objects.create(program=self.program, member=self.members[0])
+        response = self.post('bulk_assign', self.ids[:3] + [self.trainer.id, 999999])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['status'] for r in response.data['results']], [
+            'already_assigned', 'assigned', 'assigned', 'not_found', 'not_found',
+        ])
+        self.assertEqual(self.assigned(), set(self.ids[:3]))
+
+    def revenue(self):
+        return get_counters(revenue_key())[revenue_key()]
+
+    def test_revenue_follows_bulk_writes(self):
+        self.post('bulk_assign', self.ids[:5])
+        self.assertEqual(self.revenue(), 5 * 100000)
+        self.post('bulk_unassign', self.ids[:2], method='delete')
+        self.assertEqual(self.revenue(), 3 * 100000)
+        self.post('set_members', self.ids[3:9], method='put')
+        self.assertEqual(self.revenue(), 6 * 100000)
+
+    def test_bulk_unassign_query_count_independent_of_batch_size(self):
+        self.post('bulk_assign', self.ids)
+        with CaptureQueriesContext(connection) as small:
+            self.post('bulk_unassign', self.ids[:2], method='delete')
+        with CaptureQueriesContext(connection) as large:
+            self.post('bulk_unassign', self.ids[2:], method='delete')
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+        self.assertEqual(self.assigned(), set())
+
+    def test_bulk_assign_query_count_independent_of_batch_size(self):
+        with CaptureQueriesContext(connection) as small:
+            self.post('bulk_assign', self.ids[:2])
+        with CaptureQueriesContext(connection) as large:
+            self.post('bulk_assign', self.ids[2:])
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+        self.assertEqual(len(self.assigned()), 40)
+
+    def test_bulk_unassign(self):
+        self.post('bulk_assign', self.ids[:5])
+        response = self.post('bulk_unassign', self.ids[3:7], method='delete')
+        self.assertEqual([r['status'] for r in response.data['results']], [
+            'unassigned', 'unassigned', 'not_assigned', 'not_assigned',
+        ])
+        self.assertEqual(self.assigned(), set(self.ids[:3]))
+
+    def test_set_members_applies_diff(self):
+        self.post('bulk_assign', self.ids[:5])
+        response = self.post('set_members', self.ids[3:8] + [999999], method='put')
+        self.assertEqual(response.data['added'], self.ids[5:8])
+        self.assertEqual(response.data['removed'], sorted(self.ids[:3]))
+        self.assertEqual(response.data['unchanged'], self.ids[3:5])
+        self.assertEqual(response.data['not_found'], [999999])
+        self.assertEqual(self.assigned(), set(self.ids[3:8]))
+
+    def test_other_trainers_program_is_not_found(self):
+        other = User.objects.create_user(
+            email='other@test.fit', username='other@test.fit', password='pass1234', role='trainer'
+        )
+        self.client.force_authenticate(other)
+        response = self.post('bulk_assign', self.ids[:1])
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.assigned(), set())
+
+
+class ProgramKeysetPaginationTests(TestCase):
+    """Program lists page by cursor; deep pages cost the same as the first"""
+
+    def setUp(self):
+        self.trainer = User.objects.create_user(
+            email='trainer@test.fit', username='trainer@test.fit', password='pass1234', role='trainer'
+        )
+        make_programs(self.trainer, 25)
+        self.client = APIClient()
+        self.client.force_authenticate(self.trainer)
+
+    def test_pages_cover_every_program_with_equal_cost(self):
+        seen, costs = [], []
+        url, params = '/api/programs/', {'page_size': 10}
+        while url:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url, params)
+            self.assertNotIn('total', response.data)
+            costs.append(len(ctx.captured_queries))
+            seen.extend(p['id'] for p in response.data['results'])
+            url, params = response.data['next'], None
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(len(set(seen)), 25)
+        self.assertEqual(len(set(costs)), 1)
+
+    def test_include_total(self):
+        response = self.client.get('/api/programs/', {'include_total': 'true'})
+        self.assertEqual(response.data['total'], 25)
+        self.assertEqual(len(response.data['results']), 10)
@@ -3,9 +3,10 @@ from rest_framework.routers import DefaultRouter
 from .views import ProgramViewSet, ClientTrainerAssignmentViewSet, SessionViewSet
 
 router = DefaultRouter()
-router.register(r'', ProgramViewSet, basename='programs')
 router.register(r'assignments', ClientTrainerAssignmentViewSet, basename='assignments')
 router.register(r'sessions', SessionViewSet, basename='sessions')
+# Last: its detail route (<pk>/) would otherwise swallow assignments/ and sessions/
+router.register(r'', ProgramViewSet, basename='programs')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -2,25 +2,66 @@ from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.db.models import Q
+from core.pagination import AssignedAtCursorPagination, CreatedAtCursorPagination
+from gym_info.counters import adjust_revenue, batched_adjustments
+from users.dashboard_cache import bump_dashboard_version
 from .models import Program, ProgramAssignment
-from .serializers import ProgramSerializer, ProgramAssignmentSerializer
+from .serializers import ProgramSerializer, ProgramAssignmentSerializer, program_list_queryset
+
+User = get_user_model()
+
+# Upper bound on member_ids accepted by the bulk assignment endpoints
+MAX_BULK_MEMBERS = 1000
+
+
+def _lock_assignments(program):
+    """
+    Lock the program row for the rest of the transaction. Every view that adds or
+    removes assignments of a program takes this lock first, so a read of its
+    assignments stays true until the write that follows it.
+    """
+    Program.objects.select_for_update().filter(pk=program.pk).values_list('pk', flat=True).first()
+
+
+def _insert_assignments(program, member_ids):
+    """
+    Bulk-insert assignments of `program` for members found unassigned under
+    _lock_assignments(). bulk_create(ignore_conflicts=True) returns every object it
+    was given, inserted or not, so the stored rows are read back.
+    Returns {member_id: (assigned_at, price)} of the inserted rows.
+    """
+    if not member_ids:
+        return {}
+    ProgramAssignment.objects.bulk_create(
+        [ProgramAssignment(program=program, member_id=member_id, price=program.price) for member_id in member_ids],
+        ignore_conflicts=True
+    )
+    rows = program.assignments.filter(member_id__in=member_ids).values_list('member_id', 'assigned_at', 'price')
+    return {member_id: (assigned_at, price) for member_id, assigned_at, price in rows}
+
 
 class ProgramViewSet(viewsets.ModelViewSet):
     serializer_class = ProgramSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
     
     def get_queryset(self):
         """Filter programs by logged-in trainer"""
         user = self.request.user
         # Trainers see only their own programs
         if user.role == 'trainer':
-            return Program.objects.filter(trainer=user).order_by('-created_at')
+            programs = Program.objects.filter(trainer=user)
         # Owners see all programs
         elif user.role == 'owner':
-            return Program.objects.all().order_by('-created_at')
+            programs = Program.objects.all()
         # Members don't see programs
-        return Program.objects.none()
+        else:
+            return Program.objects.none()
+        # Trainer joined and enrollments annotated: one query per list/detail
+        return program_list_queryset(programs)
     
     def perform_create(self, serializer):
         """Automatically set trainer to logged-in user when creating"""
@@ -80,7 +121,7 @@ class ProgramViewSet(viewsets.ModelViewSet):
             )
         
         # Check if trainer owns this program
-        if program.trainer != request.user:
+        if program.trainer_id != request.user.id:
             return Response(
                 {'error': 'You can only assign your own programs'},
                 status=status.HTTP_403_FORBIDDEN
@@ -97,10 +138,12 @@ class ProgramViewSet(viewsets.ModelViewSet):
             )
         
         # Create or update assignment
-        assignment, created = ProgramAssignment.objects.get_or_create(
-            program=program,
-            member=member
-        )
+        with transaction.atomic():
+            _lock_assignments(program)
+            assignment, created = ProgramAssignment.objects.get_or_create(
+                program=program,
+                member=member
+            )
         
         serializer = ProgramAssignmentSerializer(assignment)
         return Response(
@@ -121,18 +164,20 @@ class ProgramViewSet(viewsets.ModelViewSet):
             )
         
         # Check if trainer owns this program
-        if program.trainer != request.user:
+        if program.trainer_id != request.user.id:
             return Response(
                 {'error': 'You can only unassign your own programs'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
         try:
-            assignment = ProgramAssignment.objects.get(
-                program=program,
-                member_id=member_id
-            )
-            assignment.delete()
+            with transaction.atomic():
+                _lock_assignments(program)
+                assignment = ProgramAssignment.objects.get(
+                    program=program,
+                    member_id=member_id
+                )
+                assignment.delete()
             return Response(status=status.HTTP_204_NO_CONTENT)
         except ProgramAssignment.DoesNotExist:
             return Response(
@@ -140,6 +185,139 @@ class ProgramViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
     
+    def _bulk_target(self, request, allow_empty=False):
+        """
+        Resolve the program and member_ids list for a bulk assignment action.
+        Returns (program, member_ids, None) or (None, None, error_response).
+        """
+        program = self.get_object()
+        if program.trainer_id != request.user.id:
+            return None, None, Response(
+                {'error': 'You can only change assignments of your own programs'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        member_ids = request.data.get('member_ids')
+        if not isinstance(member_ids, list) or (not member_ids and not allow_empty):
+            return None, None, Response(
+                {'error': 'member_ids must be a non-empty list' if not allow_empty else 'member_ids must be a list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(member_ids) > MAX_BULK_MEMBERS:
+            return None, None, Response(
+                {'error': f'At most {MAX_BULK_MEMBERS} member_ids per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            # Preserve request order, drop duplicates
+            member_ids = list(dict.fromkeys(int(member_id) for member_id in member_ids))
+        except (TypeError, ValueError):
+            return None, None, Response(
+                {'error': 'member_ids must contain integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return program, member_ids, None
+    
+    @action(detail=True, methods=['post'])
+    def bulk_assign(self, request, pk=None):
+        """
+        Assign a program to many members at once.
+        
+        Request:  POST /api/programs/{id}/bulk_assign/  {"member_ids": [3, 4, 5]}
+        Response: {"results": [{"member_id": 3, "status": "assigned" | "already_assigned" | "not_found"}, ...]}
+        """
+        program, member_ids, error = self._bulk_target(request)
+        if error:
+            return error
+        
+        with transaction.atomic():
+            _lock_assignments(program)
+            valid = set(User.objects.filter(id__in=member_ids, role='member').values_list('id', flat=True))
+            existing = set(
+                program.assignments.filter(member_id__in=valid).values_list('member_id', flat=True)
+            )
+            new_ids = [member_id for member_id in member_ids if member_id in valid and member_id not in existing]
+            inserted = _insert_assignments(program, new_ids)
+            if inserted:
+                adjust_revenue(inserted.values())
+                bump_dashboard_version()
+        
+        results = [
+            {'member_id': member_id, 'status': (
+                'not_found' if member_id not in valid
+                else 'assigned' if member_id in inserted
+                else 'already_assigned'
+            )}
+            for member_id in member_ids
+        ]
+        return Response({'program': program.id, 'results': results})
+    
+    @action(detail=True, methods=['post', 'delete'])
+    def bulk_unassign(self, request, pk=None):
+        """
+        Remove a program from many members at once.
+        
+        Request:  POST|DELETE /api/programs/{id}/bulk_unassign/  {"member_ids": [3, 4]}
+        Response: {"results": [{"member_id": 3, "status": "unassigned" | "not_assigned"}, ...]}
+        """
+        program, member_ids, error = self._bulk_target(request)
+        if error:
+            return error
+        
+        # The post_delete signals update revenue and the dashboard version; batched,
+        # that is one counter UPDATE per month however many rows go
+        with transaction.atomic(), batched_adjustments():
+            _lock_assignments(program)
+            assignments = program.assignments.filter(member_id__in=member_ids)
+            existing = set(assignments.values_list('member_id', flat=True))
+            if existing:
+                assignments.delete()
+        
+        results = [
+            {'member_id': member_id, 'status': 'unassigned' if member_id in existing else 'not_assigned'}
+            for member_id in member_ids
+        ]
+        return Response({'program': program.id, 'results': results})
+    
+    @action(detail=True, methods=['put'])
+    def set_members(self, request, pk=None):
+        """
+        Make the program's assigned members exactly `member_ids`, applying only the diff.
+        
+        Request:  PUT /api/programs/{id}/set_members/  {"member_ids": [3, 4, 5]}
+        Response: {"added": [...], "removed": [...], "unchanged": [...], "not_found": [...]}
+        """
+        program, member_ids, error = self._bulk_target(request, allow_empty=True)
+        if error:
+            return error
+        
+        with transaction.atomic(), batched_adjustments():
+            _lock_assignments(program)
+            valid = set(User.objects.filter(id__in=member_ids, role='member').values_list('id', flat=True))
+            current = set(program.assignments.values_list('member_id', flat=True))
+            missing = [member_id for member_id in member_ids if member_id in valid and member_id not in current]
+            removed = sorted(current - valid)
+            
+            if removed:
+                # Revenue and dashboard version follow from the post_delete signals
+                program.assignments.filter(member_id__in=removed).delete()
+            inserted = _insert_assignments(program, missing)
+            added = [member_id for member_id in missing if member_id in inserted]
+            if inserted:
+                adjust_revenue(inserted.values())
+                bump_dashboard_version()
+        
+        return Response({
+            'program': program.id,
+            'added': added,
+            'removed': removed,
+            'unchanged': [
+                member_id for member_id in member_ids
+                if member_id in valid and member_id not in added
+            ],
+            'not_found': [member_id for member_id in member_ids if member_id not in valid],
+        })
+    
     @action(detail=False, methods=['get'])
     def assigned_members(self, request):
         """Get members assigned to a program"""
@@ -159,7 +337,7 @@ class ProgramViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        assignments = program.assignments.all()
+        assignments = program.assignments.select_related('member', 'program')
         serializer = ProgramAssignmentSerializer(assignments, many=True)
         return Response(serializer.data)
 
@@ -168,17 +346,21 @@ class ClientTrainerAssignmentViewSet(viewsets.ModelViewSet):
     """ViewSet for program assignments to members"""
     serializer_class = ProgramAssignmentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = AssignedAtCursorPagination
     
     def get_queryset(self):
         """Filter assignments by trainer's programs or member's assigned programs"""
         user = self.request.user
         if user.role == 'trainer':
             # Trainers see assignments for their own programs
-            return ProgramAssignment.objects.filter(program__trainer=user)
+            queryset = ProgramAssignment.objects.filter(program__trainer=user)
         elif user.role == 'member':
             # Members see their own assignments
-            return ProgramAssignment.objects.filter(member=user)
-        return ProgramAssignment.objects.none()
+            queryset = ProgramAssignment.objects.filter(member=user)
+        else:
+            return ProgramAssignment.objects.none()
+        # The serializer reads member and program names on every row
+        return queryset.select_related('member', 'program')
 
 
 class SessionViewSet(viewsets.ModelViewSet):
@@ -191,7 +373,7 @@ class SessionViewSet(viewsets.ModelViewSet):
         # For now, return empty queryset - can be expanded based on Session model
         from .models import Program
         if user.role == 'trainer':
-            return Program.objects.filter(trainer=user)
+            return program_list_queryset(Program.objects.filter(trainer=user))
         return Program.objects.none()
     
     def get_serializer_class(self):
@@ -3,3 +3,17 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
+        from core.metrics import registry
+        from .authentication import verified_tokens
+        from .dashboard_cache import dashboard_cache
+        from .hashing import password_pool
+        from .login_guard import login_guard
+        from .revocation import revocation_store
+        registry.register_collector('password_hash_pool', password_pool.stats)
+        registry.register_collector('login_guard', login_guard.stats)
+        registry.register_collector('dashboard_cache', dashboard_cache.stats)
+        registry.register_collector('verified_token_cache', verified_tokens.stats)
+        registry.register_collector('refresh_revocation', revocation_store.stats)
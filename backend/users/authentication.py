@@ -0,0 +1,80 @@
+"""
+Stateless JWT authentication.
+
+Access tokens issued by users.tokens carry the user's role, is_active flag and
+token version, so request.user is built from the claims alone: a User instance
+whose other fields are deferred and loaded (all at once) only if a view reads
+one. Verified tokens are kept in a bounded LRU so repeat requests skip signature
+checking and payload decoding. The only per-request lookup left is the token
+version, served from Django's cache (see users.tokens).
+
+Tokens without these claims (issued before this path existed) fall back to the
+stock simplejwt user lookup.
+"""
+import time
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from core.lru import LRUCache
+from .models import User
+from .tokens import ACTIVE_CLAIM, ROLE_CLAIM, TOKEN_VERSION_CLAIM, current_token_version
+
+CLAIM_FIELDS = ('id', 'role', 'is_active')
+
+# raw token -> (user id, role, is_active, token version, exp, validated token)
+verified_tokens = LRUCache(maxsize=getattr(settings, 'JWT_VERIFIED_TOKEN_CACHE_SIZE', 10000))
+
+
+def claims_user(user_id, role, is_active):
+    """User built from token claims; every other field is deferred"""
+    user = User.from_db(User.objects.db, CLAIM_FIELDS, (user_id, role, is_active))
+    user._from_token_claims = True
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that trusts the token's role/is_active claims instead of reading auth_user"""
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        claims = verified_tokens.get(raw_token)
+        if claims is not None and claims[4] <= time.time():
+            verified_tokens.pop(raw_token)
+            claims = None
+        if claims is None:
+            validated_token = self.get_validated_token(raw_token)
+            claims = self._claims(validated_token)
+            if claims is None:
+                return self.get_user(validated_token), validated_token
+            verified_tokens.set(raw_token, claims)
+
+        user_id, role, is_active, version, _exp, validated_token = claims
+        if not is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if version != current_token_version(user_id):
+            verified_tokens.pop(raw_token)
+            raise InvalidToken(_('Token has been revoked'))
+        return claims_user(user_id, role, is_active), validated_token
+
+    def _claims(self, validated_token):
+        try:
+            return (
+                User._meta.pk.to_python(validated_token[jwt_settings.USER_ID_CLAIM]),
+                validated_token[ROLE_CLAIM],
+                validated_token[ACTIVE_CLAIM],
+                validated_token[TOKEN_VERSION_CLAIM],
+                validated_token['exp'],
+                validated_token,
+            )
+        except KeyError:
+            return None
@@ -1,5 +1,9 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import PermissionDenied
+from rest_framework.request import Request
+from .hashing import HashPoolBusy, check_user_password, hash_password
+from .login_guard import LoginLocked, login_guard
 
 User = get_user_model()
 
@@ -8,26 +12,59 @@ class EmailBackend(ModelBackend):
     """
     Custom authentication backend that allows users to login with email instead of username.
     This backend works with custom User models that use email as USERNAME_FIELD.
+    
+    It is the only configured backend, so every login costs exactly one user
+    query and one password hash, whether it succeeds or fails. Hashing runs in
+    the users.hashing process pool. Before either, users.login_guard turns away
+    emails and IPs with too many recent failures.
+    
+    Both refusals (LoginLocked, HashPoolBusy) reach API views as 429/503 with
+    Retry-After; other callers such as the admin login get PermissionDenied,
+    which makes authenticate() fail instead of raising a 500.
     """
     
     def authenticate(self, request, username=None, password=None, **kwargs):
         """
         Authenticate user using email and password.
-        The 'username' parameter is actually the email address.
+        The 'username' parameter is actually the email address; callers that
+        pass USERNAME_FIELD by name (e.g. simplejwt's `email=`) work too.
         """
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        
+        try:
+            login_guard.check(request, username)
+        except LoginLocked:
+            if isinstance(request, Request):
+                raise  # API views answer 429 with Retry-After
+            raise PermissionDenied  # e.g. admin login: authenticate() fails without trying other backends
+        
+        try:
+            return self._authenticate(request, username, password)
+        except HashPoolBusy:
+            if isinstance(request, Request):
+                raise  # API views answer 503 with Retry-After
+            raise PermissionDenied
+    
+    def _authenticate(self, request, username, password):
         try:
-            # Try to get user by email (username param contains email)
-            user = User.objects.get(email=username)
+            # Case-insensitive: one seek on the email_normalized index
+            user = User.objects.by_email(username).get()
         except User.DoesNotExist:
             # Run the default password hasher once to reduce the timing
             # difference between an existing and a nonexistent user
-            User().set_password(password)
+            hash_password(password)
+            login_guard.failure(request, username)
             return None
         
-        # Check password
-        if user.check_password(password) and self.user_can_authenticate(user):
+        # Check password (in the hashing pool; rehashes outdated hashes)
+        if check_user_password(user, password) and self.user_can_authenticate(user):
+            login_guard.success(request, username)
             return user
         
+        login_guard.failure(request, username)
         return None
     
     def get_user(self, user_id):
@@ -0,0 +1,33 @@
+"""
+Per-user cache of rendered DashboardView payloads.
+
+Entries are keyed by (user id, role, data version, request path). The data version
+is a shared stamp in gym_info's counters table, bumped by users.signals whenever a
+User, Member, Program or ProgramAssignment is written, so a stale payload is never
+looked up again; old entries simply age out of the LRU. Bulk writes that bypass
+signals (queryset .update(), bulk_create) must call bump_dashboard_version().
+Bumping also drops the memoized owner totals in gym_info.dashboard_stats.
+"""
+from django.conf import settings
+
+from core.lru import LRUCache
+from gym_info.counters import bump_version, get_version
+from gym_info.dashboard_stats import invalidate_dashboard_stats
+
+VERSION_NAME = 'dashboard'
+
+dashboard_cache = LRUCache(maxsize=getattr(settings, 'DASHBOARD_CACHE_SIZE', 1024))
+
+
+def dashboard_version():
+    return get_version(VERSION_NAME)
+
+
+def bump_dashboard_version():
+    bump_version(VERSION_NAME)
+    invalidate_dashboard_stats()
+
+
+def dashboard_cache_key(request):
+    user = request.user
+    return (user.pk, user.role, dashboard_version(), request.get_full_path())
@@ -0,0 +1,16 @@
+"""
+Functions executed inside the password hashing process pool (users.hashing).
+
+Kept free of settings and model imports so a spawned/forkserver worker can import
+this module without configuring Django. Hashers are passed by dotted path.
+"""
+from django.utils.module_loading import import_string
+
+
+def encode_password(hasher_path, password):
+    hasher = import_string(hasher_path)()
+    return hasher.encode(password, hasher.salt())
+
+
+def verify_password(hasher_path, password, encoded):
+    return import_string(hasher_path)().verify(password, encoded)
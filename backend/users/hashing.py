@@ -0,0 +1,174 @@
+"""
+Password hashing offloaded to a bounded process pool.
+
+PBKDF2 pins a CPU for a few hundred ms per call; run on the request worker, a
+login burst queues every other API call behind it. Here hashing and
+verification run in PASSWORD_HASH_WORKERS processes. At most
+PASSWORD_HASH_MAX_QUEUE further calls may wait for a free worker; beyond that
+HashPoolBusy is raised, which DRF turns into a fast 503 with Retry-After; so is
+a call still unanswered after PASSWORD_HASH_TIMEOUT seconds. A timed-out job
+keeps its slot until the worker actually finishes it.
+PASSWORD_HASH_WORKERS = 0 hashes inline on the calling thread.
+"""
+import atexit
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, identify_hasher, is_password_usable
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from . import hash_workers
+
+
+class HashPoolBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many sign-in attempts are being processed. Please retry shortly.'
+    default_code = 'hash_pool_busy'
+
+    def __init__(self, wait):
+        super().__init__()
+        # Read by DRF's exception handler to set the Retry-After header
+        self.wait = wait
+
+
+def _hasher_path(hasher):
+    return f'{type(hasher).__module__}.{type(hasher).__qualname__}'
+
+
+class PasswordHashPool:
+    """Process pool with admission control and queue-depth metrics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+        self._config = None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    @staticmethod
+    def _settings():
+        return (
+            getattr(settings, 'PASSWORD_HASH_WORKERS', 2),
+            getattr(settings, 'PASSWORD_HASH_MAX_QUEUE', 16),
+            getattr(settings, 'PASSWORD_HASH_RETRY_AFTER', 1),
+            getattr(settings, 'PASSWORD_HASH_TIMEOUT', 30),
+        )
+
+    def _ensure_executor(self, workers, max_queue):
+        with self._lock:
+            if self._config != (workers, max_queue) or self._executor is None:
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = ProcessPoolExecutor(max_workers=workers)
+                self._slots = threading.BoundedSemaphore(workers + max_queue)
+                self._config = (workers, max_queue)
+            return self._executor, self._slots
+
+    def _reset(self):
+        with self._lock:
+            self._executor = None
+
+    def shutdown(self):
+        """Stop the worker processes (registered with atexit); the next call starts a new pool"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _count_completed(self):
+        with self._lock:
+            self.completed += 1
+
+    def run(self, fn, *args):
+        workers, max_queue, retry_after, timeout = self._settings()
+        if not workers:
+            result = fn(*args)
+            self._count_completed()
+            return result
+
+        executor, slots = self._ensure_executor(workers, max_queue)
+        with self._lock:
+            if not slots.acquire(blocking=False):
+                self.rejected += 1
+                raise HashPoolBusy(wait=retry_after)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+        def release(_future=None):
+            with self._lock:
+                self.in_flight -= 1
+            slots.release()
+
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            release()
+            self._reset()
+            result = fn(*args)
+            self._count_completed()
+            return result
+        # The slot is held until the job leaves the pool, not until this call stops waiting
+        future.add_done_callback(release)
+        try:
+            result = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()  # drops it if still queued; a running job finishes and then frees the slot
+            raise HashPoolBusy(wait=retry_after)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); rebuild the pool next time, finish this call inline
+            self._reset()
+            result = fn(*args)
+        self._count_completed()
+        return result
+
+    def stats(self):
+        workers, max_queue, _, _ = self._settings()
+        return {
+            'workers': workers,
+            'max_queue': max_queue,
+            'in_flight': self.in_flight,
+            'queue_depth': max(0, self.in_flight - workers),
+            'peak_in_flight': self.peak_in_flight,
+            'completed': self.completed,
+            'rejected': self.rejected,
+        }
+
+
+password_pool = PasswordHashPool()
+# Before interpreter teardown, which otherwise races the pool's own worker cleanup
+atexit.register(password_pool.shutdown)
+
+
+def hash_password(password):
+    """Encode `password` with the preferred hasher (like make_password) in the pool"""
+    return password_pool.run(hash_workers.encode_password, _hasher_path(get_hasher()), password)
+
+
+def check_user_password(user, password):
+    """
+    Verify `password` against `user.password` in the pool.
+    If it matches but was stored with another hasher or outdated parameters,
+    the user is transparently rehashed with the preferred hasher and saved.
+    """
+    encoded = user.password
+    if password is None or not is_password_usable(encoded):
+        return False
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+
+    if not password_pool.run(hash_workers.verify_password, _hasher_path(hasher), password, encoded):
+        return False
+
+    preferred = get_hasher()
+    if hasher.algorithm != preferred.algorithm or preferred.must_update(encoded):
+        user.password = hash_password(password)
+        user.save(update_fields=['password'])
+    return True
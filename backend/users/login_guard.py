@@ -0,0 +1,166 @@
+"""
+Brute-force protection for the login endpoints.
+
+Failed logins are recorded per email and per client IP as timestamp logs in a
+local cache (the 'login_guard' alias in CACHES), trimmed to a sliding window
+of LOGIN_FAILURE_WINDOW seconds. Before a login looks up a user or hashes a
+password, EmailBackend asks the guard whether either key is held off:
+
+  * after LOGIN_*_FREE_FAILURES failures in the window, each further attempt
+    must wait LOGIN_DELAY_BASE * 2**(extra failures - 1) seconds (capped at
+    LOGIN_DELAY_MAX) after the latest failure;
+  * at LOGIN_*_LOCKOUT_FAILURES failures the key is locked until enough of
+    them slide out of the window.
+
+Held-off attempts are answered with 429 and Retry-After instead of sleeping,
+so rejecting one costs a cache read. A successful login clears its email's log;
+the IP log only ages out.
+
+The logs only learn of a failure once its password has been checked, so a
+parallel burst would all pass check() first. check() therefore also reserves
+the attempt with an atomic cache.add + cache.incr on a per-window bucket
+counter and turns away attempts that push the key past its lockout count
+(the previous bucket weighted by how much of it still lies in the sliding
+window). success() gives the reservation back; failures keep it.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.exceptions import Throttled
+
+from .models import normalize_email_address
+
+
+class LoginLocked(Throttled):
+    default_detail = 'Too many failed sign-in attempts.'
+    default_code = 'login_locked'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def client_ip(request):
+    return request.META.get('REMOTE_ADDR') or 'unknown'
+
+
+class LoginGuard:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.rejected = 0
+        self.hashed = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    @property
+    def cache(self):
+        return caches[_setting('LOGIN_GUARD_CACHE', 'login_guard')]
+
+    def _keys(self, request, email):
+        keys = []
+        if email:
+            keys.append((f'login_guard:email:{normalize_email_address(email)}', 'EMAIL'))
+        if request is not None:
+            keys.append((f'login_guard:ip:{client_ip(request)}', 'IP'))
+        return keys
+
+    def _failures(self, key, now):
+        window = _setting('LOGIN_FAILURE_WINDOW', 900)
+        return [t for t in self.cache.get(key, ()) if t > now - window]
+
+    def _wait(self, failures, scope, now):
+        if not failures:
+            return 0
+        free = _setting(f'LOGIN_{scope}_FREE_FAILURES', 3)
+        lockout = _setting(f'LOGIN_{scope}_LOCKOUT_FAILURES', 10)
+        if len(failures) >= lockout:
+            # Locked until the count drops back below the lockout threshold
+            return failures[len(failures) - lockout] + _setting('LOGIN_FAILURE_WINDOW', 900) - now
+        extra = len(failures) - free
+        if extra <= 0:
+            return 0
+        delay = min(_setting('LOGIN_DELAY_BASE', 1) * 2 ** (extra - 1), _setting('LOGIN_DELAY_MAX', 60))
+        return failures[-1] + delay - now
+
+    def _buckets(self, key, now):
+        """(current, previous) attempt counter keys of `key` and the elapsed share of the current window"""
+        window = _setting('LOGIN_FAILURE_WINDOW', 900)
+        bucket, elapsed = divmod(now, window)
+        bucket = int(bucket)
+        return f'{key}:attempts:{bucket}', f'{key}:attempts:{bucket - 1}', elapsed / window
+
+    def _release(self, counter_keys):
+        for counter_key in counter_keys:
+            try:
+                self.cache.decr(counter_key)
+            except ValueError:
+                pass  # expired meanwhile
+
+    def _reserve(self, keys, now):
+        """Count this attempt against every key; returns the wait if one is over its lockout count"""
+        window = _setting('LOGIN_FAILURE_WINDOW', 900)
+        reserved = []
+        for key, scope in keys:
+            current, previous, elapsed = self._buckets(key, now)
+            self.cache.add(current, 0, 2 * window)
+            reserved.append(current)
+            attempts = self.cache.incr(current) + self.cache.get(previous, 0) * (1 - elapsed)
+            if attempts > _setting(f'LOGIN_{scope}_LOCKOUT_FAILURES', 10):
+                self._release(reserved)
+                return window * (1 - elapsed)
+        return 0
+
+    def check(self, request, email):
+        """
+        Raise LoginLocked if the email or client IP must wait; called before any hashing.
+        Otherwise the attempt is counted until success() releases it.
+        """
+        now = time.time()
+        keys = self._keys(request, email)
+        wait = max((self._wait(self._failures(key, now), scope, now) for key, scope in keys), default=0)
+        if wait <= 0:
+            wait = self._reserve(keys, now)
+        if wait > 0:
+            with self._lock:
+                self.rejected += 1
+            raise LoginLocked(wait=wait)
+        with self._lock:
+            self.hashed += 1
+
+    def failure(self, request, email):
+        now = time.time()
+        window = _setting('LOGIN_FAILURE_WINDOW', 900)
+        with self._lock:
+            self.failed += 1
+            for key, scope in self._keys(request, email):
+                # Only the newest LOCKOUT timestamps can affect a decision
+                keep = _setting(f'LOGIN_{scope}_LOCKOUT_FAILURES', 10)
+                failures = (self._failures(key, now) + [now])[-keep:]
+                self.cache.set(key, failures, window)
+
+    def success(self, request, email):
+        now = time.time()
+        with self._lock:
+            self.succeeded += 1
+        keys = self._keys(request, email)
+        if email:
+            key = keys.pop(0)[0]
+            self.cache.delete_many([key, *self._buckets(key, now)[:2]])
+        self._release(self._buckets(key, now)[0] for key, _ in keys)
+
+    def stats(self):
+        return {
+            'rejected': self.rejected,
+            'hashed': self.hashed,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+        }
+
+
+login_guard = LoginGuard()
@@ -0,0 +1,81 @@
+import time
+
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+
+User = get_user_model()
+
+LEGACY_BACKENDS = [
+    'users.backends.EmailBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark login throughput (success / wrong password / unknown email), current vs legacy backend chain'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--attempts', type=int, default=10, help='Attempts per scenario (default 10)')
+        parser.add_argument('--skip-legacy', action='store_true', help='Only measure the configured backends')
+
+    def handle(self, *args, **options):
+        attempts = options['attempts']
+        hasher = get_hasher()
+        self.stdout.write(f"\n=== Login benchmark: {attempts} attempts per scenario, hasher={hasher.algorithm} ===")
+
+        # The benchmark user only exists inside this transaction
+        try:
+            with transaction.atomic():
+                User.objects.create_user(
+                    email='bench-login@muscle.fit', username='bench-login@muscle.fit',
+                    password='bench-pass-123', role='member'
+                )
+                self.run_suite('configured', attempts, hasher)
+                if not options['skip_legacy']:
+                    with override_settings(AUTHENTICATION_BACKENDS=LEGACY_BACKENDS):
+                        self.run_suite('legacy chain', attempts, hasher)
+                raise Rollback
+        except Rollback:
+            pass
+        self.stdout.write("")
+
+    def run_suite(self, label, attempts, hasher):
+        self.stdout.write(f"\n[{label}]")
+        scenarios = (
+            ('success', 'bench-login@muscle.fit', 'bench-pass-123', True),
+            ('wrong password', 'bench-login@muscle.fit', 'nope', False),
+            ('unknown email', 'nobody@muscle.fit', 'bench-pass-123', False),
+        )
+        for name, email, password, expected in scenarios:
+            elapsed, hashes, queries = self.measure(attempts, hasher, email, password, expected)
+            self.stdout.write(
+                f"  {name:15s} {attempts / elapsed:7.2f} logins/s  {elapsed / attempts * 1000:8.1f} ms/login  "
+                f"{hashes / attempts:.0f} hash(es)  {queries / attempts:.0f} query(ies)"
+            )
+
+    def measure(self, attempts, hasher, email, password, expected):
+        calls = {'count': 0}
+        encode = hasher.encode
+
+        def counting_encode(*args, **kwargs):
+            calls['count'] += 1
+            return encode(*args, **kwargs)
+
+        hasher.encode = counting_encode
+        try:
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                for _ in range(attempts):
+                    user = authenticate(None, username=email, password=password)
+                    assert (user is not None) == expected
+                elapsed = time.perf_counter() - start
+        finally:
+            del hasher.encode
+        return elapsed, calls['count'], len(ctx.captured_queries)
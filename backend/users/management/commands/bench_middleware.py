@@ -0,0 +1,73 @@
+import time
+
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.urls import path
+
+FULL_STACK = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+
+def noop(request):
+    return HttpResponse(b'{}', content_type='application/json')
+
+
+# A trivial view on both sides of the API prefix, so timings are middleware overhead only
+urlpatterns = [
+    path('api/_bench/', noop),
+    path('site/_bench/', noop),
+]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark per-request middleware overhead: full stack vs path-scoped vs API-only profile'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5000, help='Requests per scenario (default 5000)')
+        parser.add_argument('--rounds', type=int, default=5, help='Best of N rounds (default 5)')
+
+    def handle(self, *args, **options):
+        from django.conf import settings
+        from core import settings_api
+
+        count, rounds = options['requests'], options['rounds']
+        self.stdout.write(f"\n=== Middleware benchmark: {count} requests per scenario, best of {rounds}, no-op view ===")
+        empty = self.measure([], '/api/_bench/', count, rounds)
+        self.stdout.write(f"  {'no middleware':26s} {empty:8.1f} µs/request")
+        scenarios = (
+            ('full stack, /api/', FULL_STACK, '/api/_bench/'),
+            ('path-scoped, /api/', settings.MIDDLEWARE, '/api/_bench/'),
+            ('path-scoped, site path', settings.MIDDLEWARE, '/site/_bench/'),
+            ('API-only profile, /api/', settings_api.MIDDLEWARE, '/api/_bench/'),
+        )
+        for label, middleware, url in scenarios:
+            per_request = self.measure(middleware, url, count, rounds)
+            self.stdout.write(
+                f"  {label:26s} {per_request:8.1f} µs/request  ({per_request - empty:6.1f} µs middleware)"
+            )
+        self.stdout.write("")
+
+    def measure(self, middleware, url, count, rounds):
+        factory = RequestFactory()
+        with override_settings(MIDDLEWARE=middleware, ROOT_URLCONF=__name__):
+            handler = BaseHandler()
+            handler.load_middleware()
+            best = None
+            for _ in range(rounds):
+                start = time.perf_counter()
+                for _ in range(count):
+                    handler.get_response(factory.get(url))
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+        return best / count * 1e6
@@ -0,0 +1,88 @@
+import random
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from users.models import RevokedToken
+from users.revocation import revocation_store
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the refresh-token revocation store with N issued tokens (default 1M)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tokens', type=int, default=1_000_000, help='Refresh tokens issued (default 1,000,000)')
+        parser.add_argument('--revoked', type=float, default=0.9, help='Fraction of them revoked (default 0.9)')
+        parser.add_argument('--lifetime-days', type=int, default=7, help='Refresh token lifetime (default 7)')
+        parser.add_argument('--checks', type=int, default=20000, help='Checks per scenario (default 20,000)')
+
+    def handle(self, *args, **options):
+        tokens, checks = options['tokens'], options['checks']
+        lifetime = options['lifetime_days'] * 86400
+        now = time.time()
+        self.stdout.write(f"\n=== Revocation benchmark: {tokens:,} issued tokens, {options['revoked']:.0%} revoked ===")
+
+        rng = random.Random(42)
+        # Expiries start an hour out so none lapse while the benchmark runs
+        issued = [(uuid.uuid4().hex, int(now + 3600 + rng.uniform(0, lifetime - 3600))) for _ in range(tokens)]
+        cut = int(tokens * options['revoked'])
+        revoked, live = issued[:cut], issued[cut:]
+
+        # The revocations only exist inside this transaction
+        try:
+            with transaction.atomic():
+                start = time.perf_counter()
+                RevokedToken.objects.bulk_create([
+                    RevokedToken(jti=jti, expires_at=datetime.fromtimestamp(exp, dt_timezone.utc))
+                    for jti, exp in revoked
+                ], batch_size=10000)
+                self.report('insert revocations', time.perf_counter() - start, len(revoked))
+
+                revocation_store.reset()
+                start = time.perf_counter()
+                revocation_store._sync(force=True)
+                self.report('load Bloom filters', time.perf_counter() - start, len(revoked))
+                stats = revocation_store.stats()
+                self.stdout.write(
+                    f"  {stats['buckets']} bucket(s), {stats['entries']:,} entries, "
+                    f"{stats['bloom_bytes'] / 2**20:.1f} MiB of filters"
+                )
+
+                for label, sample, expected in (
+                    ('check live token', rng.sample(live, min(checks, len(live))), False),
+                    ('check revoked token', rng.sample(revoked, min(checks, len(revoked))), True),
+                ):
+                    revocation_store.reset_counters()
+                    start = time.perf_counter()
+                    for jti, exp in sample:
+                        assert revocation_store.is_revoked(jti, exp) is expected
+                    elapsed = time.perf_counter() - start
+                    stats = revocation_store.stats()
+                    self.report(label, elapsed, len(sample))
+                    self.stdout.write(
+                        f"      {stats['db_lookups'] / len(sample):.4f} jti lookups/check, "
+                        f"{stats['false_positives']} false positive(s)"
+                    )
+
+                half_life = now + lifetime / 2
+                start = time.perf_counter()
+                deleted = revocation_store.compact(now=half_life)
+                self.report('compact (half expired)', time.perf_counter() - start, deleted)
+                self.stdout.write(
+                    f"  rows kept: {RevokedToken.objects.count():,} "
+                    f"(token_blacklist would keep {tokens:,} outstanding + {len(revoked):,} blacklisted)"
+                )
+                raise Rollback
+        except Rollback:
+            pass
+        self.stdout.write("")
+
+    def report(self, label, elapsed, count):
+        per_op = elapsed / count * 1e6 if count else 0.0
+        self.stdout.write(f"  {label:24s} {elapsed:8.2f} s  {per_op:8.2f} µs/op  ({count:,})")
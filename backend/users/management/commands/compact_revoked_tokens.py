@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from users.revocation import revocation_store
+
+
+class Command(BaseCommand):
+    help = 'Delete revoked refresh-token entries whose tokens have expired'
+
+    def handle(self, *args, **options):
+        deleted = revocation_store.compact()
+        self.stdout.write(self.style.SUCCESS(f"✅ Removed {deleted} expired revocation(s)"))
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 11:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', 'is_active', 'created_at', 'id'], name='user_role_active_created_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:10
+
+from django.db import migrations
+
+import users.models
+
+
+def normalize_email_address(email):
+    # Frozen copy of users.models.normalize_email_address as of this migration
+    return email.strip().lower() if email else None
+
+
+def check_email_clashes(apps, schema_editor):
+    """Refuse to start if two accounts would share a normalized email; nothing has been changed yet"""
+    User = apps.get_model('users', 'User')
+    db = schema_editor.connection.alias
+    seen, clashes = set(), []
+    for email in User.objects.using(db).values_list('email', flat=True).iterator(chunk_size=2000):
+        key = normalize_email_address(email)
+        if key is None:
+            continue
+        if key in seen:
+            clashes.append(key)
+        seen.add(key)
+    if clashes:
+        raise RuntimeError(
+            'Accounts differ only by email case; merge or rename them before migrating: '
+            + ', '.join(sorted(set(clashes))[:20])
+        )
+
+
+class Migration(migrations.Migration):
+    # Schema change only; the backfill (0005) and the unique constraint (0006) follow
+
+    dependencies = [
+        ('users', '0003_revokedtoken'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_email_clashes, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='user',
+            name='email_normalized',
+            field=users.models.NormalizedEmailField(editable=False, max_length=254, null=True),
+        ),
+    ]
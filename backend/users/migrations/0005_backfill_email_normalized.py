@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:10
+
+from django.db import migrations, transaction
+
+BATCH_SIZE = 1000
+
+
+def normalize_email_address(email):
+    # Frozen copy of users.models.normalize_email_address as of this migration
+    return email.strip().lower() if email else None
+
+
+def backfill_email_normalized(apps, schema_editor):
+    """Idempotent, so an interrupted run can simply be migrated again"""
+    User = apps.get_model('users', 'User')
+    db = schema_editor.connection.alias
+    last_pk = 0
+    while True:
+        # One short transaction per batch so a large table isn't locked for the whole run
+        with transaction.atomic(using=db):
+            batch = list(
+                User.objects.using(db).filter(pk__gt=last_pk).order_by('pk').only('pk', 'email')[:BATCH_SIZE]
+            )
+            if not batch:
+                break
+            for user in batch:
+                user.email_normalized = normalize_email_address(user.email)
+            User.objects.using(db).bulk_update(batch, ['email_normalized'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+    # Backfill batches commit one by one
+    atomic = False
+
+    dependencies = [
+        ('users', '0004_user_email_normalized'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_email_normalized, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:10
+
+from django.db import migrations
+
+import users.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_backfill_email_normalized'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='email_normalized',
+            field=users.models.NormalizedEmailField(editable=False, max_length=254, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_user_email_normalized_unique'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', 'created_at', 'id'], name='user_role_created_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:40
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_user_role_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='revokedtoken',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+    ]
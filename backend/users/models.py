@@ -1,8 +1,44 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser, UserManager as DjangoUserManager
 
+
+def normalize_email_address(email):
+    """Case-insensitive lookup key for an email address"""
+    return email.strip().lower() if email else None
+
+
+class NormalizedEmailField(models.CharField):
+    """Lower-cased copy of another field, recomputed on every save and bulk_create"""
+    
+    def __init__(self, *args, source='email', **kwargs):
+        self.source = source
+        kwargs.setdefault('max_length', 254)
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+    
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.source != 'email':
+            kwargs['source'] = self.source
+        return name, path, args, kwargs
+    
+    def pre_save(self, model_instance, add):
+        value = normalize_email_address(getattr(model_instance, self.source))
+        setattr(model_instance, self.attname, value)
+        return value
+
+
 class UserManager(DjangoUserManager):
     """Custom user manager for email-based authentication"""
+    
+    def by_email(self, email):
+        """Users whose email matches case-insensitively (an index seek on email_normalized)"""
+        return self.filter(email_normalized=normalize_email_address(email))
+    
+    def get_by_natural_key(self, username):
+        return self.get(email_normalized=normalize_email_address(username))
+    
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError('The Email field must be set')
@@ -25,6 +61,9 @@ class User(AbstractUser):
     ]
     
     email = models.EmailField(unique=True)
+    # Every email lookup goes through this (UserManager.by_email), so logins are case-insensitive.
+    # Queryset .update(email=...) bypasses it; save the instances instead.
+    email_normalized = NormalizedEmailField(unique=True, null=True)
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='member')
     phone = models.CharField(max_length=15, blank=True, null=True)
     profile_image = models.ImageField(upload_to='profiles/', blank=True, null=True)
@@ -43,6 +82,42 @@ class User(AbstractUser):
         verbose_name = 'User'
         verbose_name_plural = 'Users'
         ordering = ['-created_at']
+        # Role-filtered listings page by (created_at, id) within role/is_active, or within
+        # role alone (e.g. /users/members/ without ?is_active)
+        indexes = [
+            models.Index(fields=['role', 'is_active', 'created_at', 'id'], name='user_role_active_created_idx'),
+            models.Index(fields=['role', 'created_at', 'id'], name='user_role_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.email} ({self.get_role_display()})"
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'email' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'email_normalized'}
+        super().save(*args, **kwargs)
+    
+    def refresh_from_db(self, using=None, fields=None):
+        # Users built from JWT claims (users.authentication) defer every other field;
+        # the first one read loads them all in one query instead of one query each
+        if fields is not None and getattr(self, '_from_token_claims', False):
+            deferred = self.get_deferred_fields()
+            if deferred.issuperset(fields):
+                fields = deferred
+        super().refresh_from_db(using=using, fields=fields)
+
+
+class RevokedToken(models.Model):
+    """A revoked refresh token's jti, kept only until the token would have expired (see users.revocation)"""
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    # Other processes sync their filters by this (see RevocationStore._sync)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        verbose_name = 'Revoked token'
+        verbose_name_plural = 'Revoked tokens'
+
+    def __str__(self):
+        return self.jti
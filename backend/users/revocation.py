@@ -0,0 +1,153 @@
+"""
+Refresh-token revocation store.
+
+Revoked jti values live in users.RevokedToken only until the token's own `exp`;
+after that the signature check rejects the token anyway, so compaction deletes
+the row. Nothing is recorded for tokens that are never revoked, unlike
+simplejwt's token_blacklist app, which keeps an OutstandingToken row per login.
+
+Each process keeps Bloom filters in front of the table, one per expiry bucket
+(REVOCATION_BUCKET_SECONDS wide). A check hashes the jti into the bucket for the
+token's exp: a miss means "not revoked" without touching the database, and only
+a hit (a revoked token, or a rare false positive) costs one lookup on the unique
+jti index. Buckets whose tokens have all expired are dropped whole, so the
+filters never need rebuilding.
+
+Filters pick up other processes' revocations at most every
+REVOCATION_SYNC_INTERVAL seconds by re-reading rows created since the previous
+sync minus REVOCATION_SYNC_MARGIN seconds. Ids are not a commit-ordered
+high-water mark (a transaction holding a lower id can commit after a higher id
+was read), so the window is by created_at, wide enough to cover transactions
+still in flight at the last sync and clock skew between hosts; re-adding a jti
+the filter already holds is harmless. consume(), used when a
+refresh token is rotated, never relies on the filters: the unique jti insert is
+what makes a replayed token fail, even across processes.
+"""
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from core.bloom import BloomFilter
+from .models import RevokedToken
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class RevocationStore:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget all in-process state; the next check reloads unexpired rows"""
+        with self._lock:
+            self._buckets = {}
+            self._loaded = False
+            self._synced_at = 0.0
+            self._compacted_at = time.time()
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.checks = 0
+        self.bloom_rejections = 0
+        self.db_lookups = 0
+        self.false_positives = 0
+
+    def _bucket_for(self, exp):
+        return int(exp // _setting('REVOCATION_BUCKET_SECONDS', 86400))
+
+    def _add(self, jti, exp):
+        bucket = self._bucket_for(exp)
+        bloom = self._buckets.get(bucket)
+        if bloom is None:
+            bloom = self._buckets[bucket] = BloomFilter(
+                _setting('REVOCATION_BLOOM_CAPACITY', 250000),
+                _setting('REVOCATION_BLOOM_ERROR_RATE', 0.001),
+            )
+        bloom.add(jti)
+
+    def _sync(self, force=False):
+        now = time.time()
+        if not force and self._loaded and now - self._synced_at < _setting('REVOCATION_SYNC_INTERVAL', 1):
+            return
+        if not self._loaded:
+            # First load: every unexpired row
+            rows = RevokedToken.objects.filter(expires_at__gt=datetime.fromtimestamp(now, dt_timezone.utc))
+        else:
+            since = self._synced_at - _setting('REVOCATION_SYNC_MARGIN', 60)
+            rows = RevokedToken.objects.filter(created_at__gte=datetime.fromtimestamp(since, dt_timezone.utc))
+        with self._lock:
+            for jti, expires_at in rows.values_list('jti', 'expires_at').iterator(chunk_size=10000):
+                self._add(jti, expires_at.timestamp())
+            self._loaded = True
+            self._synced_at = now
+
+    def _might_be_revoked(self, jti, exp):
+        bloom = self._buckets.get(self._bucket_for(exp))
+        return bloom is not None and jti in bloom
+
+    def is_revoked(self, jti, exp):
+        """True if the token with this jti/exp has been revoked"""
+        self._sync()
+        self.checks += 1
+        if not self._might_be_revoked(jti, exp):
+            self.bloom_rejections += 1
+            return False
+        self.db_lookups += 1
+        revoked = RevokedToken.objects.filter(jti=jti).exists()
+        if not revoked:
+            self.false_positives += 1
+        return revoked
+
+    def revoke(self, jti, exp):
+        """Revoke the token; False if it already was"""
+        try:
+            with transaction.atomic():
+                RevokedToken.objects.create(jti=jti, expires_at=datetime.fromtimestamp(exp, dt_timezone.utc))
+        except IntegrityError:
+            return False
+        with self._lock:
+            self._add(jti, exp)
+        if time.time() - self._compacted_at >= _setting('REVOCATION_COMPACT_INTERVAL', 3600):
+            self.compact()
+        return True
+
+    def consume(self, jti, exp):
+        """Revoke a token as it is used (rotation); False if it was already used or revoked"""
+        self._sync()
+        if self._might_be_revoked(jti, exp) and RevokedToken.objects.filter(jti=jti).exists():
+            return False
+        return self.revoke(jti, exp)
+
+    def compact(self, now=None):
+        """Delete rows for expired tokens and drop their filters; returns the number of rows deleted"""
+        now = time.time() if now is None else now
+        deleted, _ = RevokedToken.objects.filter(
+            expires_at__lte=datetime.fromtimestamp(now, dt_timezone.utc)
+        ).delete()
+        current = self._bucket_for(now)
+        with self._lock:
+            for bucket in [b for b in self._buckets if b < current]:
+                del self._buckets[bucket]
+            self._compacted_at = time.time()
+        return deleted
+
+    def stats(self):
+        return {
+            'buckets': len(self._buckets),
+            'entries': sum(len(b) for b in self._buckets.values()),
+            'bloom_bytes': sum(b.nbytes for b in self._buckets.values()),
+            'checks': self.checks,
+            'bloom_rejections': self.bloom_rejections,
+            'db_lookups': self.db_lookups,
+            'false_positives': self.false_positives,
+        }
+
+
+revocation_store = RevocationStore()
@@ -1,6 +1,14 @@
-from rest_framework import serializers
-from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework import exceptions, serializers
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.models import update_last_login
+from django.db.models import Count, Max, Q
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from gym_info.counters import get_counter, trainer_key
+from .hashing import hash_password
+from .revocation import revocation_store
+from .tokens import TOKEN_VERSION_CLAIM, current_token_version, refresh_token_for
 
 User = get_user_model()
 
@@ -27,7 +35,7 @@ class RegisterSerializer(serializers.ModelSerializer):
         if data['password'] != data['password2']:
             raise serializers.ValidationError({"password": "Passwords must match."})
         
-        if User.objects.filter(email=data['email']).exists():
+        if User.objects.by_email(data['email']).exists():
             raise serializers.ValidationError({"email": "Email already registered."})
         
         return data
@@ -38,7 +46,7 @@ class RegisterSerializer(serializers.ModelSerializer):
         
         user = User(**validated_data)
         user.username = validated_data['email']
-        user.set_password(password)
+        user.password = hash_password(password)
         user.save()
         return user
 
@@ -49,26 +57,55 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         self.fields['email'] = serializers.EmailField()
         self.fields.pop('username', None)
     
+    @classmethod
+    def get_token(cls, user):
+        return refresh_token_for(user)
+    
     def validate(self, attrs):
-        # Convert email to username for parent validation
-        email = attrs.get('email')
-        password = attrs.get('password')
-        
-        if email and password:
-            try:
-                user = User.objects.get(email=email)
-                attrs['username'] = user.username
-                attrs.pop('email', None)
-            except User.DoesNotExist:
-                raise serializers.ValidationError({"email": "No user found with this email."})
+        # Authenticate once through EmailBackend (one query, one hash) instead of
+        # looking the user up here and letting the parent authenticate again
+        self.user = authenticate(
+            self.context.get('request'), username=attrs.get('email'), password=attrs.get('password')
+        )
+        if self.user is None:
+            raise exceptions.AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
         
-        data = super().validate(attrs)
+        refresh = self.get_token(self.user)
+        data = {
+            'refresh': str(refresh),
+            'access': str(refresh.access_token),
+            'user': UserSerializer(self.user).data,
+        }
         
-        user_serializer = UserSerializer(self.user)
-        data['user'] = user_serializer.data
+        if jwt_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, self.user)
         
         return data
 
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refuses refresh tokens that were revoked, already rotated, or whose token
+    version has been bumped. A refresh token that passes carries current
+    role/is_active claims, which the new access token copies.
+    """
+    
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        version = refresh.payload.get(TOKEN_VERSION_CLAIM)
+        user_id = refresh.payload.get(jwt_settings.USER_ID_CLAIM)
+        if version is not None and version != current_token_version(user_id):
+            raise InvalidToken('Token has been revoked')
+        
+        jti, exp = refresh[jwt_settings.JTI_CLAIM], refresh['exp']
+        if jwt_settings.ROTATE_REFRESH_TOKENS and jwt_settings.BLACKLIST_AFTER_ROTATION:
+            # Used tokens are revoked on the spot; a replay finds its jti taken
+            if not revocation_store.consume(jti, exp):
+                raise InvalidToken('Token is blacklisted')
+        elif revocation_store.is_revoked(jti, exp):
+            raise InvalidToken('Token is blacklisted')
+        return super().validate(attrs)
+
 # Dashboard Serializers (Role-based views)
 
 class DashboardUserSerializer(serializers.ModelSerializer):
@@ -88,33 +125,55 @@ class DashboardUserSerializer(serializers.ModelSerializer):
     
     def get_member_count(self, obj):
         if obj.role == 'trainer':
+            # Prefer the count annotated by dashboard_user_queryset()
+            if hasattr(obj, 'active_member_count'):
+                return obj.active_member_count
             return obj.assigned_members.filter(status='active').count()
         return None
 
 
-class OwnerDashboardSerializer(serializers.Serializer):
-    """Dashboard for gym owner - sees all trainers and members"""
+def dashboard_user_queryset(queryset):
+    """
+    Prepare a user queryset for DashboardUserSerializer(many=True).
+    Trainer names are joined in and active member counts annotated, so
+    serializing the list costs one query however many rows it holds.
+    The count's GROUP BY drops Meta.ordering, so newest-first is restated.
+    """
+    return queryset.select_related('member_profile__primary_trainer').annotate(
+        active_member_count=Count(
+            'assigned_members',
+            filter=Q(assigned_members__status='active'),
+        )
+    ).order_by('-created_at', '-id')
+
+
+class OwnerDashboardSummarySerializer(serializers.Serializer):
+    """Dashboard header for gym owner - totals only"""
     role = serializers.SerializerMethodField()
     total_trainers = serializers.SerializerMethodField()
     total_members = serializers.SerializerMethodField()
-    trainers = serializers.SerializerMethodField()
-    members = serializers.SerializerMethodField()
     
     def get_role(self, obj):
         return 'owner'
     
     def get_total_trainers(self, obj):
-        return User.objects.filter(role='trainer').count()
+        return get_counter('trainers')
     
     def get_total_members(self, obj):
-        return User.objects.filter(role='member').count()
+        return get_counter('members')
+
+
+class OwnerDashboardSerializer(OwnerDashboardSummarySerializer):
+    """Dashboard for gym owner - sees all trainers and members"""
+    trainers = serializers.SerializerMethodField()
+    members = serializers.SerializerMethodField()
     
     def get_trainers(self, obj):
-        trainers = User.objects.filter(role='trainer')
+        trainers = dashboard_user_queryset(User.objects.filter(role='trainer'))
         return DashboardUserSerializer(trainers, many=True).data
     
     def get_members(self, obj):
-        members = User.objects.filter(role='member')
+        members = dashboard_user_queryset(User.objects.filter(role='member'))
         return DashboardUserSerializer(members, many=True).data
 
 
@@ -130,18 +189,20 @@ class TrainerDashboardSerializer(serializers.Serializer):
         return 'trainer'
     
     def get_total_members(self, obj):
-        return User.objects.filter(member_profile__primary_trainer=obj, role='member').count()
+        return get_counter(trainer_key(obj.pk))
     
     def get_total_programs(self, obj):
         return obj.programs.filter(is_active=True).count()
     
     def get_members(self, obj):
-        members = User.objects.filter(member_profile__primary_trainer=obj, role='member')
+        members = dashboard_user_queryset(
+            User.objects.filter(member_profile__primary_trainer=obj, role='member')
+        )
         return DashboardUserSerializer(members, many=True).data
     
     def get_programs(self, obj):
-        from programs.serializers import ProgramSerializer
-        programs = obj.programs.filter(is_active=True)
+        from programs.serializers import ProgramSerializer, program_list_queryset
+        programs = program_list_queryset(obj.programs.filter(is_active=True))
         return ProgramSerializer(programs, many=True).data
 
 
@@ -156,17 +217,22 @@ class MemberDashboardSerializer(serializers.Serializer):
         return 'member'
     
     def get_trainer(self, obj):
-        if hasattr(obj, 'member_profile') and obj.member_profile and obj.member_profile.primary_trainer:
-            trainer = obj.member_profile.primary_trainer
+        from members.models import Member
+        trainer_ids = Member.objects.filter(user=obj).values('primary_trainer')
+        trainer = dashboard_user_queryset(User.objects.filter(pk__in=trainer_ids)).first()
+        if trainer:
             return DashboardUserSerializer(trainer).data
         return None
     
     def get_programs(self, obj):
-        from programs.serializers import ProgramSerializer
-        from programs.models import ProgramAssignment
-        # Get the actual Program objects, not the ProgramAssignment objects
-        assignments = ProgramAssignment.objects.filter(member=obj)
-        programs = [assignment.program for assignment in assignments]
+        from programs.serializers import ProgramSerializer, program_list_queryset
+        from programs.models import Program, ProgramAssignment
+        # One query for all assigned programs, most recently assigned first.
+        # Filter through a subquery so the enrollment count still sees every assignment.
+        program_ids = ProgramAssignment.objects.filter(member=obj).values('program')
+        programs = program_list_queryset(Program.objects.filter(pk__in=program_ids)).annotate(
+            assigned_at=Max('assignments__assigned_at', filter=Q(assignments__member=obj))
+        ).order_by('-assigned_at')
         return ProgramSerializer(programs, many=True).data
     
     def get_stats(self, obj):
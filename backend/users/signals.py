@@ -0,0 +1,69 @@
+"""
+Invalidate cached dashboards whenever the data they are built from changes, and
+revoke a user's tokens when the claims they carry (role, is_active) go stale.
+
+snapshot_user is the one pre_save receiver for User: it reads the stored
+SNAPSHOT_FIELDS once and leaves them on instance._pre_save_state for every
+post_save receiver that needs the old values (here and in gym_info.signals).
+"""
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from members.models import Member
+from programs.models import Program, ProgramAssignment
+from .dashboard_cache import bump_dashboard_version
+from .models import User
+from .tokens import revoke_user_tokens
+
+# Saves that only touch these fields can't change any dashboard (e.g. update_last_login)
+IGNORED_USER_FIELDS = {'last_login', 'password'}
+# Fields copied into JWT claims (users.tokens)
+TOKEN_CLAIM_FIELDS = ('role', 'is_active')
+# Stored values post_save receivers compare against: token claims, gym counters
+SNAPSHOT_FIELDS = ('role', 'is_active', 'created_at')
+
+
+@receiver(pre_save, sender=User)
+def snapshot_user(sender, instance, raw=False, update_fields=None, **kwargs):
+    """{field: stored value} of SNAPSHOT_FIELDS, or None for new rows and saves not touching them"""
+    instance._pre_save_state = None
+    if raw or instance._state.adding or not instance.pk:
+        return
+    if update_fields is not None and not set(SNAPSHOT_FIELDS).intersection(update_fields):
+        return
+    instance._pre_save_state = User.objects.filter(pk=instance.pk).values(*SNAPSHOT_FIELDS).first()
+
+
+@receiver(post_save, sender=User)
+def revoke_stale_tokens(sender, instance, created, raw=False, **kwargs):
+    old = None if raw or created else getattr(instance, '_pre_save_state', None)
+    if old is not None and any(old[field] != getattr(instance, field) for field in TOKEN_CLAIM_FIELDS):
+        revoke_user_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    revoke_user_tokens(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields and set(update_fields) <= IGNORED_USER_FIELDS):
+        return
+    bump_dashboard_version()
+
+
+@receiver(post_save, sender=Member)
+@receiver(post_save, sender=Program)
+@receiver(post_save, sender=ProgramAssignment)
+def dashboard_data_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_dashboard_version()
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Member)
+@receiver(post_delete, sender=Program)
+@receiver(post_delete, sender=ProgramAssignment)
+def dashboard_data_deleted(sender, instance, **kwargs):
+    bump_dashboard_version()
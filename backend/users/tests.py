@@ -0,0 +1,637 @@
+import json
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import MD5PasswordHasher, make_password
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+from gym_info.counters import rebuild_counters
+from members.models import Member
+from programs.models import Program, ProgramAssignment
+from .dashboard_cache import bump_dashboard_version, dashboard_cache
+from .authentication import ClaimsJWTAuthentication, verified_tokens
+from .hashing import HashPoolBusy, check_user_password, hash_password, password_pool
+from .login_guard import LoginLocked, login_guard
+from .models import RevokedToken
+from .revocation import revocation_store
+from .tokens import refresh_token_for
+
+User = get_user_model()
+
+
+def seed_gym(trainers, members, prefix=''):
+    """
+    Bulk-create trainers and members (one shared hash), assigned round-robin.
+    bulk_create skips signals, so the gym counters are rebuilt and the
+    dashboard version bumped afterwards.
+    """
+    password = make_password('pass1234')
+    User.objects.bulk_create([
+        User(email=f'{prefix}trainer{i}@test.fit', username=f'{prefix}trainer{i}@test.fit',
+             password=password, role='trainer', first_name=f'Trainer{i}')
+        for i in range(trainers)
+    ])
+    User.objects.bulk_create([
+        User(email=f'{prefix}member{i}@test.fit', username=f'{prefix}member{i}@test.fit',
+             password=password, role='member', first_name=f'Member{i}')
+        for i in range(members)
+    ], batch_size=1000)
+    trainer_ids = list(User.objects.filter(role='trainer').values_list('id', flat=True))
+    member_ids = User.objects.filter(role='member', member_profile__isnull=True).values_list('id', flat=True)
+    Member.objects.bulk_create([
+        Member(user_id=member_id, primary_trainer_id=trainer_ids[i % len(trainer_ids)])
+        for i, member_id in enumerate(member_ids)
+    ], batch_size=1000)
+    rebuild_counters()
+    bump_dashboard_version()
+
+
+class OwnerDashboardTestCase(TestCase):
+    """Authenticated owner client; the process-wide dashboard cache starts empty"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email='owner@test.fit', username='owner@test.fit', password='pass1234', role='owner'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        dashboard_cache.clear()
+
+
+class OwnerDashboardQueryCountTests(OwnerDashboardTestCase):
+    """GET /api/users/dashboard/ for an owner must not scale queries with gym size"""
+
+    def _dashboard_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/users/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.data
+
+    def test_query_count_constant_for_10_and_10000_members(self):
+        seed_gym(trainers=3, members=10)
+        small_queries, small = self._dashboard_queries()
+        self.assertEqual(len(small['members']), 10)
+
+        seed_gym(trainers=0, members=10000 - 10, prefix='more-')
+        large_queries, large = self._dashboard_queries()
+        self.assertEqual(len(large['members']), 10000)
+
+        self.assertEqual(small_queries, large_queries)
+
+    def test_trainer_names_and_member_counts(self):
+        seed_gym(trainers=2, members=5)
+        _, data = self._dashboard_queries()
+
+        counts = sorted(t['member_count'] for t in data['trainers'])
+        self.assertEqual(counts, [2, 3])
+        for member in data['members']:
+            self.assertIn(member['trainer_name'], ('Trainer0', 'Trainer1'))
+            self.assertIsNone(member['member_count'])
+
+    def test_lists_are_newest_first(self):
+        seed_gym(trainers=2, members=5)
+        base = timezone.now()
+        for i, user in enumerate(User.objects.filter(role__in=('trainer', 'member')).order_by('?')):
+            User.objects.filter(pk=user.pk).update(created_at=base - timedelta(minutes=i))
+        _, data = self._dashboard_queries()
+        for role, rows in (('trainer', data['trainers']), ('member', data['members'])):
+            expected = list(User.objects.filter(role=role).order_by('-created_at').values_list('id', flat=True))
+            self.assertEqual([row['id'] for row in rows], expected)
+
+
+class OwnerDashboardSectionTests(OwnerDashboardTestCase):
+    """?section= lets the owner page load the header and lists separately"""
+
+    def setUp(self):
+        super().setUp()
+        seed_gym(trainers=2, members=25)
+
+    def test_summary_has_totals_only(self):
+        response = self.client.get('/api/users/dashboard/', {'section': 'summary'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'role': 'owner', 'total_trainers': 2, 'total_members': 25})
+
+    def test_members_section_walks_every_row_once(self):
+        seen = []
+        url, params = '/api/users/dashboard/', {'section': 'members', 'page_size': 10}
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 10)
+            seen.extend(row['id'] for row in response.data['results'])
+            url, params = response.data['next'], None
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(len(set(seen)), 25)
+
+    def test_unknown_section_is_rejected(self):
+        response = self.client.get('/api/users/dashboard/', {'section': 'payments'})
+        self.assertEqual(response.status_code, 400)
+
+
+class DashboardCacheTests(OwnerDashboardTestCase):
+    """Repeat dashboard loads are served from cache until the data changes"""
+
+    def test_repeat_load_hits_cache_until_a_write(self):
+        seed_gym(trainers=1, members=3)
+        first = self.client.get('/api/users/dashboard/')
+        self.assertEqual(first['X-Dashboard-Cache'], 'MISS')
+
+        with self.assertNumQueries(1):  # only the data-version read
+            second = self.client.get('/api/users/dashboard/')
+        self.assertEqual(second['X-Dashboard-Cache'], 'HIT')
+        self.assertEqual(second.data, first.data)
+
+        User.objects.create_user(email='new@test.fit', username='new@test.fit', password='pass1234', role='member')
+        third = self.client.get('/api/users/dashboard/')
+        self.assertEqual(third['X-Dashboard-Cache'], 'MISS')
+        self.assertEqual(third.data['total_members'], 4)
+
+    def test_last_login_update_keeps_cache(self):
+        self.client.get('/api/users/dashboard/')
+        self.owner.save(update_fields=['last_login'])
+        self.assertEqual(self.client.get('/api/users/dashboard/')['X-Dashboard-Cache'], 'HIT')
+
+
+class MemberDashboardQueryCountTests(TestCase):
+    """A member's dashboard costs the same queries for 1, 10 or 100 assigned programs"""
+
+    def setUp(self):
+        dashboard_cache.clear()
+        seed_gym(trainers=1, members=3)
+        trainer = User.objects.get(role='trainer')
+        programs = Program.objects.bulk_create([
+            Program(trainer=trainer, name=f'Program {i}', program_type='cardio', description='',
+                    duration_weeks=8, difficulty_level='beginner', price=1000)
+            for i in range(100)
+        ])
+        self.members = list(User.objects.filter(role='member').order_by('id'))
+        ProgramAssignment.objects.bulk_create([
+            ProgramAssignment(program=program, member=member, price=program.price)
+            for member, count in zip(self.members, (1, 10, 100))
+            for program in programs[:count]
+        ])
+        bump_dashboard_version()
+
+    def _dashboard(self, member):
+        client = APIClient()
+        client.force_authenticate(member)
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get('/api/users/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.data
+
+    def test_query_count_independent_of_assignments(self):
+        results = [self._dashboard(member) for member in self.members]
+
+        self.assertEqual([len(data['programs']) for _, data in results], [1, 10, 100])
+        self.assertEqual(len({queries for queries, _ in results}), 1)
+        self.assertEqual(results[0][1]['trainer']['member_count'], 3)
+        # Program 0 is assigned to all three members, program 99 only to the last
+        enrollments = {p['name']: p['enrollments'] for p in results[2][1]['programs']}
+        self.assertEqual(enrollments['Program 0'], 3)
+        self.assertEqual(enrollments['Program 99'], 1)
+
+
+class UserListingTests(OwnerDashboardTestCase):
+    """/api/users/ and /api/users/members/ page by cursor; ?stream=true exports NDJSON"""
+
+    def setUp(self):
+        super().setUp()
+        seed_gym(trainers=2, members=15)
+
+    def test_members_are_paginated(self):
+        response = self.client.get('/api/users/members/', {'include_total': 'true'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(response.data['total'], 15)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_following_next_returns_every_member_once(self):
+        # The contract frontend/services/api.ts getAllPages relies on: page_size is
+        # carried in `next`, and walking `next` to the end lists everyone
+        seen, url, params = [], '/api/users/members/', {'page_size': 4}
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 4)
+            seen += [row['email'] for row in response.data['results']]
+            url, params = response.data['next'], None
+        self.assertEqual(len(seen), 15)
+        self.assertEqual(set(seen), set(User.objects.filter(role='member').values_list('email', flat=True)))
+
+    def test_role_listing_uses_index_for_ordering(self):
+        queryset = User.objects.filter(role='member').order_by('-created_at', '-id')[:10]
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        self.assertIn('user_role_created_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_list_filters_role_and_is_active(self):
+        User.objects.filter(email='trainer0@test.fit').update(is_active=False)
+        response = self.client.get('/api/users/', {'role': 'trainer', 'is_active': 'true'})
+        self.assertEqual([u['email'] for u in response.data['results']], ['trainer1@test.fit'])
+
+    def test_owner_can_stream_export(self):
+        response = self.client.get('/api/users/members/', {'stream': 'true'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(len(rows), 15)
+        self.assertTrue(all(row['role'] == 'member' for row in rows))
+
+    def test_members_cannot_stream_export(self):
+        self.client.force_authenticate(User.objects.filter(role='member').first())
+        response = self.client.get('/api/users/', {'stream': 'true'})
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    PASSWORD_HASH_WORKERS=0,  # hash inline so the parent process can count hasher calls
+)
+class LoginPipelineTests(TestCase):
+    """Every login endpoint costs one user query and one password hash, pass or fail"""
+    # Issuing a token also reads the user's token version (users.tokens); only auth_user reads count here
+
+    endpoints = ('/api/auth/login/', '/api/users/login/', '/api/token/')
+
+    def setUp(self):
+        caches['login_guard'].clear()
+        self.user = User.objects.create_user(
+            email='member@test.fit', username='member_test', password='pass1234', role='member'
+        )
+        self.client = APIClient()
+
+    def attempt(self, url, email, password):
+        original = MD5PasswordHasher.encode
+        with mock.patch.object(MD5PasswordHasher, 'encode', autospec=True, side_effect=original) as encode:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post(url, {'email': email, 'password': password}, format='json')
+        selects = [q for q in ctx.captured_queries if q['sql'].startswith('SELECT') and '"auth_user"' in q['sql']]
+        return response, encode.call_count, len(selects)
+
+    def test_success_on_every_endpoint(self):
+        for url in self.endpoints:
+            response, hashes, selects = self.attempt(url, 'member@test.fit', 'pass1234')
+            self.assertEqual(response.status_code, 200, url)
+            self.assertIn('access', response.data)
+            self.assertEqual((hashes, selects), (1, 1), url)
+
+    def test_failures_hash_once(self):
+        for url in self.endpoints:
+            for email, password in (('member@test.fit', 'wrong'), ('nobody@test.fit', 'pass1234')):
+                response, hashes, selects = self.attempt(url, email, password)
+                self.assertEqual(response.status_code, 401, url)
+                self.assertEqual((hashes, selects), (1, 1), (url, email))
+
+
+@override_settings(PASSWORD_HASHERS=[
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+])
+class PasswordHashPoolTests(TestCase):
+    """Hashing runs in the process pool, sheds overflow with 503 and upgrades old hashes"""
+
+    def setUp(self):
+        caches['login_guard'].clear()
+        self.client = APIClient()
+
+    @override_settings(PASSWORD_HASH_WORKERS=1)
+    def test_pool_round_trip(self):
+        encoded = hash_password('pass1234')
+        self.assertTrue(encoded.startswith('md5$'))
+        user = User(email='pool@test.fit', password=encoded)
+        self.assertTrue(check_user_password(user, 'pass1234'))
+        self.assertFalse(check_user_password(user, 'wrong'))
+
+    @override_settings(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_MAX_QUEUE=0, PASSWORD_HASH_RETRY_AFTER=2)
+    def test_overflow_gets_503_with_retry_after(self):
+        hash_password('warm-up')  # builds the pool for these settings
+        rejected = password_pool.rejected
+        password_pool._slots.acquire()  # occupy the only slot
+        try:
+            response = self.client.post(
+                '/api/auth/login/', {'email': 'a@test.fit', 'password': 'pass1234'}, format='json'
+            )
+        finally:
+            password_pool._slots.release()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '2')
+        self.assertEqual(password_pool.stats()['rejected'], rejected + 1)
+
+    @override_settings(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_MAX_QUEUE=0)
+    def test_overflow_fails_admin_login_without_500(self):
+        User.objects.create_user(
+            email='staff@test.fit', username='staff@test.fit', password='pass1234', role='owner', is_staff=True
+        )
+        hash_password('warm-up')
+        password_pool._slots.acquire()
+        try:
+            response = self.client.post('/admin/login/', {'username': 'staff@test.fit', 'password': 'pass1234'})
+        finally:
+            password_pool._slots.release()
+        self.assertEqual(response.status_code, 200)  # the login form again, with an error
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+    @override_settings(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_MAX_QUEUE=0, PASSWORD_HASH_TIMEOUT=0.05)
+    def test_timeout_is_busy_and_keeps_the_slot_until_the_job_ends(self):
+        hash_password('warm-up')
+        with self.assertRaises(HashPoolBusy):
+            password_pool.run(time.sleep, 0.5)
+        # The worker is still sleeping: its slot is not handed to the next call
+        self.assertEqual(password_pool.stats()['in_flight'], 1)
+        with self.assertRaises(HashPoolBusy):
+            hash_password('pass1234')
+        deadline = time.monotonic() + 5
+        while password_pool.stats()['in_flight'] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(password_pool.stats()['in_flight'], 0)
+        with override_settings(PASSWORD_HASH_TIMEOUT=5):
+            self.assertTrue(hash_password('pass1234').startswith('md5$'))
+
+    @override_settings(PASSWORD_HASH_WORKERS=0)
+    def test_login_rehashes_outdated_hash(self):
+        user = User.objects.create(
+            email='old@test.fit', username='old@test.fit', role='member',
+            password=make_password('pass1234', hasher='pbkdf2_sha256'),
+        )
+        response = self.client.post('/api/auth/login/', {'email': 'old@test.fit', 'password': 'pass1234'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('md5$'))
+
+
+class StatelessJWTTests(TestCase):
+    """Requests authenticate from token claims; role/is_active changes revoke old tokens"""
+
+    def setUp(self):
+        cache.clear()
+        verified_tokens.clear()
+        self.user = User.objects.create_user(
+            email='member@test.fit', username='member@test.fit', password='pass1234',
+            role='member', first_name='Mia'
+        )
+        self.refresh = refresh_token_for(self.user)
+        self.auth = ClaimsJWTAuthentication()
+
+    def authenticate(self, token=None):
+        token = token or self.refresh.access_token
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return self.auth.authenticate(request)[0]
+
+    def test_claims_user_needs_no_user_query(self):
+        # With the process-local default cache the version is read from the counters table
+        with CaptureQueriesContext(connection) as ctx:
+            user = self.authenticate()
+            self.assertEqual((user.pk, user.role, user.is_active), (self.user.pk, 'member', True))
+            self.assertEqual(user, self.user)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertIn('gym_info_gymcounter', ctx.captured_queries[0]['sql'])
+        with self.assertNumQueries(1):
+            self.assertEqual((user.email, user.first_name), ('member@test.fit', 'Mia'))
+
+    def test_shared_cache_serves_versions_and_sees_revocations(self):
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location},
+        }):
+            self.authenticate()  # warms the token version cache
+            with self.assertNumQueries(0):
+                self.authenticate()
+            self.user.role = 'trainer'
+            self.user.save()
+            with self.assertRaises(AuthenticationFailed):
+                self.authenticate()
+
+    def test_role_change_and_deactivation_revoke_tokens(self):
+        self.authenticate()
+        self.user.role = 'trainer'
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+        fresh = refresh_token_for(self.user)
+        self.assertEqual(self.authenticate(fresh.access_token).role, 'trainer')
+        self.user.is_active = False
+        self.user.save(update_fields=['is_active'])
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(fresh.access_token)
+
+    def test_revoked_refresh_token_is_refused(self):
+        self.user.role = 'trainer'
+        self.user.save()
+        response = APIClient().post('/api/token/refresh/', {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_save_reads_the_stored_row_once(self):
+        self.user.first_name = 'Renamed'
+        with CaptureQueriesContext(connection) as ctx:
+            self.user.save()
+        reads = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('SELECT') and 'FROM "auth_user"' in q['sql']]
+        self.assertEqual(len(reads), 1)  # one pre_save snapshot for the token and counter receivers
+
+    def test_unrelated_save_keeps_tokens(self):
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        self.assertEqual(self.authenticate().pk, self.user.pk)
+
+    def test_tokens_without_claims_fall_back_to_user_lookup(self):
+        token = RefreshToken.for_user(self.user).access_token
+        with self.assertNumQueries(1):
+            user = self.authenticate(token)
+        self.assertEqual(user.email, 'member@test.fit')
+
+    def test_dashboard_with_bearer_token(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.refresh.access_token}')
+        response = client.get('/api/users/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['role'], 'member')
+
+
+class RefreshRevocationTests(TestCase):
+    """Rotated refresh tokens can't be replayed; revocations expire with their tokens"""
+
+    def setUp(self):
+        cache.clear()
+        revocation_store.reset()
+        self.user = User.objects.create_user(
+            email='member@test.fit', username='member@test.fit', password='pass1234', role='member'
+        )
+        self.client = APIClient()
+
+    def refresh(self, token):
+        return self.client.post('/api/token/refresh/', {'refresh': str(token)}, format='json')
+
+    def test_rotated_token_cannot_be_reused(self):
+        token = refresh_token_for(self.user)
+        first = self.refresh(token)
+        self.assertEqual(first.status_code, 200)
+        self.assertNotEqual(first.data['refresh'], str(token))
+
+        self.assertEqual(self.refresh(token).status_code, 401)
+        self.assertEqual(self.refresh(first.data['refresh']).status_code, 200)
+        self.assertEqual(RevokedToken.objects.count(), 2)
+
+    def test_unrevoked_tokens_skip_the_database(self):
+        tokens = [refresh_token_for(self.user) for _ in range(3)]
+        revocation_store.revoke(tokens[0]['jti'], tokens[0]['exp'])
+        self.assertTrue(revocation_store.is_revoked(tokens[0]['jti'], tokens[0]['exp']))
+        with self.assertNumQueries(0):
+            for token in tokens[1:]:
+                self.assertFalse(revocation_store.is_revoked(token['jti'], token['exp']))
+
+    def test_other_process_revocations_are_synced(self):
+        token = refresh_token_for(self.user)
+        revocation_store.is_revoked('warm-up', token['exp'])
+        # Written behind the store's back, as another worker process would
+        RevokedToken.objects.create(jti=token['jti'], expires_at=datetime.fromtimestamp(token['exp'], dt_timezone.utc))
+        with override_settings(REVOCATION_SYNC_INTERVAL=0):
+            self.assertTrue(revocation_store.is_revoked(token['jti'], token['exp']))
+
+    def test_late_commits_with_lower_ids_are_synced(self):
+        token, late = refresh_token_for(self.user), refresh_token_for(self.user)
+        expires_at = datetime.fromtimestamp(token['exp'], dt_timezone.utc)
+        RevokedToken.objects.create(pk=100, jti=token['jti'], expires_at=expires_at)
+        self.assertTrue(revocation_store.is_revoked(token['jti'], token['exp']))
+        # A transaction that took pk 50 and started before that sync commits only now
+        RevokedToken.objects.create(
+            pk=50, jti=late['jti'], expires_at=expires_at, created_at=timezone.now() - timedelta(seconds=5),
+        )
+        with override_settings(REVOCATION_SYNC_INTERVAL=0):
+            self.assertTrue(revocation_store.is_revoked(late['jti'], late['exp']))
+
+    def test_compaction_drops_expired_entries(self):
+        now = time.time()
+        revocation_store.revoke('old', now - 86400 * 2)
+        revocation_store.revoke('new', now + 86400 * 3)
+        self.assertEqual(revocation_store.compact(now=now), 1)
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), ['new'])
+        self.assertEqual(revocation_store.stats()['entries'], 1)
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    PASSWORD_HASH_WORKERS=0,
+    LOGIN_EMAIL_FREE_FAILURES=2,
+    LOGIN_EMAIL_LOCKOUT_FAILURES=4,
+    LOGIN_DELAY_BASE=30,
+)
+class LoginGuardTests(TestCase):
+    """Repeated failures are delayed, then locked out, without hashing or querying"""
+
+    def setUp(self):
+        caches['login_guard'].clear()
+        login_guard.reset_counters()
+        User.objects.create_user(email='member@test.fit', username='member@test.fit', password='pass1234')
+        self.client = APIClient()
+
+    def login(self, password, email='member@test.fit', url='/api/auth/login/'):
+        return self.client.post(url, {'email': email, 'password': password}, format='json')
+
+    def test_progressive_delay_rejects_before_hashing(self):
+        for _ in range(3):
+            self.assertEqual(self.login('wrong').status_code, 401)
+        with mock.patch.object(MD5PasswordHasher, 'encode') as encode, self.assertNumQueries(0):
+            response = self.login('pass1234', url='/api/token/')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+        encode.assert_not_called()
+        self.assertEqual(login_guard.stats(), {'rejected': 1, 'hashed': 3, 'succeeded': 0, 'failed': 3})
+
+    def test_lockout_after_threshold(self):
+        with override_settings(LOGIN_DELAY_BASE=0):
+            for _ in range(4):
+                self.assertEqual(self.login('wrong').status_code, 401)
+        response = self.login('pass1234', url='/api/users/login/')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 800)
+
+    def test_success_clears_email_failures(self):
+        self.login('wrong')
+        self.login('wrong')
+        self.assertEqual(self.login('pass1234').status_code, 200)
+        self.login('wrong')
+        self.assertEqual(self.login('wrong').status_code, 401)
+
+    def test_parallel_burst_is_capped_before_any_failure_is_recorded(self):
+        # Concurrent requests all pass check() before the first one records its failure
+        admitted = 0
+        for _ in range(10):
+            try:
+                login_guard.check(None, 'member@test.fit')
+                admitted += 1
+            except LoginLocked:
+                pass
+        self.assertEqual(admitted, 4)
+        login_guard.success(None, 'member@test.fit')
+        login_guard.check(None, 'member@test.fit')
+
+    @override_settings(LOGIN_IP_FREE_FAILURES=3, LOGIN_IP_LOCKOUT_FAILURES=3)
+    def test_ip_limit_spans_emails(self):
+        for i in range(3):
+            self.assertEqual(self.login('x', email=f'nobody{i}@test.fit').status_code, 401)
+        self.assertEqual(self.login('pass1234').status_code, 429)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'], PASSWORD_HASH_WORKERS=0)
+class NormalizedEmailTests(TestCase):
+    """Email lookups are case-insensitive and seek the email_normalized index"""
+
+    def setUp(self):
+        caches['login_guard'].clear()
+        self.user = User.objects.create_user(email='Member@Test.fit', username='member', password='pass1234')
+        self.client = APIClient()
+
+    def test_maintained_on_save_and_bulk_create(self):
+        self.assertEqual(self.user.email_normalized, 'member@test.fit')
+        self.user.email = ' Renamed@Test.FIT'
+        self.user.save(update_fields=['email'])
+        self.assertTrue(User.objects.by_email('renamed@test.fit').exists())
+        bulk = User.objects.bulk_create([User(email='Bulk@Test.fit', username='bulk')])[0]
+        self.assertEqual(User.objects.by_email('BULK@test.fit').get().pk, bulk.pk)
+
+    def test_mixed_case_login(self):
+        for url in ('/api/auth/login/', '/api/users/login/'):
+            response = self.client.post(url, {'email': 'MEMBER@test.fit', 'password': 'pass1234'}, format='json')
+            self.assertEqual(response.status_code, 200, url)
+
+    def test_register_rejects_case_variant(self):
+        response = self.client.post('/api/users/register/', {
+            'email': 'member@TEST.fit', 'password': 'pass1234', 'password2': 'pass1234',
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('email', response.data)
+
+    def test_lookup_uses_index(self):
+        sql, params = User.objects.by_email('x@test.fit').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        self.assertIn('USING INDEX', plan)
+
+
+class APIMiddlewareScopeTests(TestCase):
+    """/api/ skips the browser middleware; /admin/ keeps all of it"""
+
+    def test_api_skips_session_csrf_and_frame_options(self):
+        client = APIClient(enforce_csrf_checks=True)
+        response = client.get('/api/gym/')
+        self.assertNotIn('X-Frame-Options', response)
+        self.assertNotIn('Cookie', response.get('Vary', ''))
+        self.assertFalse(hasattr(response.wsgi_request, 'session'))
+
+    def test_admin_keeps_full_stack(self):
+        response = self.client.get('/admin/login/')
+        self.assertEqual(response['X-Frame-Options'], 'DENY')
+        self.assertIn('csrftoken', response.cookies)
+        self.assertTrue(hasattr(response.wsgi_request, 'session'))
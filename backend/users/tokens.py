@@ -0,0 +1,77 @@
+"""
+JWT claims and per-user token versions.
+
+Tokens carry the user's role, is_active flag and token version ('tv') so
+users.authentication can build request.user without reading auth_user. Each
+user's version is a change stamp in gym_info's counters table
+('version:token:<id>'); users.signals bumps it when a user's role or is_active
+changes or the user is deleted, which revokes every token issued before.
+
+Current versions are read with one indexed lookup per request, or through the
+default cache for TOKEN_VERSION_CACHE_TTL seconds when that cache is shared
+between processes (Redis, Memcached, database, file). A bump drops the cached
+entry (again once it commits), so revocation is immediate either way. A
+process-local cache (LocMemCache, the default) is never used for versions: other
+workers would keep accepting the old claims until their entry expired.
+Queryset .update() bypasses signals: call revoke_user_tokens() after bulk
+role/is_active edits.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from gym_info.counters import bump_version, get_version
+
+# Cache backends that live inside one process and so never see other workers' bumps
+PROCESS_LOCAL_CACHES = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+ROLE_CLAIM = 'role'
+ACTIVE_CLAIM = 'is_active'
+TOKEN_VERSION_CLAIM = 'tv'
+
+
+def _version_name(user_id):
+    return f'token:{user_id}'
+
+
+def _cache_key(user_id):
+    return f'users:token_version:{user_id}'
+
+
+def version_cache_is_shared():
+    return settings.CACHES.get('default', {}).get('BACKEND') not in PROCESS_LOCAL_CACHES
+
+
+def current_token_version(user_id):
+    """The user's token version; tokens stamped with any other value are revoked"""
+    if not version_cache_is_shared():
+        return get_version(_version_name(user_id))
+    key = _cache_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = get_version(_version_name(user_id))
+        cache.set(key, version, getattr(settings, 'TOKEN_VERSION_CACHE_TTL', 60))
+    return version
+
+
+def revoke_user_tokens(user_id):
+    """Invalidate every token issued to the user so far"""
+    bump_version(_version_name(user_id))
+    key = _cache_key(user_id)
+    cache.delete(key)
+    # Another process may re-cache the old version before this transaction commits
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def refresh_token_for(user):
+    """RefreshToken for `user` carrying the claims the stateless auth path needs"""
+    refresh = RefreshToken.for_user(user)
+    refresh[ROLE_CLAIM] = user.role
+    refresh[ACTIVE_CLAIM] = user.is_active
+    refresh[TOKEN_VERSION_CLAIM] = current_token_version(getattr(user, jwt_settings.USER_ID_FIELD))
+    return refresh
@@ -1,12 +1,19 @@
+import json
+
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.views import APIView
+from rest_framework.utils.encoders import JSONEncoder
 from django.contrib.auth import get_user_model
+from django.http import StreamingHttpResponse
+from core.pagination import CreatedAtCursorPagination
+from .dashboard_cache import dashboard_cache, dashboard_cache_key
 from .serializers import (
     UserSerializer, RegisterSerializer, CustomTokenObtainPairSerializer,
-    OwnerDashboardSerializer, TrainerDashboardSerializer, MemberDashboardSerializer
+    OwnerDashboardSerializer, OwnerDashboardSummarySerializer, TrainerDashboardSerializer,
+    MemberDashboardSerializer, DashboardUserSerializer, dashboard_user_queryset
 )
 from rest_framework_simplejwt.views import TokenObtainPairView
 
@@ -16,6 +23,10 @@ class RegisterView(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+    
+    # Rows fetched per round-trip while streaming an export
+    export_chunk_size = 2000
     
     def get_serializer_class(self):
         if self.action == 'register':
@@ -23,7 +34,7 @@ class RegisterView(viewsets.ModelViewSet):
         return UserSerializer
     
     def list(self, request):
-        """List all users - filtered by role if specified"""
+        """List all users - filtered by role / is_active if specified"""
         queryset = self.get_queryset()
         
         # Filter by role if provided
@@ -31,8 +42,39 @@ class RegisterView(viewsets.ModelViewSet):
         if role:
             queryset = queryset.filter(role=role)
         
-        serializer = UserSerializer(queryset, many=True)
-        return Response(serializer.data)
+        return self._user_listing(request, queryset)
+    
+    def _user_listing(self, request, queryset):
+        """
+        Cursor-paginated user list, or an NDJSON export with ?stream=true.
+        Both walk the (role, is_active, created_at, id) index, or (role, created_at, id)
+        when is_active isn't filtered.
+        """
+        is_active = request.query_params.get('is_active')
+        if is_active is not None:
+            queryset = queryset.filter(is_active=is_active.lower() in ('1', 'true', 'yes'))
+        
+        if request.query_params.get('stream', '').lower() in ('1', 'true', 'yes'):
+            return self._stream_users(request, queryset)
+        
+        page = self.paginate_queryset(queryset)
+        serializer = UserSerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
+    
+    def _stream_users(self, request, queryset):
+        """Admin export: one JSON object per line, read with a server-side iterator"""
+        if not (request.user.is_staff or request.user.role == 'owner'):
+            return Response(
+                {'error': 'Only gym owners can export users'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        serializer = UserSerializer(context=self.get_serializer_context())
+        rows = queryset.order_by('-created_at', '-id').iterator(chunk_size=self.export_chunk_size)
+        lines = (json.dumps(serializer.to_representation(user), cls=JSONEncoder) + '\n' for user in rows)
+        response = StreamingHttpResponse(lines, content_type='application/x-ndjson')
+        response['Content-Disposition'] = 'attachment; filename="users.ndjson"'
+        return response
     
     @action(detail=False, methods=['post'], permission_classes=[AllowAny])
     def register(self, request):
@@ -52,10 +94,9 @@ class RegisterView(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def members(self, request):
-        """Get all members"""
+        """Get all members (paginated; ?stream=true exports them all)"""
         members = User.objects.filter(role='member')
-        serializer = UserSerializer(members, many=True)
-        return Response(serializer.data)
+        return self._user_listing(request, members)
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
@@ -64,13 +105,35 @@ class DashboardView(APIView):
     """
     Return role-specific dashboard data for Owner, Trainer, or Member.
     All roles call this single endpoint: GET /api/users/dashboard/
+    
+    Owners may request one section at a time instead of the full payload:
+        ?section=summary            -> totals only
+        ?section=trainers&cursor=   -> cursor-paginated trainers
+        ?section=members&cursor=    -> cursor-paginated members
     """
     permission_classes = [IsAuthenticated]
+    owner_sections = ('summary', 'trainers', 'members')
     
     def get(self, request):
+        # Serve the rendered payload from cache until any dashboard data changes
+        cache_key = dashboard_cache_key(request)
+        data = dashboard_cache.get(cache_key)
+        if data is not None:
+            return Response(data, headers={'X-Dashboard-Cache': 'HIT'})
+        
+        response = self._dashboard(request)
+        if response.status_code == status.HTTP_200_OK:
+            dashboard_cache.set(cache_key, response.data)
+        response['X-Dashboard-Cache'] = 'MISS'
+        return response
+    
+    def _dashboard(self, request):
         user = request.user
         
         if user.role == 'owner':
+            section = request.query_params.get('section')
+            if section:
+                return self._owner_dashboard_section(request, user, section)
             return self._owner_dashboard(user)
         elif user.role == 'trainer':
             return self._trainer_dashboard(user)
@@ -84,6 +147,25 @@ class DashboardView(APIView):
         serializer = OwnerDashboardSerializer(user)
         return Response(serializer.data)
     
+    def _owner_dashboard_section(self, request, user, section):
+        """Owner fetches the summary or one page of trainers/members"""
+        if section not in self.owner_sections:
+            return Response(
+                {'error': f"Invalid section. Choose one of: {', '.join(self.owner_sections)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if section == 'summary':
+            serializer = OwnerDashboardSummarySerializer(user)
+            return Response(serializer.data)
+        
+        role = 'trainer' if section == 'trainers' else 'member'
+        queryset = dashboard_user_queryset(User.objects.filter(role=role))
+        paginator = CreatedAtCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = DashboardUserSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+    
     def _trainer_dashboard(self, user):
         """Trainer sees only their assigned members and programs"""
         serializer = TrainerDashboardSerializer(user)
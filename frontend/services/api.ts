@@ -54,4 +54,25 @@ api.interceptors.response.use(
   }
 )
 
+// Largest page the backend's cursor pagination serves (core.pagination.KeysetPagination.max_page_size)
+const MAX_PAGE_SIZE = 100
+
+// GET a cursor-paginated list ({ results, next }) and follow `next` to the last page.
+// Unpaginated (plain array) responses are returned as they are.
+export async function getAllPages<T>(url: string, params: Record<string, unknown> = {}): Promise<T[]> {
+  const items: T[] = []
+  let response = await api.get(url, { params: { page_size: MAX_PAGE_SIZE, ...params } })
+  for (;;) {
+    const data = response.data
+    if (!data || !Array.isArray(data.results)) {
+      return Array.isArray(data) ? data : items
+    }
+    items.push(...data.results)
+    if (!data.next) {
+      return items
+    }
+    response = await api.get(data.next)
+  }
+}
+
 export default api
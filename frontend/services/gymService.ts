@@ -22,14 +22,27 @@ export interface DashboardStats {
   }
 }
 
+export type GrowthGranularity = 'day' | 'week' | 'month'
+
 export interface MembershipGrowthData {
   chart_type: string
   data: Array<{
-    week: string
+    week: string  // bucket label, whatever the granularity
+    start?: string  // YYYY-MM-DD
     members: number
   }>
   title: string
   subtitle: string
+  granularity?: GrowthGranularity
+  from?: string
+  to?: string
+  total?: number
+}
+
+export interface MembershipGrowthParams {
+  from?: string  // YYYY-MM-DD, inclusive
+  to?: string
+  granularity?: GrowthGranularity
 }
 
 export interface Activity {
@@ -62,13 +75,21 @@ export interface GymInfo {
 }
 
 export interface WorkingHours {
-  id: number
   day: string
   opening_time: string
   closing_time: string
   is_closed: boolean
 }
 
+export interface WeeklyHours {
+  gym: number
+  timezone: string
+  hours: WorkingHours[]  // Monday first
+  open_now: boolean
+  closes_at: string | null  // ISO datetime, set while open
+  opens_at: string | null  // ISO datetime, set while closed (null if never open)
+}
+
 // Gym Service API calls
 const gymService = {
   // Fetch dashboard statistics
@@ -78,8 +99,8 @@ const gymService = {
   },
 
   // Fetch membership growth data
-  getMembershipGrowth: async (): Promise<MembershipGrowthData> => {
-    const response = await api.get('/gym/membership_growth/')
+  getMembershipGrowth: async (params: MembershipGrowthParams = {}): Promise<MembershipGrowthData> => {
+    const response = await api.get('/gym/membership_growth/', { params })
     return response.data
   },
 
@@ -134,7 +155,7 @@ const gymService = {
   },
 
   // Fetch working hours
-  getWorkingHours: async (): Promise<WorkingHours[]> => {
+  getWorkingHours: async (): Promise<WeeklyHours> => {
     const response = await api.get('/gym/1/working_hours/')
     return response.data
   },
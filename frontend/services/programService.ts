@@ -1,4 +1,4 @@
-import api from './api'
+import api, { getAllPages } from './api'
 
 export interface Program {
   id: number
@@ -32,8 +32,7 @@ const programService = {
   // Get all programs
   getAll: async (): Promise<Program[]> => {
     try {
-      const response = await api.get('/programs/')
-      return response.data.results || response.data
+      return await getAllPages<Program>('/programs/')
     } catch (error) {
       console.error('Failed to fetch programs:', error)
       return []
@@ -43,8 +42,7 @@ const programService = {
   // Get trainer's own programs
   getMyPrograms: async (): Promise<Program[]> => {
     try {
-      const response = await api.get('/programs/my_programs/')
-      return response.data.results || response.data
+      return await getAllPages<Program>('/programs/my_programs/')
     } catch (error) {
       console.error('Failed to fetch trainer programs:', error)
       return []
@@ -1,4 +1,4 @@
-import api from './api'
+import api, { getAllPages } from './api'
 
 export interface User {
   id: number
@@ -28,8 +28,7 @@ const userService = {
   // Get all users
   getAll: async (): Promise<User[]> => {
     try {
-      const response = await api.get('/users/')
-      return response.data.results || response.data
+      return await getAllPages<User>('/users/')
     } catch (error) {
       console.error('Failed to fetch users:', error)
       return []
@@ -39,8 +38,7 @@ const userService = {
   // Get all members
   getMembers: async (): Promise<Member[]> => {
     try {
-      const response = await api.get('/users/members/')
-      return response.data.results || response.data
+      return await getAllPages<Member>('/users/members/')
     } catch (error) {
       console.error('Failed to fetch members:', error)
       return []